@@ -9,7 +9,19 @@ Created on Sun May 11 09:26:45 2025
 # Go to trivalent folder and run "python -m unittest tests.test_trivalent"
 
 import unittest
-from trivalent import Vertex, Edge, Graph
+import io
+from collections import Counter
+from fractions import Fraction
+from itertools import product
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from trivalent import (Vertex, Edge, Graph, FrozenGraph, DartGraph, EdgeList, ColorTable, colorList,
+                       colorArray, quantumTable, Cyclotomic, generate, packGraph, unpackGraph,
+                       enumerateGraphs, readEdgeLine)
 
 class TestTrivalent(unittest.TestCase):
 
@@ -507,6 +519,1006 @@ class TestTrivalent(unittest.TestCase):
         H.addEdges([[0, 1, 1], [0, 2, -1], [1, 3, -1], [1, 2, 1], [0, 3, -1], [2, 3, 1]])
         
         self.assertNotEqual(G, H)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_canonicalCodeRelabel(self):
+        """
+            Canonical code does not depend on vertex labels or edge directions
+        """
+        
+        G = Graph(6)
+        G.addEdges([[0, 1, 1], [1, 2, -1], [2, 5, 1], [1, 3, 1], [2, 3, -1], \
+                    [0, 4, -1], [3, 4, 1], [0, 5, 1], [4, 5, -1]])
+        
+        # Permute labels 0 -> 3 -> 1 -> 4 -> 0, reverse the direction of edges
+        # (and so the sign of the orientation), and shift the edge list; none
+        # of these change the cyclic orders
+        
+        perm = [3, 4, 2, 1, 0, 5]
+        edge_list = [[perm[1], perm[0], -1], [perm[1], perm[2], -1], [perm[5], perm[2], -1], \
+                     [perm[1], perm[3], 1], [perm[3], perm[2], 1], [perm[0], perm[4], -1], \
+                     [perm[3], perm[4], 1], [perm[5], perm[0], -1], [perm[4], perm[5], -1]]
+        
+        H = Graph(6)
+        H.addEdges(edge_list[3:] + edge_list[:3])
+        
+        self.assertEqual(G.canonicalCode(), H.canonicalCode())
+        self.assertEqual(G, H)
+        
+        # Graphs can be found by canonical code in a dictionary
+        
+        graph_dict = {G.canonicalCode(): G}
+        self.assertIs(graph_dict[H.canonicalCode()], G)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_canonicalCodeColor(self):
+        """
+            Canonical code changes when edge colors change
+        """
+        
+        G = Graph(4, r = 5)
+        G.addEdges([[0, 1], [1, 3], [0, 2], [0, 3], [1, 2], [2, 3]])
+        
+        H = Graph(4, r = 5)
+        H.addEdges([[0, 1], [1, 3], [0, 2], [0, 3], [1, 2], [2, 3]])
+        
+        self.assertEqual(G, H)
+        
+        G.edge(0).setColor(2)
+        G.edge(1).setColor(2)
+        G.edge(2).setColor(2)
+        
+        self.assertNotEqual(G, H)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_frozenGraphSet(self):
+        """
+            Frozen isomorphic graphs are collapsed in a set
+        """
+        
+        G = Graph(4)
+        G.addEdges([[0, 1, 1], [1, 3, 1], [0, 2, -1], [0, 3, -1], [1, 2, -1], [2, 3, -1]])
+        
+        H = Graph(4)
+        H.addEdges([[0, 1, 1], [0, 2, -1], [1, 3, 1], [1, 2, -1], [0, 3, -1], [2, 3, -1]])
+        
+        K = Graph(4)
+        K.addEdges([[0, 1, 1], [0, 2, -1], [1, 3, -1], [1, 2, 1], [0, 3, -1], [2, 3, 1]])
+        
+        graph_set = {G.freeze(), H.freeze(), K.freeze()}
+        
+        self.assertTrue(all([isinstance(graph, FrozenGraph) for graph in graph_set]))
+        self.assertEqual(len(graph_set), 2)
+        self.assertIn(H.freeze(), graph_set)
+        self.assertEqual(G.freeze(), H)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_frozenGraphThaw(self):
+        """
+            Thawed graph has the same edges as the original, and is mutable
+        """
+        
+        G = Graph(4)
+        G.addEdges([[0, 1], [1, 2], [0, 3], [0, 2], [1, 3], [2, 3]])
+        
+        F = G.freeze()
+        
+        with self.assertRaises(AttributeError):
+            F.num_vert = 6
+        
+        H = F.thaw()
+        
+        self.assertEqual(H.edgeRows(), G.edgeRows())
+        self.assertEqual(H, G)
+        
+        H.oneMove(0)
+        
+        self.assertNotEqual(H, G)
+        self.assertEqual(F, G)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_generateCounts(self):
+        """
+            Generated graphs are non-isomorphic, and match the number of
+            planar trivalent graphs with each number of vertices
+        """
+        
+        graph_list = list(generate(8))
+        num_vert_list = [G.numVert() for G in graph_list]
+        
+        self.assertEqual([num_vert_list.count(num_vert) for num_vert in [2, 4, 6, 8]], [2, 6, 26, 191])
+        self.assertEqual(len({G.canonicalCode() for G in graph_list}), len(graph_list))
+
+    #-------------------------------------------------------------------------#
+    
+    def test_generateMoveSubsets(self):
+        """
+            With other moves or seeds, every graph that can be built is still
+            found once, as for a search over all children
+        """
+        
+        K4 = Graph(4)
+        K4.addEdges([[0, 1], [1, 2], [0, 3], [0, 2], [1, 3], [2, 3]])
+        
+        for (moves, seeds) in [([3], None), ([3, 4], None), ([2, 4], None), ([1, 2, 3, 4], [K4])]:
+            seed_list = [G for G in generate(4, moves, seeds) if G.numVert() == (4 if seeds else 2)]
+            code_set = {G.canonicalCode() for G in seed_list}
+            queue = list(seed_list)
+            
+            while len(queue) > 0:
+                parent = queue.pop()
+                
+                if parent.numVert() + 2 > 8:
+                    continue
+                
+                for child in parent.children(moves):
+                    if child.canonicalCode() not in code_set:
+                        code_set.add(child.canonicalCode())
+                        queue += [child]
+            
+            code_list = [G.canonicalCode() for G in generate(8, moves, seeds)]
+            
+            self.assertEqual(len(set(code_list)), len(code_list))
+            self.assertEqual(set(code_list), code_set)
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_generateParallel(self):
+        """
+            Parallel generation gives the same graphs, level by level
+        """
+        
+        serial_list = [G.canonicalCode() for G in generate(6)]
+        parallel_list = [G.canonicalCode() for G in generate(6, workers = 2)]
+        
+        self.assertEqual(sorted(parallel_list), sorted(serial_list))
+        self.assertEqual([len(code) for code in parallel_list], sorted([len(code) for code in parallel_list]))
+
+    #-------------------------------------------------------------------------#
+    
+    def test_enumerateGraphsSink(self):
+        """
+            Graphs of a given size are written one per line, and read back
+            as the same graphs
+        """
+        
+        sink = io.StringIO()
+        code_list = [G.canonicalCode() for G in enumerateGraphs(6, sink = sink)]
+        line_list = sink.getvalue().splitlines()
+        
+        self.assertEqual(len(code_list), 26)
+        self.assertEqual([readEdgeLine(line).canonicalCode() for line in line_list], code_list)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_edgeLine(self):
+        """
+            Colors and orientations are kept in the one-line format
+        """
+        
+        G = Graph(2)
+        G.addEdges([[0, 1, 1], [0, 1, -1], [0, 1]])
+        G.edge(2).setColor(2)
+        
+        self.assertEqual(readEdgeLine(G.edgeLine()).edgeRows(), G.edgeRows())
+        self.assertEqual(readEdgeLine(G.edgeLine()), G)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_packGraph(self):
+        """
+            Packed graph is unpacked to an isomorphic graph
+        """
+        
+        G = Graph(4)
+        G.addEdges([[0, 0], [0, 1], [1, 2], [1, 3], [2, 3], [2, 3]])
+        G.oneMove(2)
+        
+        H = unpackGraph(packGraph(G))
+        
+        self.assertEqual(len(packGraph(G)), 4 * 3 * G.numVert())
+        self.assertEqual(H, G)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_dartGraphMoves(self):
+        """
+            Moves on a DartGraph give the same graphs as on a Graph
+        """
+        
+        G = Graph(4)
+        G.addEdges([[0, 1, 1, 0, 1], [1, 2, 1, 0, 2], [0, 3, -1, 0, 3], [0, 2], [1, 3], [2, 3]])
+        
+        for move in ['oneMove', 'twoMove', 'threeMove', 'fourMove']:
+            for label in range(4 if move == 'threeMove' else 6):
+                H = G.__copy__()
+                D = G.toDartGraph()
+                
+                getattr(H, move)(label)
+                getattr(D, move)(label)
+                
+                H.findFaces()
+                
+                self.assertEqual(D, H)
+                self.assertEqual(D.faceSizeList(), sorted([len(face.edge_list) for face in H.face_list]))
+                
+        D = G.toDartGraph()
+        
+        with self.assertRaises(ValueError):
+            D.oneMove(6)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_dartGraphPachner(self):
+        """
+            Pachner 2-2 move on a DartGraph gives the same graph as on a
+            Graph, and is refused where the two faces share an edge
+        """
+        
+        G = readEdgeLine('0,1 0,1 0,1 | 0,1,2 0,2,1')
+        G.threeMove(0)
+        G.threeMove(1)
+        
+        for label in [0, 7]:
+            H = G.__copy__()
+            D = G.toDartGraph()
+            
+            H.pachner22(label)
+            D.pachner22(label)
+            
+            self.assertEqual(D, H)
+            self.assertEqual(D.face_size_list, [3, 3, 4, 4, 4])
+        
+        D = G.toDartGraph()
+        
+        with self.assertRaises(AttributeError):
+            D.pachner22(1)
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_dartGraphSelfLoop(self):
+        """
+            DartGraph built from edges converts to the same Graph, and the
+            fourMove is not allowed on a self-loop
+        """
+        
+        D = DartGraph(2)
+        D.addEdges([[0, 0], [0, 1], [1, 1]])
+        D.oneMove(0)
+        D.threeMove(1)
+        
+        G = D.toGraph()
+        
+        self.assertEqual(G.edgeRows(), D.edgeRows())
+        G.findFaces()
+        
+        self.assertEqual(D.faceSizeList(), sorted([len(face.edge_list) for face in G.face_list]))
+        self.assertEqual(G, D)
+        
+        with self.assertRaises(ValueError):
+            D.fourMove(5)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_undoMoves(self):
+        """
+            Undoing moves in reverse order restores edges, cyclic orders and
+            faces, without copying the graph
+        """
+        
+        G = Graph(4)
+        G.addEdges([[0, 1, 1, 0, 1], [1, 2, 1, 0, 2], [0, 3, -1, 0, 3], [0, 2], [1, 3], [2, 3]])
+        G.findFaces()
+        
+        edge_list = G.edgeList()
+        edge_rows = G.edgeRows()
+        rotation_rows = G.rotationRows()
+        face_size_list = G.face_size_list
+        
+        token_list = []
+        
+        for (move, label) in [('threeMove', 0), ('oneMove', 3), ('fourMove', 2), ('twoMove', 5), ('pachner22', 1)]:
+            new_edges, token = getattr(G, move)(label, undo = True)
+            token_list += [token]
+            
+        self.assertEqual(G.numVert(), 12)
+        
+        for token in reversed(token_list):
+            G.undo(token)
+            
+        self.assertEqual(G.numVert(), 4)
+        self.assertEqual(G.edgeList(), edge_list)
+        self.assertEqual(G.edgeRows(), edge_rows)
+        self.assertEqual(G.rotationRows(), rotation_rows)
+        self.assertEqual(G.face_size_list, face_size_list)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_undoFindsFaces(self):
+        """
+            A move with undo finds the faces first, if not yet found, so the
+            token only records the vertices, edges and faces near the move
+        """
+        
+        G = readEdgeLine('0,1 0,1 0,1 | 0,1,2 0,2,1')
+        
+        new_edges, token = G.threeMove(0, undo = True)
+        
+        self.assertEqual(len(token[5]), 1)
+        self.assertEqual(G.face_size_list, [3, 3, 3, 3])
+        
+        G.undo(token)
+        
+        self.assertEqual(len(G.face_list), 3)
+        self.assertEqual(G.face_size_list, [2, 2, 2])
+        self.assertEqual(G.face_size_count, Counter({2: 3}))
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_copyKeepsFaces(self):
+        """
+            Copy has the same faces as the original, and is independent of it
+        """
+        
+        G = Graph(4)
+        G.addEdges([[0, 1, 1, 0, 1], [1, 2, 1, 0, 2], [0, 3, -1, 0, 3], [0, 2], [1, 3], [2, 3]])
+        G.findFaces()
+        
+        H = G.__copy__()
+        
+        self.assertEqual(len(H.face_list), 4)
+        self.assertEqual(H.face_size_list, G.face_size_list)
+        self.assertEqual(H.edgeRows(), G.edgeRows())
+        self.assertTrue(all([face in H.face_list for vert in H.vert_list for face in vert.face_list]))
+        
+        H.threeMove(0)
+        
+        self.assertEqual(H.face_size_list, [3, 3, 4, 4, 4])
+        self.assertEqual(G.face_size_list, [3, 3, 3, 3])
+        self.assertEqual(G.numVert(), 4)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_addEdgeArray(self):
+        """
+            Edges given as parallel lists give the same graph as addEdges, and
+            invalid edges are rejected before any edge is added
+        """
+        
+        edge_list = [[0, 1, 1, 0, 1], [1, 2, 1, 0, 2], [0, 3, -1, 0, 3], [0, 2], [1, 3], [2, 3]]
+        
+        G = Graph(4)
+        G.addEdges(edge_list)
+        
+        H = Graph(4)
+        H.addEdgeArray([[0, 1, 0, 0, 1, 2], [1, 2, 3, 2, 3, 3], [1, 1, -1, 0, 0, 0], [0] * 6, [1, 2, 3, 0, 0, 0]])
+        
+        self.assertEqual(H.edgeRows(), G.edgeRows())
+        self.assertEqual(H.rotationRows(), G.rotationRows())
+        
+        K = Graph(4)
+        
+        with self.assertRaises(AttributeError):
+            K.addEdgeArray([[0, 0, 0], [1, 2, 3], [1, 1, 1]])
+            
+        with self.assertRaises(ValueError):
+            K.addEdgeArray([[0, 0, 0, 0], [1, 2, 3, 1]])
+            
+        self.assertEqual(K.edgeList(), [])
+
+    #-------------------------------------------------------------------------#
+    
+    @unittest.skipIf(numpy is None, 'numpy not installed')
+    def test_addEdgeArrayNumpy(self):
+        """
+            Edges can be given as a NumPy array of rows
+        """
+        
+        G = Graph(4)
+        G.addEdges([[0, 1], [1, 2], [0, 3], [0, 2], [1, 3], [2, 3]])
+        
+        H = Graph(4)
+        H.addEdgeArray(numpy.array([[0, 1], [1, 2], [0, 3], [0, 2], [1, 3], [2, 3]]))
+        
+        self.assertEqual(H.edgeRows(), G.edgeRows())
+        self.assertEqual(H, G)
+        
+        with self.assertRaises(ValueError):
+            H.addEdgeArray(numpy.zeros((2, 6), dtype = int))
+        
+        with self.assertRaises(ValueError):
+            H.addEdgeArray(numpy.array([[0, 1]]))
+            
+        with self.assertRaises(ValueError):
+            Graph(2).addEdgeArray(numpy.array([[0, 1.5]]))
+        
+        # Colors and orientations are checked over the whole array
+        
+        K = Graph(2, r = 5)
+        
+        with self.assertRaises(AttributeError):
+            K.addEdgeArray(numpy.array([[0, 1, 0, 1], [0, 1, 0, 1], [0, 1, 0, 1]]))
+            
+        with self.assertRaises(AttributeError):
+            K.addEdgeArray(numpy.array([[0, 1, 1], [0, 1, 1], [0, 1, 1]]))
+            
+        K.addEdgeArray(numpy.array([[0, 1, 1, 2], [0, 1, -1, 2], [0, 1, 0, 2]]))
+        self.assertEqual(K.edgeRows(), [[0, 1, 1, 2, 0], [0, 1, -1, 2, 0], [0, 1, 0, 2, 0]])
+
+    #-------------------------------------------------------------------------#
+    
+    def test_edgeListOrder(self):
+        """
+            EdgeList keeps the same order as a Python list, over many blocks
+        """
+        
+        edge_list = [Edge() for iii in range(1000)]
+        ordered_list = EdgeList(edge_list[:10])
+        python_list = edge_list[:10]
+        
+        for iii in range(10, 1000, 3):
+            after_edge = python_list[(7 * iii) % len(python_list)]
+            new_edges = edge_list[iii:(iii + 3)]
+            
+            place = python_list.index(after_edge) + 1
+            python_list[place:place] = new_edges
+            ordered_list.insertAfter(after_edge, new_edges)
+            
+            if iii % 5 == 0:
+                python_list.remove(after_edge)
+                ordered_list.remove(after_edge)
+                python_list.insert(iii % 17, after_edge)
+                ordered_list.insert(iii % 17, after_edge)
+        
+        self.assertEqual(len(ordered_list), len(python_list))
+        self.assertEqual(list(ordered_list), python_list)
+        self.assertEqual([ordered_list[label] for label in range(len(python_list))], python_list)
+        self.assertEqual([ordered_list.index(edge) for edge in python_list], list(range(len(python_list))))
+        self.assertGreater(len(ordered_list.block_list), 1)
+
+    #-------------------------------------------------------------------------#
+    
+    def test_colorTable(self):
+        """
+            Color table accepts allowed triples in any order, and is shared by
+            the vertices of a graph
+        """
+        
+        table = ColorTable([[1, 1, 1], [1, 2, 2]])
+        
+        self.assertIn([2, 1, 2], table)
+        self.assertIn((2, 2, 1), table)
+        self.assertNotIn([1, 1, 2], table)
+        self.assertNotIn([1, 1, 7], table)
+        self.assertNotIn([1, 1], table)
+        
+        G = Graph(2, r = 5)
+        G.addEdges([[0, 1], [0, 1], [0, 1]])
+        
+        self.assertTrue(all([vert.COLOR_TABLE is G.COLOR_TABLE for vert in G.vert_list]))
+        
+        G.edge(0).setColor(2)
+        G.edge(1).setColor(1)
+        
+        self.assertRaises(AttributeError, G.edge(2).setColor, 2)
+        self.assertTrue(G.edge(2).setColor(1))
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_vertexColorTable(self):
+        """
+            Color lists are validated when the table is built, and vertices
+            added by moves share the table of the graph
+        """
+        
+        self.assertRaises(ValueError, Vertex, 0, [[1, 1]])
+        self.assertRaises(ValueError, Vertex, 0, [[1, 1, 2.0]])
+        self.assertRaises(ValueError, ColorTable, [[1, 1, 2], [1, 2]])
+        self.assertEqual(Vertex(0, [[1, 1, 2]]).ALLOWED_COLOR_LIST, [[1, 1, 2]])
+        
+        G = Graph(2, r = 40)
+        G.addEdges([[0, 1], [0, 1], [0, 1]])
+        G.oneMove(0)
+        G.twoMove(0, 1)
+        G.addVertices(2)
+        
+        self.assertTrue(all([vert.COLOR_TABLE is G.COLOR_TABLE for vert in G.vert_list]))
+        self.assertTrue(all([vert.ALLOWED_COLOR_LIST is G.ALLOWED_COLOR_LIST for vert in G.vert_list]))
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_colorList(self):
+        """
+            Allowed triples satisfy the SU(2)_q conditions, are computed once
+            for each r, and agree with the flat array form
+        """
+        
+        self.assertEqual(colorList(5), [[1, 1, 2], [1, 2, 3], [2, 2, 2]])
+        self.assertEqual(colorList(3), [])
+        
+        r = 12
+        expected = [[iii, jjj, kkk] for iii in range(1, r) for jjj in range(iii, r) for kkk in range(jjj, r) \
+                    if (iii + jjj + kkk) % 2 == 0 and kkk <= iii + jjj and iii + jjj + kkk <= 2 * r - 4]
+        
+        self.assertEqual(colorList(r), expected)
+        self.assertIs(colorList(r), colorList(r))
+        self.assertEqual(list(colorArray(r)), [color for triad in expected for color in triad])
+        self.assertIs(Graph(2, r = r).COLOR_TABLE, Graph(4, r = r).COLOR_TABLE)
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_iterColorings(self):
+        """
+            All admissible colorings are found, without changing the graph
+        """
+        
+        G = Graph(2, r = 5)
+        G.addEdges([[0, 1], [0, 1], [0, 1]])
+        
+        coloring_list = [list(coloring) for coloring in G.iterColorings()]
+        
+        self.assertEqual(len(coloring_list), 10)
+        self.assertIn([3, 1, 2], coloring_list)
+        self.assertEqual(G.colorList(), [None, None, None])
+        
+        # Compare with all colorings checked one at a time
+        
+        G.oneMove(0)
+        G.oneMove(1)
+        
+        allowed_list = colorList(5)
+        expected = [list(coloring) for coloring in product(range(1, 4), repeat = 9) \
+                    if all([sorted([coloring[label] for label in rotation]) in allowed_list \
+                            for rotation in G.rotationRows()])]
+        
+        self.assertEqual(sorted([list(coloring) for coloring in G.iterColorings(5)]), expected)
+        
+        # Colors already on the graph are kept
+        
+        G.edge(0).setColor(2)
+        
+        self.assertEqual(sorted([list(coloring) for coloring in G.iterColorings(5)]), \
+                         [coloring for coloring in expected if coloring[0] == 2])
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_stateSum(self):
+        """
+            State sum counts colorings by default, and agrees with the sum
+            over iterColorings for given weights, including self-loops
+        """
+        
+        G = Graph(2, r = 5)
+        G.addEdges([[0, 1], [0, 1], [0, 1]])
+        
+        self.assertEqual(G.stateSum(), 10)
+        
+        G.oneMove(0)
+        G.fourMove(2)
+        
+        vertex_weight = lambda iii, jjj, kkk: 5 * iii + 3 * jjj + kkk
+        edge_weight = [0, 2, 3, 7, 1]
+        
+        expected = 0
+        
+        for coloring in G.iterColorings(6):
+            term = 1
+            for rotation in G.rotationRows():
+                term *= vertex_weight(*[coloring[label] for label in rotation])
+            for color in coloring:
+                term *= edge_weight[color]
+            expected += term
+            
+        self.assertEqual(G.stateSum(r = 6), len(list(G.iterColorings(6))))
+        self.assertEqual(G.stateSum(vertex_weight, edge_weight, 6), expected)
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_stateSumLarge(self):
+        """
+            State sums stay exact when the sums do not fit in float64, and
+            real or other weights are summed as they are
+        """
+        
+        G = Graph(2)
+        G.addEdges([[0, 1], [0, 1], [0, 1]])
+        G.oneMove(0)
+        G.fourMove(2)
+        G.twoMove(1)
+        
+        def expected(vertex_weight, edge_weight, r):
+            total = 0
+            
+            for coloring in G.iterColorings(r):
+                term = 1
+                for rotation in G.rotationRows():
+                    term *= vertex_weight(*[coloring[label] for label in rotation])
+                for color in coloring:
+                    term *= edge_weight(color)
+                total += term
+            
+            return total
+        
+        vertex_weight = lambda iii, jjj, kkk: 10 ** 6 * iii - jjj * kkk
+        edge_weight = lambda color: 3 ** 20 - color
+        
+        self.assertEqual(G.stateSum(vertex_weight, edge_weight, 6), expected(vertex_weight, edge_weight, 6))
+        self.assertEqual(G.stateSum(lambda iii, jjj, kkk: 10 ** 40 * iii, None, 5), \
+                         expected(lambda iii, jjj, kkk: 10 ** 40 * iii, lambda color: 1, 5))
+        
+        weight_sum = G.stateSum(lambda iii, jjj, kkk: iii / 2, lambda color: Fraction(1, color), 5)
+        
+        self.assertEqual(type(weight_sum), float)
+        self.assertAlmostEqual(weight_sum, float(expected(lambda iii, jjj, kkk: Fraction(iii, 2), \
+                                                          lambda color: Fraction(1, color), 5)))
+        self.assertEqual(G.stateSum(None, lambda color: Fraction(1, color), 5), \
+                         expected(lambda iii, jjj, kkk: 1, lambda color: Fraction(1, color), 5))
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_quantumTable(self):
+        """
+            Quantum symbols are shared for each r, and the 6j symbols satisfy
+            the orthogonality relation
+        """
+        
+        table = quantumTable(5)
+        
+        self.assertIs(table, quantumTable(5))
+        self.assertAlmostEqual(table.qdim[1], -(1 + 5 ** 0.5) / 2)
+        self.assertAlmostEqual(table.theta[1][1][2], table.theta[2][1][1])
+        self.assertEqual(table.theta[1][1][1], 0)
+        
+        for (aaa, bbb, ccc, ddd) in product(range(table.size), repeat = 4):
+            for (iii, kkk) in product(range(table.size), repeat = 2):
+                if all([table.admissible(*triad) for triad in [(aaa, ddd, iii), (bbb, ccc, iii), \
+                                                               (aaa, ddd, kkk), (bbb, ccc, kkk)]]):
+                    total = sum([table.sixj(aaa, bbb, iii, ccc, ddd, jjj) * table.sixj(ddd, aaa, jjj, bbb, ccc, kkk) \
+                                 for jjj in range(table.size)])
+                    
+                    self.assertAlmostEqual(total, 1 if iii == kkk else 0)
+        
+    #-------------------------------------------------------------------------#
+    
+    @unittest.skipIf(numpy is None, 'numpy not installed')
+    def test_cyclotomic(self):
+        """
+            Exact quantum symbols agree with the floating point ones, and the
+            6j symbols are exactly orthogonal
+        """
+        
+        zeta = Cyclotomic(5, [0, 1])
+        
+        self.assertEqual(zeta ** 10, 1)
+        self.assertEqual(zeta ** 5, -1)
+        self.assertEqual(zeta * zeta.inverse(), 1)
+        self.assertEqual((zeta + 1) / (zeta + 1), 1)
+        self.assertAlmostEqual(complex(zeta + zeta.conjugate()), 2 * numpy.cos(numpy.pi / 5))
+        
+        exact = quantumTable(6, exact = True)
+        approx = quantumTable(6)
+        
+        self.assertEqual(exact.qint[6], 0)
+        self.assertEqual(exact.qint[2] * exact.qint[2], exact.qint[1] + exact.qint[3])
+        self.assertAlmostEqual(float(exact.theta[2][3][3]), approx.theta[2][3][3])
+        self.assertAlmostEqual(float(exact.tet(3, 3, 2, 3, 3, 2)), approx.tet(3, 3, 2, 3, 3, 2))
+        
+        for (iii, kkk) in product([0, 2, 4], repeat = 2):
+            total = sum([exact.sixj(2, 2, iii, 2, 2, jjj) * exact.sixj(2, 2, jjj, 2, 2, kkk) for jjj in [0, 2, 4]])
+            
+            self.assertEqual(total, 1 if iii == kkk else 0)
+        
+    #-------------------------------------------------------------------------#
+    
+    @unittest.skipIf(numpy is None, 'numpy not installed')
+    def test_cyclotomicOverflow(self):
+        """
+            Coefficients are int64 while small, and Python integers once a
+            result would not fit, without losing exactness
+        """
+        
+        zeta = Cyclotomic(5, [0, 1])
+        big = zeta * 2 ** 40 + 1
+        
+        self.assertEqual(zeta.coef.dtype, numpy.int64)
+        self.assertEqual((big * big).coef.dtype, object)
+        self.assertEqual(big * big * big.inverse(), big)
+        self.assertEqual((big * big - 2 ** 80 * zeta * zeta - 2 ** 41 * zeta).coef.dtype, numpy.int64)
+        self.assertEqual(big * big - 2 ** 80 * zeta * zeta - 2 ** 41 * zeta, 1)
+        
+        # Zero has height 0, but a large denominator must still widen it
+        
+        small = Cyclotomic(5, [1, 1], den = 3 ** 50)
+        
+        self.assertEqual(Cyclotomic(5) + small, small)
+        self.assertEqual(small + Cyclotomic(5), small)
+        self.assertEqual(small - small, 0)
+        self.assertFalse(zeta == 0.5)
+        self.assertIs(zeta.__eq__(0.5), NotImplemented)
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_stateSumSweep(self):
+        """
+            Sweeping over r gives the same results as separate state sums
+        """
+        
+        G = Graph(2)
+        G.addEdges([[0, 1], [0, 1], [0, 1]])
+        G.oneMove(0)
+        G.fourMove(2)
+        
+        count_dict = G.stateSumSweep(range(4, 8))
+        
+        self.assertEqual(sorted(count_dict), [4, 5, 6, 7])
+        self.assertEqual([count_dict[r] for r in range(4, 8)], [len(list(G.iterColorings(r))) for r in range(4, 8)])
+        
+        weight_dict = G.stateSumSweep([5, 7], lambda r: (lambda iii, jjj, kkk: r * iii + jjj * kkk), \
+                                      lambda r: list(range(r)))
+        
+        for r in [5, 7]:
+            self.assertEqual(weight_dict[r], G.stateSum(lambda iii, jjj, kkk: r * iii + jjj * kkk, list(range(r)), r))
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_setColors(self):
+        """
+            All edge colors are set together, or none are if some vertex
+            rule is broken
+        """
+        
+        G = Graph(2, r = 5)
+        G.addEdges([[0, 1], [0, 1], [0, 1]])
+        G.oneMove(0)
+        
+        G.setColors([1, 1, 2, 3, 2, 2])
+        
+        self.assertEqual(G.colorList(), [1, 1, 2, 3, 2, 2])
+        self.assertEqual(G.vertex(0).color_list, [1, 2, 3])
+        self.assertEqual(G.colorViolations([1, 1, 1, 1, 2, 2]), [0, 1])
+        
+        with self.assertRaises(AttributeError) as context:
+            G.setColors([1, 1, 1, 1, 2, 2])
+            
+        self.assertIn('[0, 1]', str(context.exception))
+        self.assertEqual(G.colorList(), [1, 1, 2, 3, 2, 2])
+        
+        G.setColors([0, 1, 2, 3, 2, 2])
+        
+        self.assertEqual(G.colorList(), [None, 1, 2, 3, 2, 2])
+        
+    #-------------------------------------------------------------------------#
+    
+    @unittest.skipIf(numpy is None, 'numpy not installed')
+    def test_checkColorings(self):
+        """
+            Checking an array of colorings agrees with iterColorings
+        """
+        
+        G = Graph(2, r = 5)
+        G.addEdges([[0, 1], [0, 1], [0, 1]])
+        G.oneMove(0)
+        G.oneMove(1)
+        
+        coloring_array = numpy.array(list(product(range(1, 4), repeat = 9)))
+        allowed = G.checkColorings(coloring_array)
+        
+        self.assertEqual(sorted(coloring_array[allowed].tolist()), sorted([list(coloring) for coloring in G.iterColorings()]))
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_setOrientations(self):
+        """
+            All orientations are set together, matching edges added with
+            orientations, or none are if a source or sink would appear
+        """
+        
+        G = Graph(4)
+        G.addEdges([[0, 1], [1, 3], [0, 2], [0, 3], [1, 2], [2, 3]])
+        
+        H = Graph(4)
+        H.addEdges([[0, 1, 1], [1, 3, 1], [0, 2, -1], [0, 3, -1], [1, 2, -1], [2, 3, -1]])
+        
+        G.setOrientations([1, 1, -1, -1, -1, -1])
+        
+        self.assertEqual([vert.in_arrow for vert in G.vert_list], [vert.in_arrow for vert in H.vert_list])
+        self.assertEqual(G, H)
+        
+        with self.assertRaises(AttributeError) as context:
+            G.setOrientations([1, 1, 1, 1, 1, 1])
+            
+        self.assertIn('[0, 3]', str(context.exception))
+        self.assertEqual(G.orientList(), [1, 1, -1, -1, -1, -1])
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_findFacesLarge(self):
+        """
+            Faces of a larger planar graph use each side of every edge once,
+            and agree with the faces at each vertex
+        """
+        
+        G = readEdgeLine('0,1 0,1 0,1 | 0,1,2 0,2,1')
+        
+        for iii in range(300):
+            G.twoMove((7 * iii) % len(G.edge_list))
+            
+        G.face_list = []
+        G.findFaces()
+        
+        self.assertEqual(len(G.face_list), 2 + G.num_vert // 2)
+        self.assertEqual(sum(G.face_size_list), 2 * len(G.edge_list))
+        self.assertTrue(all([edge in edge.face_left.edge_list and edge in edge.face_right.edge_list \
+                             for edge in G.edge_list]))
+        self.assertTrue(all([vert.edge_order[place] in vert.face_list[place].edge_list \
+                             for vert in G.vert_list for place in range(3)]))
+        
+    #-------------------------------------------------------------------------#
+    
+    def test_movesKeepFaces(self):
+        """
+            Once faces are found, every move keeps them up to date, giving
+            the same faces as tracing them again
+        """
+        
+        def faceCycles(G):
+            edge_label_dict = {edge: label for label, edge in enumerate(G.edge_list)}
+            cycle_dict = {}
+            
+            for face in G.face_list:
+                labels = [edge_label_dict[edge] for edge in face.edge_list]
+                cycle_dict[face] = min([tuple(labels[iii:] + labels[:iii]) for iii in range(len(labels))])
+            
+            return (sorted(cycle_dict.values()), \
+                    [(cycle_dict[edge.face_left], cycle_dict[edge.face_right]) for edge in G.edge_list], \
+                    [[cycle_dict[face] for face in vert.face_list] for vert in G.vert_list])
+        
+        G = readEdgeLine('0,1 0,1 0,1 | 0,1,2 0,2,1')
+        G.findFaces()
+        
+        for iii in range(60):
+            move = ['oneMove', 'twoMove', 'threeMove', 'fourMove', 'pachner22'][iii % 5]
+            num = G.num_vert if move == 'threeMove' else len(G.edge_list)
+            H = G.__copy__()
+            
+            try:
+                getattr(G, move)((5 * iii) % num)
+            except (ValueError, AttributeError):
+                G = H
+                continue
+            
+            H = G.__copy__()
+            H.face_list = []
+            H.findFaces()
+            
+            self.assertEqual(len(G.face_list), 2 + G.num_vert // 2)
+            self.assertEqual(faceCycles(G), faceCycles(H))
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_faceSizeCount(self):
+        """
+            Moves keep the count of faces of each size, which gives the sorted
+            list of face sizes, is put back by undo, and tells apart graphs
+        """
+        
+        G = readEdgeLine('0,1 0,1 0,1 | 0,1,2 0,2,1')
+        G.findFaces()
+        
+        self.assertEqual(G.face_size_count, Counter({2: 3}))
+        
+        G.threeMove(0)
+        H = G.__copy__()
+        new_edges, token = G.fourMove(1, undo = True)
+        
+        self.assertEqual(G.face_size_count, Counter([len(face.edge_list) for face in G.face_list]))
+        self.assertEqual(G.face_size_list, sorted([len(face.edge_list) for face in G.face_list]))
+        self.assertEqual(H.face_size_list, [3, 3, 3, 3])
+        
+        G.undo(token)
+        
+        self.assertEqual(G.face_size_count, H.face_size_count)
+        self.assertEqual(G.face_size_list, [3, 3, 3, 3])
+        
+        G.oneMove(0)
+        H.twoMove(0)
+        
+        self.assertNotEqual(G.face_size_count, H.face_size_count)
+        self.assertFalse(G == H)
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_automorphisms(self):
+        """
+            Automorphism group of the planar theta graph and tetrahedron, with
+            orbits, generators preserving the rotation system, and a colored
+            edge cutting down the group
+        """
+        
+        G = readEdgeLine('0,1 0,1 0,1 | 0,1,2 0,2,1')
+        [generator_list, order, vert_orbit, edge_orbit, dart_orbit] = G.automorphisms()
+        
+        self.assertEqual(order, 6)
+        self.assertEqual(list(vert_orbit), [0, 0])
+        self.assertEqual(list(edge_orbit), [0, 0, 0])
+        
+        G.threeMove(0)
+        [generator_list, order, vert_orbit, edge_orbit, dart_orbit] = G.automorphisms()
+        [vert_deg, opp, dart_attr] = G.dartTable()
+        
+        self.assertEqual(order, 12)
+        self.assertEqual(set(dart_orbit), {0})
+        self.assertTrue(all([generator[opp[dart]] == opp[generator[dart]] \
+                             for generator in generator_list for dart in range(len(opp))]))
+        self.assertEqual(len(G.graphSym(non_iso_edges = False)[1]), 12)
+        
+        G.edge_list[0].setColor(2)
+        [generator_list, order, vert_orbit, edge_orbit, dart_orbit] = G.automorphisms()
+        
+        self.assertEqual(order, 2)
+        self.assertEqual(list(edge_orbit), [0, 1, 2, 2, 4, 1])
+        self.assertEqual(G.graphSym(), [[0, 2], [0, 1, 2, 4]])
+        
+        H = Graph(4)
+        H.addEdges([[0, 1], [0, 1], [0, 1], [2, 3], [2, 3], [2, 3]])
+        
+        with self.assertRaises(ValueError):
+            H.automorphisms()
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_childrenOrbits(self):
+        """
+            Children are found at one site in each orbit, giving the same
+            graphs as applying the moves at every site
+        """
+        
+        G = readEdgeLine('0,1 0,1 0,1 | 0,1,2 0,2,1')
+        G.threeMove(0)
+        
+        code_set = set()
+        
+        for (move, num_sites) in [('oneMove', 6), ('twoMove', 6), ('threeMove', 4), ('fourMove', 6)]:
+            for (label, reverse) in product(range(num_sites), [False, True]):
+                H = G.__copy__()
+                
+                if reverse:
+                    H.reverseEdge(label)
+                
+                getattr(H, move)(label)
+                code_set.add(H.canonicalCode())
+        
+        child_list = list(G.children())
+        
+        self.assertEqual(len(child_list), 4)
+        self.assertEqual({child.canonicalCode() for child in child_list}, code_set)
+        
+        G.edge_list[0].setColor(2)
+        
+        self.assertEqual(len(list(G.children([3]))), 2)
+    
+    #-------------------------------------------------------------------------#
+    
+    def test_reverseEdge(self):
+        """
+            Reversing an edge, including a self-loop, gives an isomorphic graph
+        """
+        
+        G = Graph(2)
+        G.addEdges([[0, 0], [0, 1], [1, 1]])
+        
+        H = G.__copy__()
+        H.reverseEdge(0)
+        H.reverseEdge(1)
+        
+        self.assertEqual(H.edge(1).start.label, 1)
+        self.assertEqual(H.edge(1).end.label, 0)
+        self.assertEqual(G, H)
         
 #=============================================================================#
 
@@ -58,20 +58,35 @@ consistent with the overall graph edge list. This should be fixed.
 * HOW TO CHECK that the cyclic orders and edge list are consistent for a graph?
 """
 
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial, reduce
 from itertools import product
+from math import cos, gcd, isqrt, pi, sin
+from random import Random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 #=== Helper functions ========================================================#
 
+@lru_cache(maxsize = None)
 def colorList(r):
     """
     Find all possible colorings of stubs incident on a trivalent vertex when
     using representations of SU(2)_q, with q = exp(i pi / r) and r >= 3. The
-    conditions for the three colors i, j, k are
+    conditions for the three colors i <= j <= k are
     
-    (1) i, j, k from [0, 1, ..., r - 1]
-    (2) i + j - k is positive and even, as are j + k - i, k + i - j
+    (1) i, j, k from [1, 2, ..., r - 2]
+    (2) i + j + k is even, and k <= i + j
     (3) i + j + k <= 2r - 4
     
+    so the triples are enumerated directly. The result is cached for each r,
+    and the same list is returned on every call, so it should not be changed.
+    
     Parameters
     ----------
     r : int
@@ -86,2099 +101,5596 @@ def colorList(r):
 
     """
     
-    # Create list to keep results in
-    
     edge_color_list = []
     
-    # Create lists to increment colors
-    # along two of three edges
-    
-    add12 = [1, 1, 0]
-    add13 = [1, 0, 1]
-    add23 = [0, 1, 1]
-    
-    # Start queue with all three colors
-    # equal to zero, then build up other
-    # possibilities by adding one to
-    # two of the edges
-    
-    edge_color_queue = [[0, 0, 0]]
-    
-    while len(edge_color_queue) > 0:
-        current_vertex = edge_color_queue.pop()
-        
-        # Add to results lists, if not already there,
-        # then process; otherwise, skip this list
-        
-        if (0 not in current_vertex) and (current_vertex not in edge_color_list):
-            edge_color_list += [current_vertex]
-        
-        # Create next possible entries for queue,
-        # if adding two to color sum does not
-        # exceed limit on sum
-        
-        if sum(current_vertex) <= (2 * r - 6):
-            
-            # Increment colors on 1st, 2nd edges, then
-            # see if this is already in queue
-            
-            next_vertex = sorted([sum(iii) for iii in zip(current_vertex, add12)])
-            
-            if next_vertex not in edge_color_queue:
-                edge_color_queue += [next_vertex]
-            
-            # Increment colors on 1st, 3rd edges, then
-            # see if this is already in queue
-            
-            next_vertex = sorted([sum(iii) for iii in zip(current_vertex, add13)])
+    for iii in range(1, r - 1):
+        for jjj in range(iii, r - 1):
             
-            if next_vertex not in edge_color_queue:
-                edge_color_queue += [next_vertex]
-                
-            # Increment colors on 2nd, 3rd edges, then
-            # see if this is already in queue
+            # Third color has the parity of i + j, and is bounded
+            # both by the triangle inequality and by the sum limit
             
-            next_vertex = sorted([sum(iii) for iii in zip(current_vertex, add23)])
+            max_kkk = min(iii + jjj, 2 * r - 4 - iii - jjj)
             
-            if next_vertex not in edge_color_queue:
-                edge_color_queue += [next_vertex]
+            for kkk in range(jjj + iii % 2, max_kkk + 1, 2):
+                edge_color_list += [[iii, jjj, kkk]]
                 
-    # Return resulting list
+    return edge_color_list
+
+#-----------------------------------------------------------------------------#
+
+@lru_cache(maxsize = None)
+def colorArray(r):
+    """
+    Flat array form of colorList(r), with the three colors of each triple
+    stored consecutively. The array supports the buffer protocol, so it can
+    be viewed without copying by numpy.frombuffer(...).reshape(-1, 3).
+    
+    Parameters
+    ----------
+    r : int
+        Parameter defining root of unity q for representations
+        of SU(2)_q used to color edges.
+
+    Returns
+    -------
+    array
+        Array of type 'i' holding the allowed triples in sorted order.
+
+    """
     
-    return sorted(edge_color_list)
+    return array('i', [color for triad in colorList(r) for color in triad])
 
 #-----------------------------------------------------------------------------#
 
-class UnionFind:
+@lru_cache(maxsize = None)
+def colorTable(r = None):
+    """
+    Admissibility table for the allowed colors at a trivalent vertex, built
+    once for each r and shared by every graph using it. With r = None, the
+    only allowed triple is the placeholder [0, 0, 0].
     
-    def __init__(self, num_edges):
-        self.num_edges = num_edges
-        self.root_list = list(range(num_edges))
-        
-    def findRoot(self, label):
-        if self.root_list[label] == label:
-            return label
-        
-        return self.findRoot(self.root_list[label])
+    Parameters
+    ----------
+    r : int, optional
+        Parameter defining root of unity q for representations
+        of SU(2)_q used to color edges.
+
+    Returns
+    -------
+    ColorTable
+        Lookup table of allowed color triples.
+
+    """
     
-    def join(self, iii, jjj):
-        iii_root = self.findRoot(iii)
-        jjj_root = self.findRoot(jjj)
-        
-        self.root_list[max(iii_root, jjj_root)] = min(iii_root, jjj_root)
-        
-    def printRoots(self):
-        return [self.root_list[iii] for iii in range(self.num_edges) \
-                if iii == self.root_list[iii]] 
+    return ColorTable(colorList(r) if r else [[0, 0, 0]])
 
-#=============================================================================#
+#-----------------------------------------------------------------------------#
 
-class Vertex:
+@lru_cache(maxsize = 32)
+def quantumTable(r, exact = False):
+    """
+    Quantum integers, dimensions, theta and tetrahedral symbols for the
+    representations of SU(2)_q with q = exp(i pi / r), as a QuantumTable. The
+    tables are kept for the 32 most recently used values of r.
     
-    def __init__(self, label = None, COLOR_LIST = None):
-        
-        if label and (type(label) != int or label < 0):
-            raise ValueError('vertex label must be non-negative integer')
-            
-        if COLOR_LIST and (type(COLOR_LIST) != list or not all([len(triad) == 3 for triad in COLOR_LIST]) or \
-            not all([all([type(label) == int for label in triad]) for triad in COLOR_LIST])):
-                
-            raise ValueError('color list must be list of integer triples')
-        
-        self.label = label
-        
-        # Edge order is list of edges incident to vertex, given in CCW order
-        
-        self.edge_order = []
-        
-        # Color list records colors for edges incident to vertex, to ensure
-        # they meet SU_q(2) requirements; allowed color list constant records
-        # all triples that meet these requirements.
-        
-        self.color_list = []
-        
-        if COLOR_LIST:
-            self.ALLOWED_COLOR_LIST = COLOR_LIST
-        else:
-            self.ALLOWED_COLOR_LIST = []
-        
-        # Arrow list keeps track of edge orientations pointing into (+1) or
-        # out of (-1) the vertex. If zero is given, edge has no orientation.
-        
-        self.in_arrow = []
-        
-        # List of faces that are incident to the vertex
-        
-        self.face_list = [None] * 3
-        
-    #-------------------------------------------------------------------------#
-        
-    def __repr__(self):
-        return repr(self.label)
-        
-    #-------------------------------------------------------------------------#
+    Parameters
+    ----------
+    r : int
+        Parameter defining root of unity q for representations
+        of SU(2)_q used to color edges.
+    exact : bool, optional
+        If True, symbols are exact Cyclotomic numbers rather than floats.
     
-    def connectEdge(self, added_edge = None):
-        """
-            Connect given edge to vertex, placing next in CCW order
-        """
-        
-        if len(self.edge_order) == 3:
-            raise ValueError('Vertex {} already trivalent'.format(self.label))
-            
-        # if self != added_edge.start or self != added_edge.end:
-        #     raise ValueError('Vertex {} not incident to added edge'.format(self.label))
-        
-        # Check whether edge has orientation; if so, compute whether this
-        # orientation points towards (+) or away from (-) the vertex. This
-        # value is stored separately, just in case a source/sink would be
-        # created by the connected edge.
-        
-        if added_edge.orient:
-            if (added_edge.orient > 0 and self == added_edge.end) or \
-                (added_edge.orient < 0 and self == added_edge.start):
-                    
-                added_arrow = 1
-            else:
-                added_arrow = -1
-        else:
-            added_arrow = 0
-        
-        # Check here if source or sink created
-        
-        if abs(sum(self.in_arrow) + added_arrow) == 3:
-            raise AttributeError('Edge orientation results in source or sink')
-            
-        # Check that colors assigned are valid; only check if all three colors
-        # are assigned (i.e. no zeros appear in list)
-        
-        if added_edge.color:
-            added_color = added_edge.color
-        else:
-            added_color = 0
-            
-        temp_color_list = sorted([color for color in self.color_list] + [added_color])
-        if (0 not in temp_color_list) and len(temp_color_list) == 3 and \
-            temp_color_list not in self.ALLOWED_COLOR_LIST:
-            raise AttributeError('Edge color does not satisfy vertex rules')
-        
-        # All tests passed
-            
-        self.edge_order += [added_edge]
-        self.color_list += [added_color]
-        self.in_arrow += [added_arrow]
-        
-        return True
-        
-    #-------------------------------------------------------------------------#
+    Returns
+    -------
+    QuantumTable
+        Tables of quantum symbols, indexed by color.
     
-    def replaceEdge(self, remove_edge = None, added_edge = None):
-        """
-            Remove edge from vertex cyclic order, place new edge in same location
-        """
-        
-        if remove_edge not in self.edge_order:
-            raise ValueError('Edge to remove not incident to vertex {}'.format(self.label))
-            
-        place = self.edge_order.index(remove_edge)
-        
-        # If remove_edge is a self-loop, replace the second instance of the
-        # edge; assumes trivalent vertex, and that we are not replacing a
-        # self-loop with another self-loop
+    """
+    
+    if type(r) != int or r <= 3:
+        raise ValueError('r value must be >= 4')
+    
+    return QuantumTable(r, exact)
+
+#-----------------------------------------------------------------------------#
+
+@lru_cache(maxsize = None)
+def cyclotomicPolynomial(m):
+    """
+    Integer coefficients of the m-th cyclotomic polynomial, lowest power
+    first, found by dividing x^m - 1 by the cyclotomic polynomials of the
+    proper divisors of m.
+    
+    Parameters
+    ----------
+    m : int
+        Order of the roots of unity.
+    
+    Returns
+    -------
+    tuple
+        Coefficients of the monic polynomial, of degree phi(m).
+    
+    """
+    
+    poly = [-1] + [0] * (m - 1) + [1]
+    
+    for ddd in range(1, m):
+        if m % ddd == 0:
+            divisor = cyclotomicPolynomial(ddd)
             
-        if added_edge.orient:
-            if (added_edge.orient > 0 and self == added_edge.end) or \
-                (added_edge.orient < 0 and self == added_edge.start):
-                    
-                replace_arrow = 1
-            else:
-                replace_arrow = -1
-        else:
-            replace_arrow = 0
+            # Exact division by a monic polynomial
             
-            # FOR NOW, assume that there is no self-loop involved; FIX LATER
+            quotient = [0] * (len(poly) - len(divisor) + 1)
             
-            # if self.edge_order[(place + 1) % 3] == remove_edge:
-            #     self.edge_order[(place + 1) % 3] = added_edge
-            #     place = (place + 1) % 3
-            # else:
-            #     self.edge_order[place] = added_edge
-            # self.in_arrow[place] = 0
+            for place in range(len(quotient) - 1, -1, -1):
+                quotient[place] = poly[place + len(divisor) - 1]
+                for offset, coef in enumerate(divisor):
+                    poly[place + offset] -= quotient[place] * coef
             
-            # return True
-        
-        # Since self.in_arrow already has the old value, we added twice the
-        # new value; if this is equal to +/- 3, then we have a source or sink.
-        # If orientation does not change, then test is unnecessary.
+            poly = quotient
     
-        if replace_arrow != self.in_arrow[place] and abs(sum(self.in_arrow) + 2 * replace_arrow) == 3:
-            raise AttributeError('Orientation change results in source or sink')
-            
-        # Check that colors are still valid at vertex
-        
-        if added_edge.color:
-            replace_color = added_edge.color
+    return tuple(poly)
+
+#-----------------------------------------------------------------------------#
+
+@lru_cache(maxsize = 32)
+def cyclotomicBasis(r):
+    """
+    Data for arithmetic in Q(z), z = exp(i pi / r), using the power basis
+    1, z, ..., z^(n - 1) with n = phi(2r): a matrix (numpy int64 array) whose
+    row m gives z^m in the basis, for 0 <= m < 2r, the exponents k prime to
+    2r, which give the Galois automorphisms z -> z^k, and the largest sum of
+    absolute values in a column of the matrix, bounding how much a product
+    with it can grow the coefficients.
+    
+    Parameters
+    ----------
+    r : int
+        Parameter defining root of unity q for representations
+        of SU(2)_q used to color edges.
+    
+    Returns
+    -------
+    tuple
+        Basis size n, power matrix, list of exponents k, and bound.
+    
+    """
+    
+    if numpy is None:
+        raise ImportError('cyclotomicBasis needs numpy')
+    
+    poly = cyclotomicPolynomial(2 * r)
+    size = len(poly) - 1
+    
+    power_matrix = numpy.zeros((2 * r, size), dtype = object)
+    row = [0] * size
+    
+    for power in range(2 * r):
+        if power < size:
+            row = [0] * size
+            row[power] = 1
         else:
-            replace_color = 0
-            
-        if replace_color != self.color_list[place]:
-            temp_color_list = [color for color in self.color_list]
-            temp_color_list[place] = replace_color
             
-            if (0 not in temp_color_list) and len(temp_color_list) == 3 and \
-                temp_color_list not in self.ALLOWED_COLOR_LIST:
-                raise AttributeError('Edge color does not satisfy vertex rules')
+            # Multiply previous row by z, then replace z^n using the
+            # cyclotomic polynomial
             
-        # All tests passed
+            top = row[-1]
+            row = [0] + row[:-1]
+            row = [entry - top * coef for entry, coef in zip(row, poly[:-1])]
         
-        self.edge_order[place] = added_edge
-        self.color_list[place] = replace_color
-        self.in_arrow[place] = replace_arrow
-            
-        # else:
-        #     if self.edge_order[(place + 1) % 3] == remove_edge:
-        #         self.edge_order[(place + 1) % 3] = added_edge
-        #         place = (place + 1) % 3
-        #     else:
-        #         self.edge_order[place] = added_edge
-        #     self.in_arrow[place] = replace_arrow
-            
+        power_matrix[power] = row
+    
+    unit_list = [kkk for kkk in range(1, 2 * r) if gcd(kkk, 2 * r) == 1]
+    power_bound = int(numpy.abs(power_matrix).sum(axis = 0).max())
+    
+    if power_bound < Cyclotomic.INT_LIMIT:
+        power_matrix = power_matrix.astype(numpy.int64)
+    
+    return (size, power_matrix, unit_list, power_bound)
+
+#-----------------------------------------------------------------------------#
+
+def canonicalDartCode(vert_deg, opp, dart_attr):
+    """
+    Find the canonical code of a rotation system given in terms of darts
+    (half-edges). The darts of vertex v are numbered consecutively, in CCW
+    order, after those of vertices 0, ..., v - 1. Starting from a given dart,
+    the vertices are relabeled in breadth-first order, with the darts of each
+    vertex listed CCW from the dart the vertex was first reached by; the code
+    lists, for every vertex, its degree and then for each dart the new label
+    and relative position of the opposite dart, followed by the dart
+    attributes. The canonical code is the lexicographically smallest such code
+    over all starting darts, taken per connected component.
+
+    Parameters
+    ----------
+    vert_deg : list
+        Degree of each vertex.
+    opp : list
+        Opposite dart for each dart, i.e. the other half of the same edge.
+    dart_attr : list
+        Tuple of integer attributes for each dart, such as the orientation
+        relative to the dart, the color and the twist.
+
+    Returns
+    -------
+    tuple
+        Canonical code; two rotation systems are isomorphic (preserving the
+        cyclic orders and the attributes) if and only if their codes are equal.
+
+    """
+
+    num_vert = len(vert_deg)
+    first, dart_vert = dartOffsets(vert_deg)
+
+    # Find the minimum code over all starting darts in each component, then
+    # sort the component codes so that the result does not depend on labels
+
+    seen = [False] * num_vert
+    comp_code_list = []
+
+    for vert in range(num_vert):
+        if seen[vert]:
+            continue
+
+        best_code = None
+
+        for start in traceComponent(vert, first, vert_deg, dart_vert, opp, seen):
+            code = dartCode(start, first, vert_deg, dart_vert, opp, dart_attr, best_code)
+            if code != None:
+                best_code = code
+
+        if best_code == None:       # Isolated vertex
+            best_code = [0]
+
+        comp_code_list += [best_code]
+
+    canonical_code = []
+    for comp_code in sorted(comp_code_list):
+        canonical_code += [len(comp_code)] + comp_code
+
+    return tuple(canonical_code)
+
+#-----------------------------------------------------------------------------#
+
+def canonicalDartLabel(vert_deg, opp, dart_attr):
+    """
+    Find the canonical labeling of the darts of a connected rotation system,
+    i.e. the position of each dart in the order used by the canonical code of
+    canonicalDartCode. Labelings from different starting darts with the same
+    minimal code differ by an automorphism of the rotation system.
+    """
+
+    first, dart_vert = dartOffsets(vert_deg)
+
+    best_code = None
+    best_start = 0
+
+    for start in range(len(opp)):
+        code = dartCode(start, first, vert_deg, dart_vert, opp, dart_attr, best_code)
+        if code != None:
+            best_code = code
+            best_start = start
+
+    # Repeat the breadth-first traversal from the best start, numbering the
+    # darts in the order they appear in the code
+
+    entry = {dart_vert[best_start]: best_start}
+    order = [dart_vert[best_start]]
+    dart_label = [None] * len(opp)
+
+    for vert_label, current_vert in enumerate(order):
+        deg = vert_deg[current_vert]
+        shift = entry[current_vert] - first[current_vert]
+
+        for iii in range(deg):
+            dart = first[current_vert] + (shift + iii) % deg
+            dart_label[dart] = (vert_label, iii)
+
+            other_vert = dart_vert[opp[dart]]
+            if other_vert not in entry:
+                entry[other_vert] = opp[dart]
+                order += [other_vert]
+
+    return dart_label
+
+#-----------------------------------------------------------------------------#
+
+def dartOffsets(vert_deg):
+    """
+    Find the first dart of each vertex, and the vertex of each dart, when the
+    darts of each vertex are numbered consecutively.
+    """
+
+    first = [0] * len(vert_deg)
+    dart_vert = []
+
+    for vert in range(len(vert_deg)):
+        if vert > 0:
+            first[vert] = first[vert - 1] + vert_deg[vert - 1]
+        dart_vert += [vert] * vert_deg[vert]
+
+    return first, dart_vert
+
+#-----------------------------------------------------------------------------#
+
+def traceComponent(vert, first, vert_deg, dart_vert, opp, seen):
+    """
+    Mark all vertices in the component of vert as seen, and return the list of
+    all darts in the component.
+    """
+
+    seen[vert] = True
+    queue = [vert]
+    dart_list = []
+
+    while len(queue) > 0:
+        current_vert = queue.pop()
+
+        for dart in range(first[current_vert], first[current_vert] + vert_deg[current_vert]):
+            dart_list += [dart]
+
+            next_vert = dart_vert[opp[dart]]
+            if not seen[next_vert]:
+                seen[next_vert] = True
+                queue += [next_vert]
+
+    return dart_list
+
+#-----------------------------------------------------------------------------#
+
+def dartCode(start, first, vert_deg, dart_vert, opp, dart_attr, best_code = None):
+    """
+    Breadth-first traversal code of a component, beginning at the dart start.
+    If best_code is given, the traversal stops and returns None as soon as the
+    code is known to be lexicographically larger than best_code.
+    """
+
+    label = {dart_vert[start]: 0}
+    entry = {dart_vert[start]: start}
+    order = [dart_vert[start]]
+
+    code = []
+    smaller = best_code == None
+
+    for current_vert in order:
+        deg = vert_deg[current_vert]
+        shift = entry[current_vert] - first[current_vert]
+
+        chunk = [deg]
+
+        for iii in range(deg):
+            dart = first[current_vert] + (shift + iii) % deg
+
+            # Label the vertex at the other end of the dart, if this is the
+            # first time it is reached
+
+            other_dart = opp[dart]
+            other_vert = dart_vert[other_dart]
+
+            if other_vert not in label:
+                label[other_vert] = len(order)
+                entry[other_vert] = other_dart
+                order += [other_vert]
+
+            chunk += [label[other_vert], (other_dart - entry[other_vert]) % vert_deg[other_vert]]
+            chunk += dart_attr[dart]
+
+        # Compare with the best code found so far, over the same positions
+
+        if not smaller:
+            best_chunk = best_code[len(code):(len(code) + len(chunk))]
+
+            if chunk > best_chunk:
+                return None
+            elif chunk < best_chunk:
+                smaller = True
+
+        code += chunk
+
+    if not smaller:                 # Same code as best code
+        return None
+
+    return code
+
+#-----------------------------------------------------------------------------#
+
+def dartAutomorphisms(vert_deg, opp, dart_attr):
+    """
+    Find the automorphism group of a connected rotation system given in terms
+    of darts, as for canonicalDartCode, i.e. the permutations of the darts
+    preserving the cyclic orders, the opposite darts and the dart attributes.
+    Such an automorphism is fixed by the image of any one dart, so the group
+    acts freely on the darts, and its order is the size of the orbit of any
+    dart. The darts are first split into classes by local invariants (vertex
+    degree, attributes and size of the face), refined while the smallest
+    class shrinks; only darts in the same class as a base dart, taken from
+    the smallest class, are tried as its image, and those already in its
+    orbit under the automorphisms found so far are skipped.
+
+    Parameters
+    ----------
+    vert_deg : list
+        Degree of each vertex.
+    opp : list
+        Opposite dart for each dart, i.e. the other half of the same edge.
+    dart_attr : list
+        Tuple of integer attributes for each dart.
+
+    Returns
+    -------
+    list
+        [generator_list, order, dart_orbit], where generator_list is a list of
+        automorphisms generating the group, each an array giving the image of
+        every dart (the identity is left out), order is the order of the
+        group, and dart_orbit is an array giving the smallest dart in the
+        orbit of every dart.
+
+    """
+
+    num_dart = len(opp)
+    first, dart_vert = dartOffsets(vert_deg)
+
+    if num_dart == 0:
+        return [[], 1, array('i')]
+
+    if len(traceComponent(0, first, vert_deg, dart_vert, opp, [False] * len(vert_deg))) != num_dart:
+        raise ValueError('graph must be connected')
+
+    next_dart = [first[dart_vert[dart]] + (dart - first[dart_vert[dart]] + 1) % vert_deg[dart_vert[dart]] \
+                 for dart in range(num_dart)]
+
+    # Size of the face of each dart, going around the faces by taking the
+    # opposite dart, and then the next dart around its vertex
+
+    face_size = [0] * num_dart
+
+    for dart in range(num_dart):
+        if face_size[dart] != 0:
+            continue
+
+        face_dart_list = [dart]
+        current_dart = next_dart[opp[dart]]
+
+        while current_dart != dart:
+            face_dart_list += [current_dart]
+            current_dart = next_dart[opp[current_dart]]
+
+        for face_dart in face_dart_list:
+            face_size[face_dart] = len(face_dart_list)
+
+    # Refine classes of darts, each time telling apart darts whose next and
+    # opposite darts are in different classes. Only the smallest class is
+    # used, so refining stops once it no longer shrinks; refining until no
+    # class is split could take as many rounds as the diameter of the graph.
+
+    class_dict = {}
+    dart_class = [class_dict.setdefault((vert_deg[dart_vert[dart]], dart_attr[dart], face_size[dart]), \
+                                        len(class_dict)) for dart in range(num_dart)]
+    class_count = Counter(dart_class)
+
+    while True:
+        class_dict = {}
+        new_class = [class_dict.setdefault((dart_class[dart], dart_class[next_dart[dart]], \
+                                            dart_class[opp[dart]]), len(class_dict)) for dart in range(num_dart)]
+        new_count = Counter(new_class)
+
+        if min(new_count.values()) == min(class_count.values()):
+            break
+
+        (dart_class, class_count) = (new_class, new_count)
+
+    base = min(range(num_dart), key = lambda dart: (class_count[dart_class[dart]], dart))
+
+    # Try each dart in the class of the base as its image, keeping the orbit
+    # of the base closed under the automorphisms found so far
+
+    generator_list = []
+    base_orbit = {base}
+
+    for dart in range(num_dart):
+        if dart_class[dart] != dart_class[base] or dart in base_orbit:
+            continue
+
+        image = extendDartMap(base, dart, next_dart, opp, dart_attr)
+
+        if image == None:
+            continue
+
+        generator_list += [image]
+        queue = list(base_orbit)
+
+        while len(queue) > 0:
+            current_dart = queue.pop()
+
+            for generator in generator_list:
+                if generator[current_dart] not in base_orbit:
+                    base_orbit.add(generator[current_dart])
+                    queue += [generator[current_dart]]
+
+    # Orbits of all darts, labeled by their smallest dart
+
+    dart_orbit = array('i', [-1] * num_dart)
+
+    for dart in range(num_dart):
+        if dart_orbit[dart] != -1:
+            continue
+
+        dart_orbit[dart] = dart
+        queue = [dart]
+
+        while len(queue) > 0:
+            current_dart = queue.pop()
+
+            for generator in generator_list:
+                if dart_orbit[generator[current_dart]] == -1:
+                    dart_orbit[generator[current_dart]] = dart
+                    queue += [generator[current_dart]]
+
+    return [generator_list, len(base_orbit), dart_orbit]
+
+#-----------------------------------------------------------------------------#
+
+def extendDartMap(start, image_start, next_dart, opp, dart_attr):
+    """
+    Extend the map taking the dart start to image_start to an automorphism of
+    a connected rotation system, following next and opposite darts. Returns
+    the image of every dart as an array, or None if the map does not extend,
+    i.e. two darts would have the same image or different attributes.
+    """
+
+    image = array('i', [-1] * len(opp))
+    used = bytearray(len(opp))
+    stack = [(start, image_start)]
+
+    while len(stack) > 0:
+        (dart, image_dart) = stack.pop()
+
+        if image[dart] != -1:
+            if image[dart] != image_dart:
+                return None
+            continue
+
+        if used[image_dart] or dart_attr[dart] != dart_attr[image_dart]:
+            return None
+
+        image[dart] = image_dart
+        used[image_dart] = 1
+
+        stack += [(next_dart[dart], next_dart[image_dart]), (opp[dart], opp[image_dart])]
+
+    return image
+
+#-----------------------------------------------------------------------------#
+
+def contractionPlan(index_lists, dim, trials = 32):
+    """
+    Find an order in which to contract a network of tensors whose indices all
+    have the same dimension, each index label being shared by at most two
+    tensors. Pairs of tensors sharing a label are contracted one at a time,
+    greedily taking the pair with the smallest result (of dim ** rank
+    entries). The first trial breaks ties by the most shared labels; the
+    others add random noise to the ranks, with a fixed seed so the plan is
+    the same each time, and the plan with the fewest multiplications, then
+    the smallest largest tensor, is kept.
+
+    Parameters
+    ----------
+    index_lists : list
+        Index labels of each tensor.
+    dim : int
+        Dimension of every index.
+    trials : int
+        Number of greedy plans tried.
+
+    Returns
+    -------
+    list
+        Steps (first, second, first_axes, second_axes), each contracting
+        tensor second into tensor first over the given axes of each, with
+        the result taking the place of first, indexed by the remaining
+        labels of first followed by those of second.
+
+    """
+
+    rng = Random(0)
+    best = None
+
+    for trial in range(trials):
+        index_dict = dict(enumerate(index_lists))
+        pair_list = []
+        (cost, peak) = (0, 0)
+
+        while True:
+            holder_dict = {}
+
+            for key, index_list in index_dict.items():
+                for label in index_list:
+                    holder_dict.setdefault(label, []).append(key)
+
+            pair_list_now = sorted({tuple(sorted(holders)) for holders in holder_dict.values() \
+                                    if len(holders) == 2})
+
+            if pair_list_now == []:
+                break
+
+            def score(pair):
+                shared = set(index_dict[pair[0]]) & set(index_dict[pair[1]])
+                rank = len(index_dict[pair[0]]) + len(index_dict[pair[1]]) - 2 * len(shared)
+
+                return (rank + (2 * rng.random() if trial > 0 else 0), -len(shared), pair)
+
+            (first, second) = min(pair_list_now, key = score)
+            (first_list, second_list) = (index_dict.pop(first), index_dict.pop(second))
+            shared = [label for label in first_list if label in second_list]
+
+            pair_list += [(first, second, [first_list.index(label) for label in shared], \
+                           [second_list.index(label) for label in shared])]
+            index_dict[first] = [label for label in first_list + second_list if label not in shared]
+
+            cost += dim ** (len(first_list) + len(second_list) - len(shared))
+            peak = max(peak, len(index_dict[first]))
+
+        if best == None or (cost, peak) < best[:2]:
+            best = (cost, peak, pair_list)
+
+    return best[2]
+
+#-----------------------------------------------------------------------------#
+
+def modulusList(bound, limit):
+    """
+    Primes below limit, largest first, as many as are needed for their
+    product to be more than twice bound, so that any integer of absolute
+    value at most bound is fixed by its residues (see chineseRemainder).
+    """
+
+    modulus_list = []
+    product_all = 1
+    candidate = limit - 1
+
+    while product_all <= 2 * bound:
+        if candidate > 1 and all([candidate % factor for factor in range(2, isqrt(candidate) + 1)]):
+            modulus_list += [candidate]
+            product_all *= candidate
+
+        candidate -= 1
+
+    return modulus_list
+
+#-----------------------------------------------------------------------------#
+
+def chineseRemainder(residue_list, modulus_list):
+    """
+    Returns the integer of smallest absolute value with the given residues
+    modulo the given distinct primes
+    """
+
+    product_all = reduce(lambda aaa, bbb: aaa * bbb, modulus_list, 1)
+    total = 0
+
+    for residue, modulus in zip(residue_list, modulus_list):
+        cofactor = product_all // modulus
+        total += residue * cofactor * pow(cofactor, -1, modulus)
+
+    total %= product_all
+
+    return total - product_all if 2 * total > product_all else total
+
+#-----------------------------------------------------------------------------#
+
+def rowDartTable(num_vert, edge_rows, rotation_rows = None):
+    """
+    Find the rotation system [vert_deg, opp, dart_attr] for a graph given by
+    edge rows [start, end, orient, color, twist]. If rotation_rows is given, it
+    lists the edge labels around each vertex in cyclic order (a self-loop is
+    listed twice, the first time for its start); otherwise, the cyclic order
+    of each vertex is the order in which its edges appear, as for
+    Graph.addEdges. Zero entries stand for missing orientations, colors and
+    twists.
+    """
+
+    vert_dart_list = [[] for vert in range(num_vert)]
+
+    if rotation_rows == None:
+        for label, (start, end, orient, color, twist) in enumerate(edge_rows):
+            vert_dart_list[start] += [(label, 0)]
+            vert_dart_list[end] += [(label, 1)]
+    else:
+        for vert, rotation in enumerate(rotation_rows):
+            for label in rotation:
+                if edge_rows[label][0] == vert and (label, 0) not in vert_dart_list[vert]:
+                    vert_dart_list[vert] += [(label, 0)]
+                else:
+                    vert_dart_list[vert] += [(label, 1)]
+
+    vert_deg = [len(dart_list) for dart_list in vert_dart_list]
+
+    # Number darts consecutively around each vertex, and record the darts at
+    # the start (side 0) and end (side 1) of each edge
+
+    edge_dart_list = [[None, None] for row in edge_rows]
+    dart = 0
+
+    for dart_list in vert_dart_list:
+        for (label, side) in dart_list:
+            edge_dart_list[label][side] = dart
+            dart += 1
+
+    opp = [None] * dart
+    dart_attr = [None] * dart
+
+    for (start_dart, end_dart), (start, end, orient, color, twist) in zip(edge_dart_list, edge_rows):
+        opp[start_dart] = end_dart
+        opp[end_dart] = start_dart
+
+        dart_attr[start_dart] = (-orient, color, twist)
+        dart_attr[end_dart] = (orient, color, twist)
+
+    return [vert_deg, opp, dart_attr]
+
+#-----------------------------------------------------------------------------#
+
+def reductionSites(opp, moves = [1, 2, 3, 4]):
+    """
+    Find all places in a trivalent rotation system where one of the moves
+    Graph.oneMove, ..., Graph.fourMove can be undone. The darts of vertex v
+    are 3v, 3v + 1, 3v + 2 in CCW order, and opp gives the opposite dart for
+    each dart. The sites found are:
+
+    (1) a dart ty from y to x, where y has a self-loop (a tadpole)
+    (2) a dart from x to y, followed CCW by a second dart from x to y, which
+        bound a face of size 2 (a digon)
+    (3) a dart on a face of size 3 with distinct vertices (a triangle)
+    (4) a dart from x to z on a face x z y w of size 4 with distinct vertices,
+        where z, w are to be removed (a square)
+
+    Parameters
+    ----------
+    opp : list
+        Opposite dart for each dart.
+    moves : list
+        Moves, given by the numbers 1, 2, 3, 4, that may be undone.
+
+    Returns
+    -------
+    list
+        List of sites (move, dart) for reduceSite.
+
+    """
+
+    site_list = []
+
+    for dart in range(len(opp)):
+        vert = dart // 3
+        next_dart = nextDart(dart)
+
+        # (1) y has a self-loop at its other two darts; the other end x must
+        # not have a self-loop as well, or nothing is left
+
+        if 1 in moves and opp[next_dart] == nextDart(next_dart):
+            other_next = nextDart(opp[dart])
+            if opp[other_next] != nextDart(other_next):
+                site_list += [(1, dart)]
+
+        # (2) the two darts to y are consecutive CCW at x, and in the
+        # opposite order at y; the third edges at x, y must be distinct
+
+        if 2 in moves:
+            other_vert = opp[dart] // 3
+
+            if other_vert != vert and opp[next_dart] // 3 == other_vert and \
+                nextDart(opp[next_dart]) == opp[dart] and \
+                opp[nextDart(next_dart)] != nextDart(opp[dart]):
+                    
+                site_list += [(2, dart)]
+
+        # (3), (4) travel around the face to the left of the dart; the third
+        # dart at each vertex must not lead back into the face vertices, or
+        # the vertices to be removed
+
+        if 3 in moves or 4 in moves:
+            face = [dart]
+            while len(face) <= 4:
+                face_dart = prevDart(opp[face[-1]])
+                if face_dart == dart:
+                    break
+                face += [face_dart]
+
+            face_vert = [face_dart // 3 for face_dart in face]
+            third_vert = [opp[prevDart(face_dart)] // 3 for face_dart in face]
+
+            if len(set(face_vert)) != len(face):
+                continue
+
+            if 3 in moves and len(face) == 3 and all([vert not in face_vert for vert in third_vert]):
+                site_list += [(3, dart)]
+
+            if 4 in moves and len(face) == 4 and \
+                all([vert not in [face_vert[1], face_vert[3]] for vert in [third_vert[1], third_vert[3]]]):
+                site_list += [(4, dart)]
+
+    return site_list
+
+#-----------------------------------------------------------------------------#
+
+def reduceSite(opp, move, dart):
+    """
+    Undo a move at the given site of a trivalent rotation system, as found by
+    reductionSites, and return the opposite darts for the resulting rotation
+    system, which has two fewer vertices.
+    """
+
+    opp = [other_dart for other_dart in opp]
+
+    if move == 1:
+
+        # Remove y and x, and join the other two edges at x
+
+        other_next = nextDart(opp[dart])
+        removed = [dart // 3, opp[dart] // 3]
+        joined = [(opp[other_next], opp[nextDart(other_next)])]
+
+    elif move == 2:
+
+        # Remove x and y, and join the third edges at each
+
+        removed = [dart // 3, opp[dart] // 3]
+        joined = [(opp[nextDart(nextDart(dart))], opp[nextDart(opp[dart])])]
+
+    elif move == 3:
+
+        # Contract triangle x y z to the vertex x, whose cyclic order becomes
+        # the third edges at x, y, z, in the order around the face
+
+        face = [dart, prevDart(opp[dart])]
+        face += [prevDart(opp[face[1]])]
+
+        removed = [face[1] // 3, face[2] // 3]
+        joined = [(3 * (dart // 3) + iii, opp[prevDart(face_dart)]) for iii, face_dart in enumerate(face)]
+
+    else:
+
+        # Remove z, w from square x z y w, joining x to the third edge of w,
+        # y to the third edge of z, and x to y
+
+        face = [dart]
+        for iii in range(3):
+            face += [prevDart(opp[face[-1]])]
+
+        removed = [face[1] // 3, face[3] // 3]
+        joined = [(opp[face[3]], opp[prevDart(face[3])]), \
+                  (opp[face[1]], opp[prevDart(face[1])]), (face[0], face[2])]
+
+    for (first_dart, second_dart) in joined:
+        opp[first_dart] = second_dart
+        opp[second_dart] = first_dart
+
+    # Renumber darts of the remaining vertices
+
+    keep_list = [vert for vert in range(len(opp) // 3) if vert not in removed]
+    new_label = {vert: label for label, vert in enumerate(keep_list)}
+
+    return [3 * new_label[opp[3 * vert + iii] // 3] + opp[3 * vert + iii] % 3 \
+            for vert in keep_list for iii in range(3)]
+
+#-----------------------------------------------------------------------------#
+
+def canonicalParentCode(opp, moves = [1, 2, 3, 4]):
+    """
+    Find the canonical code of the canonical parent of a connected trivalent
+    rotation system, without colors or orientations. The parent is found by
+    undoing a move at the reduction site with the smallest move number, and
+    then the smallest canonical dart label; this does not depend on how the
+    rotation system is labeled. The parent need not be built from given seeds
+    by the given moves, so generate only uses it for its default seeds and
+    moves.
+
+    Parameters
+    ----------
+    opp : list
+        Opposite dart for each dart, as for reductionSites.
+    moves : list
+        Moves, given by the numbers 1, 2, 3, 4, that may be undone.
+
+    Returns
+    -------
+    tuple
+        Canonical code of the parent, or None if no move can be undone.
+
+    """
+
+    site_list = reductionSites(opp, moves)
+
+    if site_list == []:
+        return None
+
+    num_dart = len(opp)
+    dart_label = canonicalDartLabel([3] * (num_dart // 3), opp, [(0, 0, 0)] * num_dart)
+
+    (move, dart) = min(site_list, key = lambda site: (site[0], dart_label[site[1]]))
+    parent_opp = reduceSite(opp, move, dart)
+
+    return canonicalDartCode([3] * (len(parent_opp) // 3), parent_opp, [(0, 0, 0)] * len(parent_opp))
+
+#-----------------------------------------------------------------------------#
+
+def nextDart(dart):
+    """
+    Next dart CCW around the same trivalent vertex
+    """
+
+    return dart - dart % 3 + (dart + 1) % 3
+
+#-----------------------------------------------------------------------------#
+
+def prevDart(dart):
+    """
+    Previous dart CCW around the same trivalent vertex
+    """
+
+    return dart - dart % 3 + (dart + 2) % 3
+
+#-----------------------------------------------------------------------------#
+
+class UnionFind:
+    
+    def __init__(self, num_edges):
+        self.num_edges = num_edges
+        self.root_list = list(range(num_edges))
+        
+    def findRoot(self, label):
+        if self.root_list[label] == label:
+            return label
+        
+        return self.findRoot(self.root_list[label])
+    
+    def join(self, iii, jjj):
+        iii_root = self.findRoot(iii)
+        jjj_root = self.findRoot(jjj)
+        
+        self.root_list[max(iii_root, jjj_root)] = min(iii_root, jjj_root)
+        
+    def printRoots(self):
+        return [self.root_list[iii] for iii in range(self.num_edges) \
+                if iii == self.root_list[iii]] 
+
+#=============================================================================#
+
+class ColorTable:
+    """
+        Color triples allowed at a trivalent vertex, stored as a dense array of
+        flags indexed by the three colors (in any order), so that checking a
+        triple takes constant time. One table is built for each graph, and is
+        shared by all of its vertices; the color list is validated here, so
+        vertices given a table do not need to check it again.
+    """
+    
+    def __init__(self, color_list):
+        
+        if type(color_list) != list or not all([len(triad) == 3 for triad in color_list]) or \
+            not all([all([type(label) == int for label in triad]) for triad in color_list]):
+                
+            raise ValueError('color list must be list of integer triples')
+        
+        self.color_list = color_list
+        self.size = max([max(triad) for triad in color_list], default = 0) + 1
+        self.table = bytearray(self.size ** 3)
+        
+        for (iii, jjj, kkk) in color_list:
+            for (aaa, bbb, ccc) in [(iii, jjj, kkk), (iii, kkk, jjj), (jjj, iii, kkk), \
+                                    (jjj, kkk, iii), (kkk, iii, jjj), (kkk, jjj, iii)]:
+                self.table[(aaa * self.size + bbb) * self.size + ccc] = 1
+                
+    #-------------------------------------------------------------------------#
+    
+    def __repr__(self):
+        return f'ColorTable of {len(self.color_list)} triples'
+    
+    #-------------------------------------------------------------------------#
+    
+    def __contains__(self, triad):
+        
+        if len(triad) != 3:
+            return False
+        
+        (iii, jjj, kkk) = triad
+        
+        if not (0 <= iii < self.size and 0 <= jjj < self.size and 0 <= kkk < self.size):
+            return False
+        
+        return self.table[(iii * self.size + jjj) * self.size + kkk] == 1
+
+#=============================================================================#
+
+class QuantumTable:
+    """
+        Quantum symbols for the colors 0, 1, ..., r - 2 (twice the spin) of
+        SU(2)_q, with q = exp(i pi / r), following Kauffman and Lins: quantum
+        integers [n] = sin(n pi / r) / sin(pi / r) and their factorials, loop
+        values qdim[a] = (-1)^a [a + 1], theta[a][b][c] for each admissible
+        triple (zero otherwise), and tetrahedral and 6j symbols, which are
+        found when first asked for and then kept. The tables are numpy arrays
+        if numpy is installed, and nested lists otherwise; use quantumTable(r)
+        to share one table for each r. If exact is True, the symbols are
+        Cyclotomic numbers, held in numpy object arrays.
+    """
+    
+    def __init__(self, r, exact = False):
+        
+        self.R = r
+        self.size = r - 1
+        self.exact = exact
+        
+        # Quantum integers vanish at n = r, so all factorials past r - 1 are
+        # zero; these are needed up to the largest sum in a tetrahedron. In
+        # the exact case, [n] = z^(n - 1) + z^(n - 3) + ... + z^(1 - n).
+        
+        if exact:
+            self.zero = Cyclotomic(r)
+            self.qint = [Cyclotomic(r, [0] * (2 * r - nnn + 1) + [1, 0] * nnn) for nnn in range(2 * r)]
+        else:
+            self.zero = 0.0
+            self.qint = [sin(nnn * pi / r) / sin(pi / r) for nnn in range(2 * r)]
+            self.qint[0] = 0.0
+            self.qint[r] = 0.0
+        
+        # Since [1] = 1, it also gives [0]! = 1
+        
+        self.qfact = [self.qint[1]]
+        for nnn in range(1, 2 * r):
+            self.qfact += [self.qfact[-1] * self.qint[nnn]]
+            
+        self.qdim = [(-1) ** aaa * self.qint[aaa + 1] for aaa in range(self.size)]
+        
+        # Theta symbols; color 0 is allowed here, as the trivial representation
+        
+        self.theta = [[[self.zero] * self.size for bbb in range(self.size)] for aaa in range(self.size)]
+        
+        for (aaa, bbb, ccc) in product(range(self.size), repeat = 3):
+            if self.admissible(aaa, bbb, ccc):
+                (mmm, nnn, ppp) = ((aaa + bbb - ccc) // 2, (bbb + ccc - aaa) // 2, (aaa + ccc - bbb) // 2)
+                
+                self.theta[aaa][bbb][ccc] = (-1) ** (mmm + nnn + ppp) * self.qfact[mmm + nnn + ppp + 1] * \
+                    self.qfact[mmm] * self.qfact[nnn] * self.qfact[ppp] / \
+                    (self.qfact[aaa] * self.qfact[bbb] * self.qfact[ccc])
+        
+        self.tet_dict = {}
+        
+        if numpy is not None:
+            dtype = object if exact else float
+            
+            self.qint = numpy.array(self.qint, dtype = dtype)
+            self.qfact = numpy.array(self.qfact, dtype = dtype)
+            self.qdim = numpy.array(self.qdim, dtype = dtype)
+            self.theta = numpy.array(self.theta, dtype = dtype)
+            
+    #-------------------------------------------------------------------------#
+    
+    def __repr__(self):
+        return f'QuantumTable for r = {self.R}'
+    
+    #-------------------------------------------------------------------------#
+    
+    def admissible(self, aaa, bbb, ccc):
+        """
+            Returns True if the colors can meet at a vertex: the sum is even,
+            the triangle inequalities hold and the sum is at most 2r - 4
+        """
+        
+        return (aaa + bbb + ccc) % 2 == 0 and aaa <= bbb + ccc and bbb <= aaa + ccc and \
+            ccc <= aaa + bbb and aaa + bbb + ccc <= 2 * self.R - 4
+    
+    #-------------------------------------------------------------------------#
+    
+    def tet(self, aaa, bbb, eee, ccc, ddd, fff):
+        """
+            Returns the tetrahedral symbol Tet[a b e; c d f], with faces
+            (a, d, e), (b, c, e), (a, b, f) and (c, d, f); zero if any of
+            these is not admissible
+        """
+        
+        key = (aaa, bbb, eee, ccc, ddd, fff)
+        
+        if key in self.tet_dict:
+            return self.tet_dict[key]
+        
+        face_list = [(aaa, ddd, eee), (bbb, ccc, eee), (aaa, bbb, fff), (ccc, ddd, fff)]
+        
+        if not all([self.admissible(*face) for face in face_list]):
+            self.tet_dict[key] = self.zero
+            return self.zero
+        
+        a_list = [sum(face) // 2 for face in face_list]
+        b_list = [(bbb + ddd + eee + fff) // 2, (aaa + ccc + eee + fff) // 2, (aaa + bbb + ccc + ddd) // 2]
+        
+        total = self.zero
+        
+        for sss in range(max(a_list), min(b_list) + 1):
+            term = (-1) ** sss * self.qfact[sss + 1]
+            
+            for a_sum in a_list:
+                term /= self.qfact[sss - a_sum]
+            for b_sum in b_list:
+                term /= self.qfact[b_sum - sss]
+                
+            total += term
+        
+        for a_sum in a_list:
+            for b_sum in b_list:
+                total *= self.qfact[b_sum - a_sum]
+                
+        for color in key:
+            total /= self.qfact[color]
+            
+        self.tet_dict[key] = total if self.exact else float(total)
+        
+        return self.tet_dict[key]
+    
+    #-------------------------------------------------------------------------#
+    
+    def sixj(self, aaa, bbb, iii, ccc, ddd, jjj):
+        """
+            Returns the 6j symbol {a b i; c d j} for changing the edge i,
+            joining (a, d) to (b, c), into the edge j joining (a, b) to (c, d),
+            as in the Pachner 2-2 move
+        """
+        
+        denominator = self.theta[aaa][ddd][iii] * self.theta[bbb][ccc][iii]
+        
+        if denominator == 0:
+            return self.zero
+        
+        return self.tet(aaa, bbb, iii, ccc, ddd, jjj) * self.qdim[iii] / denominator
+
+#=============================================================================#
+
+class Cyclotomic:
+    """
+        Exact element of the cyclotomic field Q(z), z = exp(i pi / r), so that
+        q = z; stored as an integer numpy array of coefficients of the power
+        basis 1, z, ..., z^(n - 1), with n = phi(2r), and a positive integer
+        denominator, with no common factor. Products are found by convolving
+        the coefficients and reducing with the matrix of powers of z from
+        cyclotomicBasis, and inverses using the Galois conjugates, whose
+        product with the number is its (rational) norm. Integers can be mixed
+        in freely, so these can be used in QuantumTable and Graph.stateSum.
+        
+        Coefficients are int64 as long as every value found from them stays
+        below INT_LIMIT, and are otherwise widened to Python integers (object
+        dtype) before the arithmetic, going back to int64 once they are small.
+    """
+    
+    INT_LIMIT = 2 ** 62
+    
+    def __init__(self, r, power_list = None, den = 1):
+        
+        (self.size, power_matrix, unit_list, power_bound) = cyclotomicBasis(r)
+        self.R = r
+        
+        # Coefficients are given for powers of z, with any exponent reduced
+        # modulo 2r
+        
+        full = numpy.zeros(2 * r, dtype = object)
+        
+        for power, coef in enumerate(power_list if power_list != None else []):
+            full[power % (2 * r)] += coef
+        
+        self.coef = numpy.dot(full, power_matrix)
+        self.den = den
+        self.normalize()
+    
+    #-------------------------------------------------------------------------#
+    
+    def __repr__(self):
+        terms = ' + '.join([f'{coef}*z^{power}' for power, coef in enumerate(self.coef) if coef != 0])
+        
+        return f'Cyclotomic(r = {self.R}: ({terms if terms else 0}) / {self.den})'
+    
+    #-------------------------------------------------------------------------#
+    
+    def normalize(self):
+        """
+            Removes common factors of the coefficients and denominator
+        """
+        
+        coef_list = [int(coef) for coef in self.coef]
+        common = reduce(gcd, coef_list, self.den)
+        
+        # Largest absolute value of a coefficient, to guard int64 arithmetic
+        
+        self.height = max(map(abs, coef_list))
+        
+        if self.den < 0:
+            common = -common
+        
+        if common not in [0, 1]:
+            self.coef = self.coef // common
+            self.den = self.den // common
+            self.height = self.height // abs(common)
+            
+        if self.coef.dtype == object and self.height < Cyclotomic.INT_LIMIT:
+            self.coef = self.coef.astype(numpy.int64)
+    
+    #-------------------------------------------------------------------------#
+    
+    def widen(self, coef, bound):
+        """
+            Returns the coefficient array as Python integers if bound, on the
+            values to be found from it, is too big for int64, and unchanged
+            otherwise
+        """
+        
+        if bound < Cyclotomic.INT_LIMIT:
+            return coef
+        
+        return coef.astype(object)
+    
+    #-------------------------------------------------------------------------#
+    
+    def new(self, coef, den):
+        """
+            Returns a number for the same r with given coefficient array and
+            denominator, without repeating the basis reduction
+        """
+        
+        result = Cyclotomic.__new__(Cyclotomic)
+        (result.R, result.size, result.coef, result.den) = (self.R, self.size, coef, den)
+        result.normalize()
+        
+        return result
+    
+    #-------------------------------------------------------------------------#
+    
+    def lift(self, other):
+        
+        if type(other) == Cyclotomic:
+            if other.R != self.R:
+                raise ValueError('cyclotomic numbers must have the same r')
+            return other
+        
+        if type(other) != int:
+            return NotImplemented
+        
+        coef = numpy.zeros(self.size, dtype = object)
+        coef[0] = other
+        
+        return self.new(coef, 1)
+    
+    #-------------------------------------------------------------------------#
+    
+    def __add__(self, other):
+        
+        other = self.lift(other)
+        if other is NotImplemented:
+            return other
+        
+        bound = max(self.height, 1) * other.den + max(other.height, 1) * self.den
+        
+        return self.new(self.widen(self.coef, bound) * other.den + self.widen(other.coef, bound) * self.den, \
+                        self.den * other.den)
+    
+    __radd__ = __add__
+    
+    #-------------------------------------------------------------------------#
+    
+    def __neg__(self):
+        return self.new(-self.coef, self.den)
+    
+    #-------------------------------------------------------------------------#
+    
+    def __sub__(self, other):
+        
+        other = self.lift(other)
+        if other is NotImplemented:
+            return other
+        
+        return self + (-other)
+    
+    #-------------------------------------------------------------------------#
+    
+    def __rsub__(self, other):
+        return (-self) + other
+    
+    #-------------------------------------------------------------------------#
+    
+    def __mul__(self, other):
+        
+        other = self.lift(other)
+        if other is NotImplemented:
+            return other
+        
+        # Product of polynomials has degree below 2n - 1 <= 2r, so each
+        # power can be read off the power matrix
+        
+        (size, power_matrix, unit_list, power_bound) = cyclotomicBasis(self.R)
+        bound = size * self.height * other.height * power_bound
+        product_coef = numpy.convolve(self.widen(self.coef, bound), self.widen(other.coef, bound))
+        
+        return self.new(numpy.dot(product_coef, power_matrix[:len(product_coef)]), self.den * other.den)
+    
+    __rmul__ = __mul__
+    
+    #-------------------------------------------------------------------------#
+    
+    def galois(self, kkk):
+        """
+            Returns the image under the automorphism z -> z^k, for k prime to 2r
+        """
+        
+        (size, power_matrix, unit_list, power_bound) = cyclotomicBasis(self.R)
+        
+        full = numpy.zeros(2 * self.R, dtype = self.widen(self.coef, self.height * power_bound).dtype)
+        full[[(power * kkk) % (2 * self.R) for power in range(size)]] = self.coef
+        
+        return self.new(numpy.dot(full, power_matrix), self.den)
+    
+    #-------------------------------------------------------------------------#
+    
+    def conjugate(self):
+        return self.galois(2 * self.R - 1)
+    
+    #-------------------------------------------------------------------------#
+    
+    def inverse(self):
+        
+        if self == 0:
+            raise ZeroDivisionError('cyclotomic number is zero')
+        
+        (size, power_matrix, unit_list, power_bound) = cyclotomicBasis(self.R)
+        
+        others = self.lift(1)
+        for kkk in unit_list[1:]:
+            others = others * self.galois(kkk)
+        
+        # Product with all conjugates is a rational number
+        
+        norm = self * others
+        norm_num = int(norm.coef[0])
+        coef = self.widen(others.coef, others.height * norm.den)
+        
+        if norm_num < 0:
+            return others.new(-coef * norm.den, others.den * -norm_num)
+        
+        return others.new(coef * norm.den, others.den * norm_num)
+    
+    #-------------------------------------------------------------------------#
+    
+    def __truediv__(self, other):
+        
+        other = self.lift(other)
+        if other is NotImplemented:
+            return other
+        
+        return self * other.inverse()
+    
+    #-------------------------------------------------------------------------#
+    
+    def __rtruediv__(self, other):
+        return self.inverse() * other
+    
+    #-------------------------------------------------------------------------#
+    
+    def __pow__(self, power):
+        
+        if type(power) != int:
+            return NotImplemented
+        
+        base = self if power >= 0 else self.inverse()
+        result = self.lift(1)
+        
+        for bit in bin(abs(power))[2:]:
+            result = result * result
+            if bit == '1':
+                result = result * base
+        
+        return result
+    
+    #-------------------------------------------------------------------------#
+    
+    def __eq__(self, other):
+        
+        other = self.lift(other)
+        if other is NotImplemented:
+            return other
+        
+        return self.den == other.den and all(self.coef == other.coef)
+    
+    #-------------------------------------------------------------------------#
+    
+    def __hash__(self):
+        return hash((self.R, self.den, tuple(self.coef)))
+    
+    #-------------------------------------------------------------------------#
+    
+    def __complex__(self):
+        
+        total = sum([int(coef) * complex(cos(power * pi / self.R), sin(power * pi / self.R)) \
+                     for power, coef in enumerate(self.coef) if coef != 0], 0j)
+        
+        return total / self.den
+    
+    #-------------------------------------------------------------------------#
+    
+    def isReal(self):
+        return self == self.conjugate()
+    
+    #-------------------------------------------------------------------------#
+    
+    def __float__(self):
+        
+        if not self.isReal():
+            raise ValueError('cyclotomic number is not real')
+        
+        return complex(self).real
+
+#=============================================================================#
+
+class Vertex:
+    
+    def __init__(self, label = None, COLOR_LIST = None, COLOR_TABLE = None):
+        
+        if label and (type(label) != int or label < 0):
+            raise ValueError('vertex label must be non-negative integer')
+            
+        if COLOR_TABLE and type(COLOR_TABLE) != ColorTable:
+            raise ValueError('color table must be ColorTable object')
+        
+        self.label = label
+        
+        # Edge order is list of edges incident to vertex, given in CCW order
+        
+        self.edge_order = []
+        
+        # Color list records colors for edges incident to vertex, to ensure
+        # they meet SU_q(2) requirements; allowed color list constant records
+        # all triples that meet these requirements.
+        
+        self.color_list = []
+        
+        # Table for checking colors, usually shared with the other vertices
+        # of the graph; it has already been validated, so only a color list
+        # given on its own needs to be checked (by building a new table)
+        
+        if COLOR_TABLE:
+            self.COLOR_TABLE = COLOR_TABLE
+        elif COLOR_LIST:
+            self.COLOR_TABLE = ColorTable(COLOR_LIST)
+        else:
+            self.COLOR_TABLE = ColorTable([])
+            
+        self.ALLOWED_COLOR_LIST = self.COLOR_TABLE.color_list
+        
+        # Arrow list keeps track of edge orientations pointing into (+1) or
+        # out of (-1) the vertex. If zero is given, edge has no orientation.
+        
+        self.in_arrow = []
+        
+        # List of faces that are incident to the vertex
+        
+        self.face_list = [None] * 3
+        
+    #-------------------------------------------------------------------------#
+        
+    def __repr__(self):
+        return repr(self.label)
+        
+    #-------------------------------------------------------------------------#
+    
+    def connectEdge(self, added_edge = None):
+        """
+            Connect given edge to vertex, placing next in CCW order
+        """
+        
+        if len(self.edge_order) == 3:
+            raise ValueError('Vertex {} already trivalent'.format(self.label))
+            
+        # if self != added_edge.start or self != added_edge.end:
+        #     raise ValueError('Vertex {} not incident to added edge'.format(self.label))
+        
+        # Check whether edge has orientation; if so, compute whether this
+        # orientation points towards (+) or away from (-) the vertex. This
+        # value is stored separately, just in case a source/sink would be
+        # created by the connected edge.
+        
+        if added_edge.orient:
+            if (added_edge.orient > 0 and self == added_edge.end) or \
+                (added_edge.orient < 0 and self == added_edge.start):
+                    
+                added_arrow = 1
+            else:
+                added_arrow = -1
+        else:
+            added_arrow = 0
+        
+        # Check here if source or sink created
+        
+        if abs(sum(self.in_arrow) + added_arrow) == 3:
+            raise AttributeError('Edge orientation results in source or sink')
+            
+        # Check that colors assigned are valid; only check if all three colors
+        # are assigned (i.e. no zeros appear in list)
+        
+        if added_edge.color:
+            added_color = added_edge.color
+        else:
+            added_color = 0
+            
+        temp_color_list = [color for color in self.color_list] + [added_color]
+        if (0 not in temp_color_list) and len(temp_color_list) == 3 and \
+            temp_color_list not in self.COLOR_TABLE:
+            raise AttributeError('Edge color does not satisfy vertex rules')
+        
+        # All tests passed
+            
+        self.edge_order += [added_edge]
+        self.color_list += [added_color]
+        self.in_arrow += [added_arrow]
+        
+        return True
+        
+    #-------------------------------------------------------------------------#
+    
+    def replaceEdge(self, remove_edge = None, added_edge = None):
+        """
+            Remove edge from vertex cyclic order, place new edge in same location
+        """
+        
+        if remove_edge not in self.edge_order:
+            raise ValueError('Edge to remove not incident to vertex {}'.format(self.label))
+            
+        place = self.edge_order.index(remove_edge)
+        
+        # If remove_edge is a self-loop, replace the second instance of the
+        # edge; assumes trivalent vertex, and that we are not replacing a
+        # self-loop with another self-loop
+            
+        if added_edge.orient:
+            if (added_edge.orient > 0 and self == added_edge.end) or \
+                (added_edge.orient < 0 and self == added_edge.start):
+                    
+                replace_arrow = 1
+            else:
+                replace_arrow = -1
+        else:
+            replace_arrow = 0
+            
+            # FOR NOW, assume that there is no self-loop involved; FIX LATER
+            
+            # if self.edge_order[(place + 1) % 3] == remove_edge:
+            #     self.edge_order[(place + 1) % 3] = added_edge
+            #     place = (place + 1) % 3
+            # else:
+            #     self.edge_order[place] = added_edge
+            # self.in_arrow[place] = 0
+            
+            # return True
+        
+        # Since self.in_arrow already has the old value, we added twice the
+        # new value; if this is equal to +/- 3, then we have a source or sink.
+        # If orientation does not change, then test is unnecessary.
+    
+        if replace_arrow != self.in_arrow[place] and abs(sum(self.in_arrow) + 2 * replace_arrow) == 3:
+            raise AttributeError('Orientation change results in source or sink')
+            
+        # Check that colors are still valid at vertex
+        
+        if added_edge.color:
+            replace_color = added_edge.color
+        else:
+            replace_color = 0
+            
+        if replace_color != self.color_list[place]:
+            temp_color_list = [color for color in self.color_list]
+            temp_color_list[place] = replace_color
+            
+            if (0 not in temp_color_list) and len(temp_color_list) == 3 and \
+                temp_color_list not in self.COLOR_TABLE:
+                raise AttributeError('Edge color does not satisfy vertex rules')
+            
+        # All tests passed
+        
+        self.edge_order[place] = added_edge
+        self.color_list[place] = replace_color
+        self.in_arrow[place] = replace_arrow
+            
+        # else:
+        #     if self.edge_order[(place + 1) % 3] == remove_edge:
+        #         self.edge_order[(place + 1) % 3] = added_edge
+        #         place = (place + 1) % 3
+        #     else:
+        #         self.edge_order[place] = added_edge
+        #     self.in_arrow[place] = replace_arrow
+            
+        #     return True
+    
+    #-------------------------------------------------------------------------#
+    
+    def permuteOrder(self, dir = True):
+        """
+            Changes edge order e0 e1 e2 -> e1 e2 e0 (dir = True) or e2 e0 e1
+        """
+        
+        if dir:
+            self.edge_order = self.edge_order[1:] + [self.edge_order[0]]
+            self.in_arrow = self.in_arrow[1:] + [self.in_arrow[0]]
+        else:
+            self.edge_order = [self.edge_order[-1]] + self.edge_order[:-1]
+            self.in_arrow = [self.in_arrow[-1]] + self.in_arrow[:-1]
+        
+    #-------------------------------------------------------------------------#
+    
+    def removeEdge(self, remove_edge = None):
+        
+        if len(self.edge_order) == 0:
+            raise ValueError(f'Vertex {self.label} already disconnected')
+            
+        if remove_edge in self.edge_order:
+            place = self.edge_order.index(remove_edge)
+            
+            del self.edge_order[place]
+            del self.color_list[place]
+            del self.in_arrow[place]
+        else:
+            raise ValueError(f'Edge {remove_edge} not connected to vertex {self.label}')
+            
+    #-------------------------------------------------------------------------#
+    
+    def changeEdgeOrient(self, change_edge = None):
+        """
+            Reverse the orientation of change_edge at the vertex
+        """
+        
+        if type(change_edge) != Edge:
+            raise ValueError('Must have Edge object to change edge orientation')
+            
+        edge_index = self.edge_order.index(change_edge)
+        new_in_arrow_list = [arrow for arrow in self.in_arrow]
+        new_in_arrow_list[edge_index] = -new_in_arrow_list[edge_index]
+        
+        if abs(sum(new_in_arrow_list)) == 3:
+            raise AttributeError('Orientation change results in source or sink')
+        else:
+            self.in_arrow[edge_index] = -self.in_arrow[edge_index]
+        
+    #-------------------------------------------------------------------------#
+    
+    def isStartPlace(self, place):
+        """
+            Returns True if the edge at given place in the cyclic order leaves
+            the vertex at the start of the edge
+        """
+        
+        edge = self.edge_order[place]
+        
+        # For a self-loop, the first appearance in the cyclic order is taken
+        # to be the start of the edge
+        
+        if edge.start != edge.end:
+            return self == edge.start
+        
+        return place == self.edge_order.index(edge)
+        
+    #-------------------------------------------------------------------------#
+    
+    def otherPlace(self, place):
+        """
+            Returns (vertex, place) for the other end of the edge at given
+            place in the cyclic order
+        """
+        
+        edge = self.edge_order[place]
+        
+        if edge.start != edge.end:
+            other_vert = edge.end if self == edge.start else edge.start
+            return (other_vert, other_vert.edge_order.index(edge))
+        
+        other_place = [iii for iii, loop_edge in enumerate(self.edge_order) \
+                       if loop_edge == edge and iii != place][0]
+        
+        return (self, other_place)
+        
+    #-------------------------------------------------------------------------#
+    
+    def arrowAt(self, place):
+        """
+            Returns +1 if edge at given place in cyclic order points into the
+            vertex, -1 if it points out, and 0 if it has no orientation
+        """
+        
+        edge = self.edge_order[place]
+        
+        if not edge.orient:
+            return 0
+        
+        if self.isStartPlace(place):
+            return -edge.orient
+        
+        return edge.orient
+        
+    #-------------------------------------------------------------------------#
+    
+    def addFace(self, new_face):
+        if type(new_face) != Face:
+            raise ValueError('incident face must be Face object')
+        else:
+            self.face_list += [new_face]
+        
+    #-------------------------------------------------------------------------#
+    
+    def colorList(self):
+        return [color for color in self.color_list if color != 0]
+        
+    #-------------------------------------------------------------------------#
+    
+    def inArrow(self):
+        return [dir for dir in self.in_arrow]
+        
+    #-------------------------------------------------------------------------#
+    
+    def edgeOrder(self):
+        return [edge for edge in self.edge_order]
+        
+    #-------------------------------------------------------------------------#
+    
+    def label(self):
+        return self.label
+
+#=============================================================================#
+
+class Edge:
+    
+    def __init__(self, start = None, end = None, orient = None, color = None, twist = None):
+        
+        if start and type(start) != Vertex:
+            raise ValueError('start must be a Vertex object')
+        
+        if end and type(end) != Vertex:
+            raise ValueError('end must be a Vertex object')
+            
+        if orient and (type(orient) != int or abs(orient) != 1):
+            raise ValueError('orient must be +/- 1')
+            
+        if color and (type(color) != int or color <= 0):
+            raise ValueError('color must be positive integer')
+        
+        self.start = start
+        self.end = end
+        
+        # Sign of twist gives whether twist is right-handed (+), or left-handed
+        # (-). The orientation is given by +/- 1, whether from start to end (+1),
+        # or end to start (-1). Color is an integer, which is twice the
+        # representation value j.
+        
+        self.orient = orient
+        self.color = color
+        self.twist = twist
+        
+        # Record faces incident to the edge; the sides are given in terms of
+        # the natural orientation of the edge from start to finish
+        
+        self.face_left = None
+        self.face_right = None
+        
+    #-------------------------------------------------------------------------#
+        
+    def __repr__(self):
+        
+        # edge_str = "[" + repr(self.start) + ", " + repr(self.end)
+        # if self.orient != None:
+        #     edge_str += ", orient = " + repr(self.orient)
+        # if self.color != None:
+        #     edge_str += ", color = " + repr(self.color)
+        # # if self.twist != None:
+        # #     edge_str += ", twist = {}".format(self.twist)
+        # edge_str += "]"
+        
+        if self.twist != None:
+            return "[" + repr(self.start) + ", " + repr(self.end) + ", " + \
+                repr(self.orient) + ", " + repr(self.color) + ", " + repr(self.twist) + \
+                + "]"
+        elif self.color != None:
+            return "[" + repr(self.start) + ", " + repr(self.end) + ", " + \
+                repr(self.orient) + ", " + repr(self.color) + "]"
+        elif self.orient != None:
+            return "[" + repr(self.start) + ", " + repr(self.end) + ", " + \
+                repr(self.orient) + "]"
+        else:
+            return "[" + repr(self.start) + ", " + repr(self.end) + "]"
+        
+    #-------------------------------------------------------------------------#
+    
+    def __hash__(self):
+        """
+            Returns memory location of the edge as unique identifer
+        """
+        
+        return id(self)
+        
+    #-------------------------------------------------------------------------#
+    
+    def clearColor(self):
+        self.color = None
+        
+        start_index = self.start.edge_order.index(self)
+        self.start.color_list[start_index] = 0
+        
+        end_index = self.end.edge_order.index(self)
+        self.end.color_list[end_index] = 0
+    
+    #-------------------------------------------------------------------------#
+    
+    def setColor(self, color = None):
+        
+        # NOTE: Currently assumes self.start, self.end exist, and that edge
+        # is already attached to both
+        
+        if color == None:
+            start_place = self.start.edge_order.index(self)
+            end_place = self.end.edge_order.index(self)
+            
+            self.color = None
+            self.start.color_list[start_place] = 0
+            self.end.color_list[end_place] = 0
+            
+            return True
+        
+        if type(color) != int or color <= 0:
+            raise ValueError('color must be positive integer')
+            
+        if color == self.color:
+            raise ValueError(f'color is already defined to be {color}')
+        
+        start_color_list = [color for color in self.start.color_list]
+        start_place = self.start.edge_order.index(self)
+        start_color_list[start_place] = color
+        start_color_list.sort()
+        
+        end_color_list = [color for color in self.end.color_list]
+        end_place = self.end.edge_order.index(self)
+        end_color_list[end_place] = color
+        end_color_list.sort()
+        
+        # Only check vertex color lists if they have no placeholders
+        
+        if (0 not in start_color_list) and (start_color_list not in self.start.COLOR_TABLE):
+            raise AttributeError('color requirements violated at edge start')
+        elif (0 not in end_color_list) and (end_color_list not in self.end.COLOR_TABLE):
+            raise AttributeError('color requirements violated at edge end')
+                   
+        self.color = color
+        self.start.color_list[start_place] = color
+        self.end.color_list[end_place] = color
+        
+        # self.start.color_list = start_color_list
+        # self.end.color_list = end_color_list
+           
+        return True
+        
+    #-------------------------------------------------------------------------#
+    
+    def setOrient(self, orient):
+        
+        # NOTE: Currently assumes self.start, self.end exist, and that edge
+        # is already attached to both
+        
+        if type(orient) != int or abs(orient) != 1:
+            raise ValueError('orient must be +/- 1')
+            
+        if orient == self.orient:
+            return True
+                
+        start_place = self.start.edge_order.index(self)
+        end_place = self.end.edge_order.index(self)
+        
+        if self.orient:
+            if (self.orient > 0 and orient < 0) or (self.orient < 0 and orient > 0):
+                
+                # Orientation exists and flips; need to check that there is no
+                # violation of source/sink rule at both incident vertices
+                
+                start_in_arrow_list = [arrow for arrow in self.start.in_arrow]
+                start_in_arrow_list[start_place] = -start_in_arrow_list[start_place]
+                
+                end_in_arrow_list = [arrow for arrow in self.end.in_arrow]
+                end_in_arrow_list[end_place] = -end_in_arrow_list[end_place]
+                    
+        else:
+            
+            # Edge has no previous orient, so do check at vertices with added
+            # arrow at each, and verify no sources or sinks at both incident
+            # vertices
+            
+            start_in_arrow_list = [arrow for arrow in self.start.in_arrow]
+            start_place = self.start.edge_order.index(self)
+            
+            end_in_arrow_list = [arrow for arrow in self.end.in_arrow]
+            end_place = self.end.edge_order.index(self)
+            
+            if orient > 0:
+                start_in_arrow = -1
+                end_in_arrow = 1
+            else:
+                start_in_arrow = 1
+                end_in_arrow = -1
+                
+            start_in_arrow_list[start_place] = start_in_arrow
+            end_in_arrow_list[end_place] = end_in_arrow
+            
+        # Verify that no sources or sinks are created at incident vertices
+            
+        if abs(sum(start_in_arrow_list)) != 3 and abs(sum(end_in_arrow_list)) != 3:
+            self.orient = orient
+            
+            self.start.in_arrow = start_in_arrow_list
+            self.end.in_arrow = end_in_arrow_list
+            
+            return True
+        
+        elif abs(sum(start_in_arrow_list)) == 3:
+            raise AttributeError('Orientation change results in source/sink at start')
+        else:
+            raise AttributeError('Orientation change results in source/sink at end')
+            
+        # WHAT IS THIS PART OF CODE FOR?
+            
+        # # We need to check that orientations for start, end vertices are
+        # # consistent with requirement of no sources, sinks, so we keep the
+        # # original orient, and restore it if one of the vertex conditions is
+        # # violated.
+        
+        # try:
+            
+        #     self.start.changeEdgeOrient(self)        
+        #     self.end.changeEdgeOrient(self)
+            
+        #     self.orient = orient
+            
         #     return True
+        
+        # except:
+        #     return False
+        
+    #-------------------------------------------------------------------------#
+    
+    def changeStart(self, new_start = None):
+        
+        if type(new_start) != Vertex:
+            raise ValueError('New edge start must be Vertex')
+    
+        if self in self.start.edgeOrder():
+            self.start.removeEdge(self)
+        else:
+            raise AttributeError('Edge not in edge order for new start vertex')
+            
+        self.start = new_start
+        
+    #-------------------------------------------------------------------------#
+    
+    def changeEnd(self, new_end = None):
+        
+        if type(new_end) != Vertex:
+            raise ValueError('New edge end must be Vertex')
+            
+        if self in self.end.edgeOrder():
+            self.end.removeEdge(self)
+        else:
+            raise AttributeError('Edge not in edge order for new end vertex')
+        
+        self.end = new_end
+        
+    #-------------------------------------------------------------------------#
+    
+    def notSelfLoop(self):
+        if self.start != self.end:
+            return True
+        
+        return False
+        
+    #-------------------------------------------------------------------------#
+    
+    def setEnd(self, end):
+        """
+            Adds end to edge, either by integer label or as a Vertex object.
+            Does not check whether integer is within correct range for end.
+        """
+        
+        if type(end) not in [int, Vertex]:
+            raise ValueError('end must be either an integer label or a Vertex')
+        elif type(end) == Vertex:
+            self.end = end
+        else:
+            self.end = Vertex(label = end)
+        
+    #-------------------------------------------------------------------------#
+    
+    def setStart(self, start):
+        """
+            Adds start to edge, either by integer label or as a Vertex object.
+            Does not check whether integer is within correct range for start.
+        """
+        
+        if type(start) not in [int, Vertex]:
+            raise ValueError('start must be either an integer label or a Vertex')
+        elif type(start) == Vertex:
+            self.start = start
+        else:
+            self.start = Vertex(label = start)
+        
+    #-------------------------------------------------------------------------#
+    
+    def setLeftFace(self, left_face):
+        if type(left_face) != Face:
+            raise ValueError('left face must be a Face object')
+        else:
+            self.face_left = left_face
+        
+    #-------------------------------------------------------------------------#
+    
+    def setRightFace(self, right_face):
+        if type(right_face) != Face:
+            raise ValueError('right face must be a Face object')
+        else:
+            self.face_right = right_face
+        
+    #-------------------------------------------------------------------------#
+    
+    def setTwist(self, twist):
+        
+        if type(twist) != int:
+            raise ValueError('twist must be an integer')
+        
+        self.twist = twist
+        
+    #-------------------------------------------------------------------------#
+    
+    def color(self):
+        """
+            Return color (twice the spin representation value).
+        """
+        
+        return abs(self.color)
+        
+    #-------------------------------------------------------------------------#
+    
+    def orient(self):
+        """
+            Return orientation
+        """
+        
+        return abs(self.orient)
+        
+    #-------------------------------------------------------------------------#
+    
+    def twist(self):
+        """
+            Return twist.
+        """
+        
+        return self.twist
+        
+    #-------------------------------------------------------------------------#
+    
+    def start(self):
+        """
+            Returns start vertex for edge
+        """
+        
+        return self.start
+        
+    #-------------------------------------------------------------------------#
+    
+    def end(self):
+        """
+            Returns end vertex for edge
+        """
+        
+        return self.end
+    
+    #-------------------------------------------------------------------------#
+    
+    def leftFace(self):
+        
+        return self.face_left
+    
+    #-------------------------------------------------------------------------#
+    
+    def rightFace(self):
+        
+        return self.face_right
+        
+#=============================================================================#
+
+class Face:
+    
+    def __init__(self):
+        
+        self.edge_list = []
+        
+    #-------------------------------------------------------------------------#
+        
+    def __repr__(self):
+        return repr([edge for edge in self.edge_list])
+    
+    #-------------------------------------------------------------------------#
+        
+    def addEdge(self, added_edge = None):
+        self.edge_list += [added_edge]
+        
+#=============================================================================#
+
+class EdgeList:
+    """
+        Ordered list of edges, stored as a list of short blocks together with
+        a Fenwick tree of the block lengths, so that the position of an edge,
+        the edge at a given position, and inserting or removing an edge all
+        take O(log n) time (for blocks of bounded size), rather than the O(n)
+        time for a Python list. Edges are indexed and iterated over as for a
+        list.
+    """
+    
+    BLOCK_SIZE = 256
+    
+    def __init__(self, edge_list = None):
+        
+        edge_list = list(edge_list) if edge_list else []
+        
+        self.block_list = [edge_list[iii:(iii + self.BLOCK_SIZE)] \
+                           for iii in range(0, len(edge_list), self.BLOCK_SIZE)]
+        if self.block_list == []:
+            self.block_list = [[]]
+            
+        self.num_edges = len(edge_list)
+        self.edge_block = {edge: block for block in self.block_list for edge in block}
+        self.reindexBlocks()
+        
+    #-------------------------------------------------------------------------#
+    
+    def __repr__(self):
+        return repr(list(self))
+    
+    #-------------------------------------------------------------------------#
+    
+    def __len__(self):
+        return self.num_edges
+    
+    #-------------------------------------------------------------------------#
+    
+    def __iter__(self):
+        for block in self.block_list:
+            yield from block
+            
+    #-------------------------------------------------------------------------#
+    
+    def __contains__(self, edge):
+        return edge in self.edge_block
+    
+    #-------------------------------------------------------------------------#
+    
+    def __getitem__(self, label):
+        
+        if label < 0:
+            label += self.num_edges
+            
+        if label < 0 or label >= self.num_edges:
+            raise IndexError('edge label out of range')
+            
+        # Descend the Fenwick tree to find the block containing the label
+        
+        block_index = 0
+        step = 1 << len(self.tree).bit_length()
+        
+        while step > 0:
+            if block_index + step < len(self.tree) and self.tree[block_index + step] <= label:
+                block_index += step
+                label -= self.tree[block_index]
+            step >>= 1
+            
+        return self.block_list[block_index][label]
+    
+    #-------------------------------------------------------------------------#
+    
+    def index(self, edge):
+        """
+            Returns position of edge in list
+        """
+        
+        if edge not in self.edge_block:
+            raise ValueError('edge not in edge list')
+            
+        block = self.edge_block[edge]
+        block_index = self.block_index[id(block)]
+        
+        # Sum lengths of all earlier blocks
+        
+        position = block.index(edge)
+        tree_index = block_index
+        
+        while tree_index > 0:
+            position += self.tree[tree_index]
+            tree_index -= tree_index & (-tree_index)
+            
+        return position
+    
+    #-------------------------------------------------------------------------#
+    
+    def insertAfter(self, edge, added_edge_list):
+        """
+            Insert list of edges immediately after given edge
+        """
+        
+        if edge not in self.edge_block:
+            raise ValueError('edge not in edge list')
+        
+        block = self.edge_block[edge]
+        place = block.index(edge) + 1
+        block[place:place] = added_edge_list
+        
+        self.addToBlock(block, added_edge_list)
+        
+    #-------------------------------------------------------------------------#
+    
+    def insert(self, position, edge):
+        """
+            Insert edge at given position, as for list.insert
+        """
+        
+        position = min(max(position, 0), self.num_edges)
+        
+        if position == self.num_edges:
+            self.append(edge)
+            return
+        
+        if position == 0:
+            block = self.block_list[0]
+            block.insert(0, edge)
+        else:
+            previous_edge = self[position - 1]
+            block = self.edge_block[previous_edge]
+            block.insert(block.index(previous_edge) + 1, edge)
+            
+        self.addToBlock(block, [edge])
+        
+    #-------------------------------------------------------------------------#
+    
+    def append(self, edge):
+        
+        block = self.block_list[-1]
+        block.append(edge)
+        
+        self.addToBlock(block, [edge])
+        
+    #-------------------------------------------------------------------------#
+    
+    def extend(self, added_edge_list):
+        
+        for edge in added_edge_list:
+            self.append(edge)
+        
+    #-------------------------------------------------------------------------#
+    
+    def remove(self, edge):
+        
+        if edge not in self.edge_block:
+            raise ValueError('edge not in edge list')
+            
+        block = self.edge_block.pop(edge)
+        block.remove(edge)
+        self.num_edges -= 1
+        
+        if block == [] and len(self.block_list) > 1:
+            self.block_list.pop(self.block_index[id(block)])
+            self.reindexBlocks()
+        else:
+            self.updateTree(self.block_index[id(block)], -1)
+        
+    #-------------------------------------------------------------------------#
+    
+    def addToBlock(self, block, added_edge_list):
+        """
+            Record edges just added to block, splitting the block if needed
+        """
+        
+        for edge in added_edge_list:
+            self.edge_block[edge] = block
+            
+        self.num_edges += len(added_edge_list)
+        
+        if len(block) > 2 * self.BLOCK_SIZE:
+            block_index = self.block_index[id(block)]
+            new_block = block[self.BLOCK_SIZE:]
+            del block[self.BLOCK_SIZE:]
+            
+            for edge in new_block:
+                self.edge_block[edge] = new_block
+            
+            self.block_list.insert(block_index + 1, new_block)
+            self.reindexBlocks()
+        else:
+            self.updateTree(self.block_index[id(block)], len(added_edge_list))
+        
+    #-------------------------------------------------------------------------#
+    
+    def updateTree(self, block_index, change):
+        """
+            Change length of block in Fenwick tree
+        """
+        
+        tree_index = block_index + 1
+        
+        while tree_index < len(self.tree):
+            self.tree[tree_index] += change
+            tree_index += tree_index & (-tree_index)
+            
+    #-------------------------------------------------------------------------#
+    
+    def reindexBlocks(self):
+        """
+            Rebuild index of each block and Fenwick tree of block lengths,
+            after blocks have been added or removed
+        """
+        
+        self.block_index = {id(block): block_index for block_index, block in enumerate(self.block_list)}
+        
+        # Fenwick tree, where entry i holds the total length of blocks
+        # i - (i & -i), ..., i - 1
+        
+        self.tree = [0] + [len(block) for block in self.block_list]
+        
+        for tree_index in range(1, len(self.tree)):
+            parent_index = tree_index + (tree_index & (-tree_index))
+            if parent_index < len(self.tree):
+                self.tree[parent_index] += self.tree[tree_index]
+                
+#=============================================================================#
+
+class Graph:
+    
+    def __init__(self, num_vert = None, r = None):
+    
+        # r value, to determine allowed incident edge colors; allowed color
+        # list constant gives all allowed triples coming from r
+            
+        if r:
+            if (type(r) != int or r <= 3):
+                raise ValueError('r value must be >= 4')
+            else:
+                self.ALLOWED_COLOR_LIST = colorList(r)
+        else:
+            
+            # Use default option of all 0's to allow testing with orientations
+            # but no chosen value of r. This choice also avoids confusion if
+            # colors are added to some of the edges.
+            
+            self.ALLOWED_COLOR_LIST = [[0, 0, 0]]
+            
+        # Table of allowed triples, shared by all vertices (and by all
+        # graphs with the same r)
+        
+        self.COLOR_TABLE = colorTable(r)
+                
+        self.R = r
+        
+        # Number of vertices
+        
+        self.vert_list = []
+        
+        if num_vert:
+            if (type(num_vert) != int or num_vert <= 0):
+                raise ValueError('Number of vertices must be a positive integer')
+        
+            if (num_vert % 2) == 1:
+                raise ValueError('Trivalent graphs must have an even number of vertices')
+                
+            # Create vertices
+                
+            self.num_vert = num_vert
+            
+            for iii in range(num_vert):
+                self.vert_list += [Vertex(label = iii, COLOR_TABLE = self.COLOR_TABLE)]
+        else:
+            self.num_vert = 0
+        
+        # Boolean value to record whether edges are in canonical order
+        
+        self.canonical = False
+        
+        # Cached canonical code, together with the edge attributes it was
+        # computed for; any change to the graph structure clears the cache
+        
+        self.code_cache = None
+        
+        # Create edge list; this allows edges to be inserted next to a given
+        # edge, as done by the moves, without rebuilding the list
+        
+        self.edge_list = EdgeList()
+        
+        # Create list of faces, and count of faces of each size; the sorted
+        # list of face sizes is made from the count when asked for
+        
+        self.face_list = []
+        self.face_size_count = Counter()
+        self.face_size_cache = None
+        
+    #-------------------------------------------------------------------------#
+    
+    def __repr__(self):
+        return f'Graph of {self.num_vert} vertices and {len(self.edge_list)} edges'
+        
+    #-------------------------------------------------------------------------#
+    
+    @property
+    def face_size_list(self):
+        """
+            Sorted list of face sizes, made from Graph.face_size_count; moves
+            only change the count of each size, so the list is made again
+            only when asked for after a move
+        """
+        
+        if self.face_size_cache == None:
+            self.face_size_cache = [size for size in sorted(self.face_size_count) \
+                                    for iii in range(self.face_size_count[size])]
+            
+        return self.face_size_cache
+        
+    @face_size_list.setter
+    def face_size_list(self, face_size_list):
+        self.face_size_count = Counter(face_size_list)
+        self.face_size_cache = None
+        
+    #-------------------------------------------------------------------------#
+    
+    def __copy__(self):
+        """
+            Returns new graph with the same vertices, edges and faces; since
+            the graph is already valid, these are copied directly, without the
+            checks made by Graph.addEdges
+        """
+        
+        new_graph = Graph()
+        
+        new_graph.ALLOWED_COLOR_LIST = self.ALLOWED_COLOR_LIST
+        new_graph.COLOR_TABLE = self.COLOR_TABLE
+        new_graph.R = self.R
+        new_graph.num_vert = self.num_vert
+        new_graph.canonical = self.canonical
+        new_graph.code_cache = self.code_cache
+        new_graph.face_size_count = Counter(self.face_size_count)
+        
+        # Create new objects first, then copy the incidences between them
+        
+        vert_dict = {}
+        for vert in self.vert_list:
+            new_vert = Vertex(label = vert.label, COLOR_TABLE = vert.COLOR_TABLE)
+            vert_dict[vert] = new_vert
+            
+        edge_dict = {edge: Edge() for edge in self.edge_list}
+        face_dict = {face: Face() for face in self.face_list}
+        
+        # Faces left over from before a move that clears the face list are
+        # not copied
+        
+        for vert, new_vert in vert_dict.items():
+            new_vert.edge_order = [edge_dict[edge] for edge in vert.edge_order]
+            new_vert.color_list = list(vert.color_list)
+            new_vert.in_arrow = list(vert.in_arrow)
+            new_vert.face_list = [face_dict.get(face) for face in vert.face_list]
+            
+        for edge, new_edge in edge_dict.items():
+            new_edge.start = vert_dict[edge.start]
+            new_edge.end = vert_dict[edge.end]
+            new_edge.orient = edge.orient
+            new_edge.color = edge.color
+            new_edge.twist = edge.twist
+            new_edge.face_left = face_dict.get(edge.face_left)
+            new_edge.face_right = face_dict.get(edge.face_right)
+            
+        for face in self.face_list:
+            face_dict[face].edge_list = [edge_dict[edge] for edge in face.edge_list]
+            
+        new_graph.vert_list = list(vert_dict.values())
+        new_graph.edge_list = EdgeList(edge_dict.values())
+        new_graph.face_list = [face_dict[face] for face in self.face_list]
+                
+        return new_graph
+        
+    #-------------------------------------------------------------------------#
+    
+    def __eq__(self, other):
+        
+        # First, we check that the number of vertices and edges are equal, as
+        # these are cheap to compare.
+        
+        if isinstance(other, (FrozenGraph, DartGraph)):
+            return other == self
+        
+        if self.num_vert != other.num_vert or len(self.edge_list) != len(other.edge_list):
+            return False
+        
+        # If both graphs have found their faces, the counts of faces of each
+        # size must agree; these take time in proportion to the largest face
+        # size to compare, rather than the size of the graph
+        
+        if self.face_list != [] and other.face_list != [] and self.face_size_count != other.face_size_count:
+            return False
+        
+        # Two graphs are isomorphic (preserving cyclic orders, orientations,
+        # colors and twists) exactly when their canonical codes are equal;
+        # the codes are cached, so repeated comparisons are cheap.
+        
+        return self.canonicalCode() == other.canonicalCode()
+
+    #-------------------------------------------------------------------------#
+    
+    def canonicalCode(self):
+        """
+            Returns canonical rotation-system code of graph, as a tuple of
+            integers; isomorphic graphs have equal codes, so that the code can
+            be used as a dictionary key to remove duplicate graphs.
+        """
+        
+        # The code is cached; since edge attributes can be changed directly
+        # through the Edge objects, the cache is only used if these are the
+        # same as when the code was computed.
+        
+        attr_list = [(edge.orient, edge.color, edge.twist) for edge in self.edge_list]
+        
+        if self.code_cache != None and self.code_cache[0] == attr_list:
+            return self.code_cache[1]
+        
+        code = canonicalDartCode(*self.dartTable())
+        self.code_cache = (attr_list, code)
+        
+        return code
+
+    #-------------------------------------------------------------------------#
+    
+    def dartEdges(self):
+        """
+            Returns [dart_edge, edge_darts], giving the label of the edge of
+            each dart, and the pair (start_dart, end_dart) for each edge
+        """
+        
+        # Darts for each vertex are numbered consecutively, following the
+        # cyclic order of the vertex. For a self-loop, the first appearance in
+        # the cyclic order is taken to be the start.
+        
+        edge_label_dict = {edge: label for label, edge in enumerate(self.edge_list)}
+        
+        dart_edge = []
+        dart_vert_list = [[] for edge in self.edge_list]
+        
+        for vert in self.vert_list:
+            for edge in vert.edge_order:
+                dart_vert_list[edge_label_dict[edge]] += [(len(dart_edge), vert)]
+                dart_edge += [edge_label_dict[edge]]
+        
+        edge_darts = []
+        
+        for edge, [(start_dart, start_vert), (end_dart, end_vert)] in zip(self.edge_list, dart_vert_list):
+            
+            # Make sure darts are matched with the correct end of the edge
+            
+            if start_vert != edge.start:
+                start_dart, end_dart = end_dart, start_dart
+                
+            edge_darts += [(start_dart, end_dart)]
+            
+        return [dart_edge, edge_darts]
+
+    #-------------------------------------------------------------------------#
+    
+    def dartTable(self):
+        """
+            Returns the graph as a rotation system [vert_deg, opp, dart_attr]
+            of darts, as used by canonicalDartCode, with darts numbered as in
+            Graph.dartEdges
+        """
+        
+        vert_deg = [len(vert.edge_order) for vert in self.vert_list]
+        [dart_edge, edge_darts] = self.dartEdges()
+        
+        opp = [None] * len(dart_edge)
+        dart_attr = [None] * len(dart_edge)
+        
+        for edge, (start_dart, end_dart) in zip(self.edge_list, edge_darts):
+            opp[start_dart] = end_dart
+            opp[end_dart] = start_dart
+            
+            # Orientation is given relative to each dart, +1 pointing into the
+            # vertex of the dart and -1 pointing away, as for Vertex.in_arrow
+            
+            orient = edge.orient if edge.orient else 0
+            color = edge.color if edge.color else 0
+            twist = edge.twist if edge.twist else 0
+            
+            dart_attr[start_dart] = (-orient, color, twist)
+            dart_attr[end_dart] = (orient, color, twist)
+            
+        return [vert_deg, opp, dart_attr]
+
+    #-------------------------------------------------------------------------#
+    
+    def edgeRows(self):
+        """
+            Returns edge list as rows [start, end, orient, color, twist] of
+            integers, with zero for a missing orientation, color or twist
+        """
+        
+        return [[edge.start.label, edge.end.label, edge.orient if edge.orient else 0, \
+                 edge.color if edge.color else 0, edge.twist if edge.twist else 0] \
+                for edge in self.edge_list]
+
+    #-------------------------------------------------------------------------#
+    
+    def edgeLine(self):
+        """
+            Returns graph as one line of text, giving the edges as start,end
+            (followed by ,orient,color,twist if any of these is set), then a
+            bar, then the edge labels around each vertex, e.g. for the theta
+            graph in the plane '0,1 0,1 0,1 | 0,1,2 0,2,1'; see readEdgeLine
+        """
+        
+        edge_text_list = []
+        
+        for row in self.edgeRows():
+            if row[2:] == [0, 0, 0]:
+                row = row[:2]
+            edge_text_list += [','.join([str(entry) for entry in row])]
+            
+        rotation_text_list = [','.join([str(label) for label in rotation]) for rotation in self.rotationRows()]
+        
+        return ' '.join(edge_text_list) + ' | ' + ' '.join(rotation_text_list)
+    
+    #-------------------------------------------------------------------------#
+    
+    def rotationRows(self):
+        """
+            Returns list of edge labels around each vertex, in cyclic order
+        """
+        
+        edge_label_dict = {edge: label for label, edge in enumerate(self.edge_list)}
+        
+        return [[edge_label_dict[edge] for edge in vert.edge_order] for vert in self.vert_list]
+
+    #-------------------------------------------------------------------------#
+    
+    def setRotations(self, rotation_rows):
+        """
+            Set cyclic order of each vertex from lists of edge labels, as
+            given by rotationRows; edges are assumed to be already connected
+        """
+        
+        self.code_cache = None
+        
+        edge_list = list(self.edge_list)
+        
+        for vert, rotation in zip(self.vert_list, rotation_rows):
+            vert.edge_order = [edge_list[label] for label in rotation]
+            vert.color_list = [edge.color if edge.color else 0 for edge in vert.edge_order]
+            vert.in_arrow = [vert.arrowAt(place) for place in range(len(vert.edge_order))]
+
+    #-------------------------------------------------------------------------#
+    
+    def freeze(self):
+        """
+            Returns immutable, hashable FrozenGraph snapshot of graph
+        """
+        
+        return FrozenGraph(self)
+
+    #-------------------------------------------------------------------------#
+    
+    def toDartGraph(self):
+        """
+            Returns DartGraph with the same edges and cyclic orders
+        """
+        
+        dart_graph = DartGraph(num_vert = self.num_vert, r = self.R)
+        dart_graph.wireDarts(self.edgeRows(), self.rotationRows())
+        
+        return dart_graph
+
+    #-------------------------------------------------------------------------#
+    
+    def automorphisms(self):
+        """
+            Returns the automorphisms of the graph preserving cyclic orders,
+            orientations, colors and twists, as found by dartAutomorphisms,
+            as [generator_list, order, vert_orbit, edge_orbit, dart_orbit].
+            Each generator is an array giving the image of every dart, with
+            darts numbered as in Graph.dartTable; the orbits are arrays giving
+            the smallest label in the orbit of every vertex, edge and dart.
+            The graph must be connected.
+        """
+        
+        [vert_deg, opp, dart_attr] = self.dartTable()
+        [generator_list, order, dart_orbit] = dartAutomorphisms(vert_deg, opp, dart_attr)
+        
+        first, dart_vert = dartOffsets(vert_deg)
+        
+        # The smallest dart in an orbit is at the smallest vertex of the orbit,
+        # and an edge is in the orbits of both of its darts
+        
+        vert_orbit = array('i', [dart_vert[dart_orbit[first[vert]]] if vert_deg[vert] else vert \
+                                 for vert in range(self.num_vert)])
+        
+        [dart_edge, edge_darts] = self.dartEdges()
+        
+        orbit_edge_dict = {}
+        for dart in range(len(opp)):
+            orbit_edge_dict[dart_orbit[dart]] = min(orbit_edge_dict.get(dart_orbit[dart], dart_edge[dart]), \
+                                                    dart_edge[dart])
+        
+        edge_orbit = array('i', [0] * len(self.edge_list))
+        for dart in range(len(opp)):
+            edge_orbit[dart_edge[dart]] = min(orbit_edge_dict[dart_orbit[dart]], orbit_edge_dict[dart_orbit[opp[dart]]])
+            
+        return [generator_list, order, vert_orbit, edge_orbit, dart_orbit]
+        
+    #-------------------------------------------------------------------------#
+    
+    def graphSym(self, non_iso_edges = True):
+        """
+            Returns the symmetries of the graph, as found by
+            Graph.automorphisms. If non_iso_edges is True, returns the
+            smallest vertex and edge label in each orbit; otherwise returns
+            every symmetry, as lists of the images of the vertex labels and of
+            the edge labels.
+        """
+        
+        [generator_list, order, vert_orbit, edge_orbit, dart_orbit] = self.automorphisms()
+        
+        if non_iso_edges:
+            return [sorted(set(vert_orbit)), sorted(set(edge_orbit))]
+        
+        # Each symmetry is fixed by the image of dart 0, which is some dart in
+        # its orbit
+        
+        [vert_deg, opp, dart_attr] = self.dartTable()
+        first, dart_vert = dartOffsets(vert_deg)
+        
+        next_dart = [first[dart_vert[dart]] + (dart - first[dart_vert[dart]] + 1) % vert_deg[dart_vert[dart]] \
+                     for dart in range(len(opp))]
+        
+        [dart_edge, edge_darts] = self.dartEdges()
+        
+        vert_sym_list = []
+        edge_sym_list = []
+        
+        for image_dart in range(len(opp)):
+            if dart_orbit[image_dart] != dart_orbit[0]:
+                continue
+            
+            image = extendDartMap(0, image_dart, next_dart, opp, dart_attr)
+            
+            vert_sym_list += [[dart_vert[image[first[vert]]] for vert in range(self.num_vert)]]
+            edge_sym_list += [[dart_edge[image[start_dart]] for (start_dart, end_dart) in edge_darts]]
+            
+        return [vert_sym_list, edge_sym_list]
+
+    #-------------------------------------------------------------------------#
+        
+    def addEdges(self, added_edge_list):
+        """
+            Add edges to graph, given as list of vertex labels [start, end, (orient), (color), (twist)]
+        """
+        
+        # Added edge list must be (1) a list of (2) lists in the form [start,
+        # end, (orient), (color), (twist)], where (3) start, end are integers from 0 to num_vert - 1, and
+        # (4) start < end.
+        
+        if type(added_edge_list) != list:
+            raise ValueError('Added edges must be given in list')
+            
+        if any([(type(edge) != list or not(2 <= len(edge) <= 5) \
+                 or any([type(label) not in [int, type(None)] for label in edge])) for edge in added_edge_list]):
+            raise ValueError('Entries in added edge list must be in form [start, end, (orient), (color), (twist)]')
+            
+        if any([(min(edge[:2]) < 0 or max(edge[:2]) >= self.num_vert) for edge in added_edge_list]):
+            raise ValueError('Vertex labels must be between 0 and {}'.format(self.num_vert - 1))
+            
+        # Edges are added to vertex CCW in order given in added edge list;
+        # Vertex.connectEdge tests whether too many edges added to vertex, which
+        # also ensures total number of edges does not exceed 3/2 number of vertices.
+
+        # Also, vertices are given as integers in added_edge_list, so we use
+        # self.vert_list to change them into the appropriate Vertex objects.
+        
+        self.code_cache = None
+        
+        for edge in added_edge_list:
+            start_vert = self.vert_list[edge[0]]
+            end_vert = self.vert_list[edge[1]]
+            
+            if len(edge) == 2:
+                new_edge = Edge(start = start_vert, end = end_vert)
+            elif len(edge) == 3:
+                new_edge = Edge(start = start_vert, end = end_vert, orient = edge[2])
+            elif len(edge) == 4:
+                new_edge = Edge(start = start_vert, end = end_vert, orient = edge[2], \
+                                color = edge[3])
+            else:
+                new_edge = Edge(start = start_vert, end = end_vert, orient = edge[2], \
+                                color = edge[3], twist = edge[4])
+            
+            start_vert.connectEdge(new_edge)
+            end_vert.connectEdge(new_edge)
+            
+            self.edge_list.append(new_edge)
+            
+    #-------------------------------------------------------------------------#
+    
+    def addEdgeArray(self, edge_array):
+        """
+            Add edges given either as an integer array of shape (E, 2) to
+            (E, 5), such as a NumPy array, with rows [start, end, (orient),
+            (color), (twist)], or as a list of two to five lists giving the
+            starts, ends, orientations, colors and twists, with zero for a
+            missing value. All edges are checked together before any is added;
+            as for addEdges, edges are placed next in CCW order at each vertex.
+        """
+        
+        if hasattr(edge_array, 'shape') and numpy is not None:
+            self.addEdgeNumpy(numpy.asarray(edge_array))
+            return
+        
+        if hasattr(edge_array, 'shape'):
+            if len(edge_array.shape) != 2 or not (2 <= edge_array.shape[1] <= 5):
+                raise ValueError('Edge array must have shape (E, 2) to (E, 5)')
+                
+            column_list = [list(column) for column in zip(*edge_array)]
+        else:
+            column_list = [list(column) for column in edge_array]
+            
+            if not (2 <= len(column_list) <= 5) or len({len(column) for column in column_list}) != 1:
+                raise ValueError('Edge arrays must be two to five lists of the same length')
+        
+        num_edges = len(column_list[0])
+        column_list += [[0] * num_edges] * (5 - len(column_list))
+        [start_list, end_list, orient_list, color_list, twist_list] = column_list
+        
+        if num_edges == 0:
+            return
+        
+        # Check entries one column at a time
+        
+        if any([not set(map(type, column)) <= {int} for column in column_list]):
+            raise ValueError('Entries in edge arrays must be integers')
+        
+        if min(min(start_list), min(end_list)) < 0 or max(max(start_list), max(end_list)) >= self.num_vert:
+            raise ValueError('Vertex labels must be between 0 and {}'.format(self.num_vert - 1))
+            
+        if not set(orient_list) <= {-1, 0, 1}:
+            raise ValueError('orient must be +/- 1')
+            
+        if min(color_list) < 0:
+            raise ValueError('color must be positive integer')
+            
+        # Count the edges each vertex would have
+        
+        for vert, count in Counter(start_list + end_list).items():
+            if len(self.vert_list[vert].edge_order) + count > 3:
+                raise ValueError('Vertex {} already trivalent'.format(vert))
+        
+        # If any colors or orientations are given, find the colors and arrows
+        # each vertex would have, to check the vertex rules
+        
+        if any(color_list) or any(orient_list):
+            vert_color_list = {}
+            vert_arrow_list = {}
+            
+            for (start, end, orient, color) in zip(start_list, end_list, orient_list, color_list):
+                for (vert, arrow) in [(start, -orient), (end, orient)]:
+                    if vert not in vert_color_list:
+                        vert_color_list[vert] = list(self.vert_list[vert].color_list)
+                        vert_arrow_list[vert] = list(self.vert_list[vert].in_arrow)
+                        
+                    vert_color_list[vert] += [color]
+                    vert_arrow_list[vert] += [arrow]
+                    
+            for vert, vert_colors in vert_color_list.items():
+                if (0 not in vert_colors) and len(vert_colors) == 3 and vert_colors not in self.COLOR_TABLE:
+                    raise AttributeError('Edge color does not satisfy vertex rules')
+                    
+                if abs(sum(vert_arrow_list[vert])) == 3:
+                    raise AttributeError('Edge orientation results in source or sink')
+        
+        # All tests passed
+        
+        self.wireEdges(zip(start_list, end_list, orient_list, color_list, twist_list))
+        
+    #-------------------------------------------------------------------------#
+    
+    def addEdgeNumpy(self, edge_array):
+        """
+            Same as addEdgeArray for a NumPy array of shape (E, 2) to (E, 5),
+            with the checks done on whole columns; only the vertices the new
+            edges touch are looked up in vert_list
+        """
+        
+        if edge_array.ndim != 2 or not (2 <= edge_array.shape[1] <= 5):
+            raise ValueError('Edge array must have shape (E, 2) to (E, 5)')
+            
+        if not numpy.issubdtype(edge_array.dtype, numpy.integer):
+            raise ValueError('Entries in edge arrays must be integers')
+        
+        num_edges = edge_array.shape[0]
+        
+        if num_edges == 0:
+            return
+        
+        full_array = numpy.zeros((num_edges, 5), dtype = numpy.int64)
+        full_array[:, :edge_array.shape[1]] = edge_array
+        (start_col, end_col, orient_col, color_col, twist_col) = full_array.T
+        
+        if full_array[:, :2].min() < 0 or full_array[:, :2].max() >= self.num_vert:
+            raise ValueError('Vertex labels must be between 0 and {}'.format(self.num_vert - 1))
+            
+        if (numpy.abs(orient_col) > 1).any():
+            raise ValueError('orient must be +/- 1')
+            
+        if (color_col < 0).any():
+            raise ValueError('color must be positive integer')
+            
+        # Count the edges each vertex would have, with one dart per end
+        
+        dart_vert = numpy.concatenate([start_col, end_col])
+        touched = numpy.unique(dart_vert)
+        
+        old_degree = numpy.zeros(self.num_vert, dtype = numpy.int64)
+        old_degree[touched] = [len(self.vert_list[vert].edge_order) for vert in touched.tolist()]
+        degree = old_degree + numpy.bincount(dart_vert, minlength = self.num_vert)
+        
+        over = degree[dart_vert] > 3
+        
+        if over.any():
+            raise ValueError('Vertex {} already trivalent'.format(dart_vert[over.argmax()]))
+        
+        # If any colors or orientations are given, fill in the colors and
+        # arrows each touched vertex would have, the new darts at a vertex
+        # going after its old edges, and check them all together
+        
+        if color_col.any() or orient_col.any():
+            vert_colors = numpy.zeros((self.num_vert, 3), dtype = numpy.int64)
+            vert_arrows = numpy.zeros((self.num_vert, 3), dtype = numpy.int64)
+            
+            for vert in touched.tolist():
+                num_old = len(self.vert_list[vert].edge_order)
+                vert_colors[vert, :num_old] = self.vert_list[vert].color_list
+                vert_arrows[vert, :num_old] = self.vert_list[vert].in_arrow
+                
+            # Place of each dart among the new darts at its vertex
+            
+            order = numpy.argsort(dart_vert, kind = 'stable')
+            sorted_vert = dart_vert[order]
+            place = numpy.empty(len(dart_vert), dtype = numpy.int64)
+            place[order] = numpy.arange(len(dart_vert)) - numpy.searchsorted(sorted_vert, sorted_vert)
+            place += old_degree[dart_vert]
+            
+            vert_colors[dart_vert, place] = numpy.concatenate([color_col, color_col])
+            vert_arrows[dart_vert, place] = numpy.concatenate([-orient_col, orient_col])
+            
+            touched_colors = vert_colors[touched]
+            size = self.COLOR_TABLE.size
+            table = numpy.frombuffer(self.COLOR_TABLE.table, dtype = numpy.uint8)
+            
+            checked = (degree[touched] == 3) & (touched_colors != 0).all(axis = 1)
+            in_range = (touched_colors < size).all(axis = 1)
+            
+            index = numpy.where(in_range[:, None], touched_colors, 0)
+            index = (index[:, 0] * size + index[:, 1]) * size + index[:, 2]
+            
+            if (checked & ~(in_range & (table[index] == 1))).any():
+                raise AttributeError('Edge color does not satisfy vertex rules')
+                
+            if (numpy.abs(vert_arrows[touched].sum(axis = 1)) == 3).any():
+                raise AttributeError('Edge orientation results in source or sink')
+        
+        # All tests passed
+        
+        self.wireEdges(full_array.tolist())
+        
+    #-------------------------------------------------------------------------#
     
+    def wireEdges(self, edge_rows):
+        """
+            Add edges given as integer rows [start, end, orient, color, twist]
+            without any validation, for rows taken from an existing valid graph
+        """
+        
+        # Zero entries in the rows stand for missing values; the cyclic order
+        # of each vertex follows the order of the rows, as for addEdges.
+        
+        self.code_cache = None
+        vert_list = self.vert_list
+        
+        for (start, end, orient, color, twist) in edge_rows:
+            start_vert = vert_list[start]
+            end_vert = vert_list[end]
+            
+            new_edge = Edge(start = start_vert, end = end_vert, orient = orient if orient else None, \
+                            color = color if color else None, twist = twist if twist else None)
+            
+            start_vert.edge_order.append(new_edge)
+            start_vert.color_list.append(color)
+            start_vert.in_arrow.append(-orient)
+            
+            end_vert.edge_order.append(new_edge)
+            end_vert.color_list.append(color)
+            end_vert.in_arrow.append(orient)
+            
+            self.edge_list.append(new_edge)
+            
     #-------------------------------------------------------------------------#
     
-    def permuteOrder(self, dir = True):
+    def reverseEdge(self, edge_label = None):
         """
-            Changes edge order e0 e1 e2 -> e1 e2 e0 (dir = True) or e2 e0 e1
+            Swap start and end of edge, leaving the graph itself unchanged
         """
         
-        if dir:
-            self.edge_order = self.edge_order[1:] + [self.edge_order[0]]
-            self.in_arrow = self.in_arrow[1:] + [self.in_arrow[0]]
+        if type(edge_label) != int or edge_label < 0 or edge_label >= len(self.edge_list):
+            raise ValueError('edge label must be between 0 and {}'.format(len(self.edge_list) - 1))
+            
+        current_edge = self.edge_list[edge_label]
+        
+        # The orientation changes sign, so that the arrow still points the
+        # same way, and the left, right faces are swapped
+        
+        if current_edge.orient:
+            current_edge.orient = -current_edge.orient
+            
+        current_edge.face_left, current_edge.face_right = current_edge.face_right, current_edge.face_left
+        
+        if current_edge.start != current_edge.end:
+            current_edge.start, current_edge.end = current_edge.end, current_edge.start
         else:
-            self.edge_order = [self.edge_order[-1]] + self.edge_order[:-1]
-            self.in_arrow = [self.in_arrow[-1]] + self.in_arrow[:-1]
+            
+            # The start of a self-loop is its first appearance in the cyclic
+            # order, so shift the cyclic order to begin with the second
+            
+            vert = current_edge.start
+            place = [iii for iii, edge in enumerate(vert.edge_order) if edge == current_edge][1]
+            
+            vert.edge_order = vert.edge_order[place:] + vert.edge_order[:place]
+            vert.color_list = vert.color_list[place:] + vert.color_list[:place]
+            vert.in_arrow = vert.in_arrow[place:] + vert.in_arrow[:place]
+            vert.face_list = vert.face_list[place:] + vert.face_list[:place]
+            
+    #-------------------------------------------------------------------------#
+        
+    def addVertices(self, added_num_vert):
+        """
+            Add given number of vertices to graph.
+        """
+        
+        if type(added_num_vert) != int or added_num_vert <= 0:
+            raise ValueError('Number of added vertices must be positive integer')
+        
+        for iii in range(added_num_vert):
+            self.vert_list += [Vertex(label = self.num_vert + iii, COLOR_TABLE = self.COLOR_TABLE)]
+        
+        self.num_vert += added_num_vert
+        self.code_cache = None
         
     #-------------------------------------------------------------------------#
     
-    def removeEdge(self, remove_edge = None):
+    def oneMove(self, edge_label = None, undo = False):
+        if edge_label != None:
+            
+            if type(edge_label) != int or edge_label < 0:
+                raise ValueError('edge label must be positive integer')
+                
+            if edge_label >= 3 * self.num_vert // 2:
+                raise ValueError('edge label must be between 0 and {}'.format(3 * self.num_vert // 2))
+            
+            current_edge = self.edge_list[edge_label]
+            
+            # Record state for Graph.undo before anything is changed
+            
+            token = self.undoToken([current_edge.start, current_edge.end]) if undo else None
+            
+            current_end = current_edge.end
+                
+            # First, we create two new vertices. The two new vertices will have
+            # labels larger than any other current vertices in the graph, so we
+            # put them as the end of the vertex list.
+            
+            self.vert_list += [Vertex(label = self.num_vert, COLOR_TABLE = self.COLOR_TABLE), \
+                               Vertex(label = self.num_vert + 1, COLOR_TABLE = self.COLOR_TABLE)]
+            self.num_vert += 2
+            self.code_cache = None
+            
+            # We have the original edge ab, and we want to add vertices x, y
+            # so that we can put in edges ax, bx, xy, yy (self-loop). To 
+            # preserve the cyclic order for the original vertices, we need to
+            # do the following:
+            #
+            #   (1) change ab to ax, add bx immediately after
+            #   (2) add xy, yy at the end of the edge list
+            #
+            # Note that if we add bx immediately *before* ax, then we get a
+            # self-loop on the other side of the original edge. The current
+            # order puts the self-loop on the left-hand side of the edge as
+            # one travels from start to end; putting it before places it on the
+            # right-hand side, going in the same direction.
+            
+            current_edge.end = self.vert_list[-2]
+            
+            edge_bx = Edge(start = current_end, end = self.vert_list[-2])
+            edge_xy = Edge(start = self.vert_list[-2], end = self.vert_list[-1])
+            edge_yy = Edge(start = self.vert_list[-1], end = self.vert_list[-1])
+            
+            self.edge_list.insertAfter(current_edge, [edge_bx])
+            self.edge_list.extend([edge_xy, edge_yy])
+            
+            current_end.replaceEdge(remove_edge = current_edge, added_edge = edge_bx)
+            
+            self.vert_list[-2].connectEdge(current_edge)
+            self.vert_list[-2].connectEdge(edge_bx)
+            self.vert_list[-2].connectEdge(edge_xy)
+            
+            self.vert_list[-1].connectEdge(edge_xy)
+            self.vert_list[-1].connectEdge(edge_yy)
+            self.vert_list[-1].connectEdge(edge_yy)
+            
+            # If faces have been found, the faces on either side of ab gain
+            # the new edges, and the self-loop bounds a new face; each is
+            # traced again from a corner at x or y, where
+            #
+            #   x: a b y
+            #   y: x y y
+            
+            if self.face_list != []:
+                face_left, face_right = current_edge.face_left, current_edge.face_right
+                
+                # If ab is a self-loop, the end at b was the first place in
+                # the cyclic order, so ax now leaves a from the other side
+                
+                if current_edge.start == current_end:
+                    face_left, face_right = face_right, face_left
+                
+                new_face = Face()
+                self.face_list += [new_face]
+                
+                self.traceFace(face_right, self.vert_list[-2], 0)
+                self.traceFace(face_left, self.vert_list[-2], 2)
+                self.traceFace(new_face, self.vert_list[-1], 1)
+            
+            # Return edges that have changed in graph edge list, so that edge
+            # colors/orientations can be modified for new edges
+            
+            if undo:
+                return [edge_xy, edge_yy], token
+            
+            return [edge_xy, edge_yy]
+            
+    #-------------------------------------------------------------------------#
+    
+    def twoMove(self, edge_label = None, undo = False):
         
-        if len(self.edge_order) == 0:
-            raise ValueError(f'Vertex {self.label} already disconnected')
+        if edge_label != None:
+            
+            if type(edge_label) != int or edge_label < 0:
+                raise ValueError('edge label must be positive integer')
+                
+            if edge_label >= 3 * self.num_vert // 2:
+                raise ValueError('edge label must be between 0 and {}'.format(3 * self.num_vert // 2))
+            
+            current_edge = self.edge_list[edge_label]
+            
+            # Record state for Graph.undo before anything is changed
+            
+            token = self.undoToken([current_edge.start, current_edge.end]) if undo else None
+            
+            current_end = current_edge.end
+                
+            # First, we create two new vertices. The two new vertices will have
+            # labels larger than any other current vertices in the graph, so we
+            # put them as the end of the vertex list.
+            
+            self.vert_list += [Vertex(label = self.num_vert, COLOR_TABLE = self.COLOR_TABLE), \
+                               Vertex(label = self.num_vert + 1, COLOR_TABLE = self.COLOR_TABLE)]
+            self.num_vert += 2
+            self.code_cache = None
+            
+            # We have the original edge ab, and we want to add vertices x, y
+            # so that we can put in two edges xy. To preserve the cyclic
+            # order, we have to change ab to ax, then add xy_1, by, xy_2
+            # immediately after. This is necessary to preserve the cyclic
+            # orders for a, b (edge by right after ax), as well as those for
+            # x, y:
+            #
+            #   x: a e1 e2
+            #   y: e1 b e2
+            
+            current_edge.end = self.vert_list[-2]
+            
+            edge_by = Edge(start = current_end, end = self.vert_list[-1])
+            edge_xy1 = Edge(start = self.vert_list[-2], end = self.vert_list[-1])
+            edge_xy2 = Edge(start = self.vert_list[-2], end = self.vert_list[-1])
+            
+            self.edge_list.insertAfter(current_edge, [edge_xy1, edge_by, edge_xy2])
+            
+            current_end.replaceEdge(remove_edge = current_edge, added_edge = edge_by)
+            
+            self.vert_list[-2].connectEdge(current_edge)
+            self.vert_list[-2].connectEdge(edge_xy1)
+            self.vert_list[-2].connectEdge(edge_xy2)
+            
+            # Since y is on the other side of the face determined by the two
+            # new edges, the
+            
+            self.vert_list[-1].connectEdge(edge_xy1)
+            self.vert_list[-1].connectEdge(edge_by)
+            self.vert_list[-1].connectEdge(edge_xy2)
+            
+            # If faces have been found, the faces on either side of ab gain
+            # the new edges, and the two edges xy bound a new face; each is
+            # traced again from a corner at x
+            
+            if self.face_list != []:
+                face_left, face_right = current_edge.face_left, current_edge.face_right
+                
+                # If ab is a self-loop, the end at b was the first place in
+                # the cyclic order, so ax now leaves a from the other side
+                
+                if current_edge.start == current_end:
+                    face_left, face_right = face_right, face_left
+                
+                new_face = Face()
+                self.face_list += [new_face]
+                
+                self.traceFace(face_right, self.vert_list[-2], 0)
+                self.traceFace(face_left, self.vert_list[-2], 2)
+                self.traceFace(new_face, self.vert_list[-2], 1)
+            
+            # Return edges that have changed in graph edge list, so that edge
+            # colors/orientations can be modified for new edges
+            
+            if undo:
+                return [edge_by, edge_xy1, edge_xy2], token
+            
+            return [edge_by, edge_xy1, edge_xy2]
+            
+    #-------------------------------------------------------------------------#
+    
+    def threeMove(self, vert_label = None, undo = False):
+        
+        if vert_label != None:
+            
+            if type(vert_label) != int or vert_label < 0:
+                raise ValueError('vertex label must be a positive integer')
+                
+            if vert_label >= self.num_vert:
+                raise ValueError('vertex label must be between 0 and {}'.format(self.num_vert - 1))
+            
+            # Record state for Graph.undo before anything is changed
+            
+            token = self.undoToken([self.vert_list[vert_label]]) if undo else None
+            
+            # If faces have not been created, do so here
+            
+            if self.face_list == []:
+                self.findFaces()
+                
+            current_vert = self.vert_list[vert_label]
+            adj_edges = current_vert.edgeOrder()
+                
+            # First, we create two new vertices. The two new vertices will have
+            # labels larger than any other current vertices in the graph, so we
+            # put them as the end of the vertex list.
+            
+            self.vert_list += [Vertex(label = self.num_vert, COLOR_TABLE = self.COLOR_TABLE), \
+                               Vertex(label = self.num_vert + 1, COLOR_TABLE = self.COLOR_TABLE)]
+            self.num_vert += 2
+            self.code_cache = None
+            
+            # We have the current vertex x, and the three vertices a, b, c in
+            # CCW order around it. So, before this move, the edges ax, bx, cx
+            # appear in that order in the edge list for the graph. We create
+            # two new vertices y, z, and do the following:
+            #
+            #   (1) add edges xy, xz immediately after ax
+            #   (2) change edge bx to by, add edge yz immediately after
+            #   (3) change edge cx to cz
+            #
+            # This gives the ordering ax xy xz ... by yz ... cz, so that the
+            # cyclic orders around each vertex are given by
+            #
+            #   x: ayz
+            #   y: xbz
+            #   z: xyc
+            #
+            # The orderings around a, b, c are preserved, since we do not
+            # change their relative ordering, but just alter what they are
+            # connected to. Note that we could not move all of the existing
+            # vertices to the beginning of each cyclic order, since this would
+            # have given inconsistent orderings for x, y, z -- a would give yz,
+            # b would give zx, and c would give xy.
+            #
+            # Remember that A[-2] comes before A[-1] in a Python list, so the
+            # former corresponds to y, the latter to z.
+            
+            # (1) add edges xy, xz immediately after ax
+            
+            for iii in [1, 2]:
+                if adj_edges[iii].start != current_vert:
+                    adj_edges[iii].end = None
+                else:
+                    adj_edges[iii].start = None
+                    
+                    # Since the current vertex is the start of this edge, it
+                    # is removed, to be replaced later by one of the new
+                    # vertices, and the end is moved to the start. This flips
+                    # the edge orientation, so we flip the faces here as well.
+                    
+                    face_left, face_right = adj_edges[iii].face_left, adj_edges[iii].face_right
+                    
+                    adj_edges[iii].setLeftFace(face_right)
+                    adj_edges[iii].setRightFace(face_left)
+                    
+                current_vert.removeEdge(adj_edges[iii])
+                    
+            edge_xy = Edge(start = current_vert, end = self.vert_list[-2])
+            edge_xz = Edge(start = current_vert, end = self.vert_list[-1])
             
-        if remove_edge in self.edge_order:
-            place = self.edge_order.index(remove_edge)
+            self.edge_list.insertAfter(adj_edges[0], [edge_xy, edge_xz])
+                
+            current_vert.connectEdge(edge_xy)
+            current_vert.connectEdge(edge_xz)
+            self.vert_list[-2].connectEdge(edge_xy)
+            self.vert_list[-1].connectEdge(edge_xz)
+                
+            # (2) change edge bx to by, add edge yz immediately after
             
-            del self.edge_order[place]
-            del self.color_list[place]
-            del self.in_arrow[place]
-        else:
-            raise ValueError(f'Edge {remove_edge} not connected to vertex {self.label}')
+            if adj_edges[1].start == None:              # To ensure ordered vertex labels
+                adj_edges[1].start = adj_edges[1].end
+                if adj_edges[1].orient != None:
+                    adj_edges[1].orient = -adj_edges[1].orient
+            adj_edges[1].end = self.vert_list[-2]
+                
+            edge_yz = Edge(start = self.vert_list[-2], end = self.vert_list[-1])
             
-    #-------------------------------------------------------------------------#
-    
-    def changeEdgeOrient(self, change_edge = None):
-        """
-            Reverse the orientation of change_edge at the vertex
-        """
-        
-        if type(change_edge) != Edge:
-            raise ValueError('Must have Edge object to change edge orientation')
+            self.edge_list.insertAfter(adj_edges[1], [edge_yz])
+            self.vert_list[-2].connectEdge(adj_edges[1])
             
-        edge_index = self.edge_order.index(change_edge)
-        new_in_arrow_list = [arrow for arrow in self.in_arrow]
-        new_in_arrow_list[edge_index] = -new_in_arrow_list[edge_index]
-        
-        if abs(sum(new_in_arrow_list)) == 3:
-            raise AttributeError('Orientation change results in source or sink')
-        else:
-            self.in_arrow[edge_index] = -self.in_arrow[edge_index]
-        
-    #-------------------------------------------------------------------------#
-    
-    def addFace(self, new_face):
-        if type(new_face) != Face:
-            raise ValueError('incident face must be Face object')
-        else:
+            self.vert_list[-2].connectEdge(edge_yz)
+            self.vert_list[-1].connectEdge(edge_yz)
+            
+            # (3) change edge cx to cz
+            
+            if adj_edges[2].start == None:              # To ensure ordered vertex labels
+                adj_edges[2].start = adj_edges[2].end
+                if adj_edges[2].orient != None:
+                    adj_edges[2].orient = -adj_edges[2].orient
+            adj_edges[2].end = self.vert_list[-1]
+                
+            self.vert_list[-1].connectEdge(adj_edges[2])
+            
+            # Modify vertex, edge face lists as appropriate
+            
+            new_face = Face()
             self.face_list += [new_face]
-        
-    #-------------------------------------------------------------------------#
-    
-    def colorList(self):
-        return [color for color in self.color_list if color != 0]
-        
-    #-------------------------------------------------------------------------#
-    
-    def inArrow(self):
-        return [dir for dir in self.in_arrow]
-        
-    #-------------------------------------------------------------------------#
-    
-    def edgeOrder(self):
-        return [edge for edge in self.edge_order]
-        
+            
+            [face_a, face_b, face_c] = current_vert.face_list
+            
+            # The faces around the new face are traced again, rather than
+            # patched, since an edge on both sides of a face appears twice in
+            # its edge list; each is started at a corner of x or y
+            #
+            #   x: ax xy xz  (face_a, face_b, new_face)
+            #   y: xy by yz  (new_face, face_b, face_c)
+            
+            self.traceFace(face_a, current_vert, 2)
+            self.traceFace(face_b, current_vert, 0)
+            self.traceFace(face_c, self.vert_list[-2], 1)
+            self.traceFace(new_face, current_vert, 1)
+            
+            # Return edges that have changed in graph edge list, so that edge
+            # colors/orientations can be modified for new edges
+            
+            if undo:
+                return [edge_xy, edge_xz, edge_yz], token
+            
+            return [edge_xy, edge_xz, edge_yz]
+            
     #-------------------------------------------------------------------------#
     
-    def label(self):
-        return self.label
-
-#=============================================================================#
-
-class Edge:
-    
-    def __init__(self, start = None, end = None, orient = None, color = None, twist = None):
-        
-        if start and type(start) != Vertex:
-            raise ValueError('start must be a Vertex object')
+    def fourMove(self, edge_label = None, undo = False):
         
-        if end and type(end) != Vertex:
-            raise ValueError('end must be a Vertex object')
+        if edge_label != None:
+            
+            if type(edge_label) != int or edge_label < 0:
+                raise ValueError('edge label must be positive integer')
+                
+            if edge_label >= 3 * self.num_vert // 2:
+                raise ValueError('edge label must be between 0 and {}'.format(3 * self.num_vert // 2))
+            
+            current_edge = self.edge_list[edge_label]
+            current_start = current_edge.start
+            current_end = current_edge.end
+            
+            if current_start == current_end:
+                raise ValueError('start, end vertices must be distinct')
+                
+            # Record state for Graph.undo before anything is changed
+            
+            token = self.undoToken([current_start, current_end]) if undo else None
+            
+            # If faces have not been created, do so here
+            
+            if self.face_list == []:
+                self.findFaces()
+                
+            # First, we create two new vertices. The two new vertices will have
+            # labels larger than any other current vertices in the graph, so we
+            # put them as the end of the vertex list.
+            
+            self.vert_list += [Vertex(label = self.num_vert, COLOR_TABLE = self.COLOR_TABLE), \
+                               Vertex(label = self.num_vert + 1, COLOR_TABLE = self.COLOR_TABLE)]
+            self.num_vert += 2
+            self.code_cache = None
+            
+            # We have the current edge with vertices x < y. The cyclic order of
+            # x is of the form ax, bx, xy, while that for y is cy, dy, xy;
+            # however, the order in of these edges in the graph edge list is
+            # not definite, since there are three possible orderings of the
+            # edges in the cyclic order for each vertex x, y.
+            
+            # We create two new vertices w, z, where w is self.vert_list[-2],
+            # z is self.vert_list[-1]; when a, b, c, d are all distinct, we
+            # go through the this process:
+            #
+            #   (1) identify ax, bx, then remove edge xy from cyclic order of x
+            #   (2a) if a = b = x (so cyclic order is xx xx xy), change first
+            #       xx -> xw, add xz xw immediately after
+            #   (2b) if a != b, change edge ax to aw, add xw immediately after;
+            #       add edge xz immediately after bx
+            #   (3) identify cy, dy, then remove edge xy from cyclic order of y
+            #   (4a) if c = d = y (so cyclic order is yy yy xy), change first
+            #       yy -> yz, add yw yz immediately after
+            #   (4b) if c != d, change edge cy to cz, add yz immediately after;
+            #       add edge wy immediately after dy
+            #
+            # Since we do not move ax -> aw, cy -> cz, the cyclic orders for
+            # a, c remain the same; similarly, the edges bx, dy have not been
+            # changed at all, unless there is a double edge between vertices.
+            # This gives the following orderings:
+            #
+            #   x: wbz
+            #   y: zdw
+            #   w: axy
+            #   z: xcy
+            #
+            # If a = b = x (i.e. a self-loop on vertex x), then the cyclic
+            # order changes as xw(1) xz zw(2), and cy dy xy -> cz yz dy wy.
+            #
+            #   x: w1 z w2
+            #   y: zdw
+            #   w: x1 x2 y
+            #   z: xcy
+            #
+            # If b = y, c = x (i.e. double edge between x, y), then the cyclic
+            # order changes ax xy(1) xy(2) and xy(1) dy xy(2), where we assume
+            # the move is performed on xy(2). Then ax xy(1) xy(2) ->
+            # aw xw xz(1) xz(2) and xy(1) dy xy(2) -> xz(1) yz dy wy, since (2b)
+            # keep xy(1) ('bx') the same and puts xz(2) immediately after, but
+            # then (4b) changes xy(1) ('cy') to xz(1) ('cz'), and puts yz
+            # immediately after. Thus, three copies of xz are listed, but only
+            # two edges exist, and their final order is xz(1) yz zx(2). The
+            # cyclic order becomes:
+            #
+            #   x: w z1 z2
+            #   y: zdw
+            #   w: axy
+            #   z: x1 y x2
+            
+            # (1) identify ax, bx, then remove edge xy from cyclic order of x
+            
+            x_index = current_start.edge_order.index(current_edge)
+            
+            edge_ax = current_start.edge_order[x_index - 2]
+            index_ax = self.edge_list.index(edge_ax)
+            
+            edge_bx = current_start.edge_order[x_index - 1]     # current_edge not a self-loop
+            
+            current_start.removeEdge(current_edge)
+            
+            edge_xz = Edge(start = current_start, end = self.vert_list[-1])
+            edge_xw = Edge(start = current_start, end = self.vert_list[-2])
+            
+            # if edge_ax == edge_bx:      # current_start has self-loop
+            
+            #     # (2a) if a = b = x (so cyclic order is xx xx xy), change first
+            #     #   xx -> xw, add xz xw immediately after
+                
+            #     edge_ax.end = self.vert_list[-2]
+            #     current_start.removeEdge(edge_ax)
+                
+            #     self.edge_list = self.edge_list[:(index_ax + 1)] + [edge_xz, \
+            #         edge_xw] + self.edge_list[(index_ax + 1):]
+                    
+            #     index_bx = index_ax
+                
+            # else:
+                
+            # (2b) if a != b, change edge ax to aw, add xw immediately after;
+            #   add edge xz immediately after bx
+            
+            if edge_ax.start == current_start:
+                edge_ax.start = edge_ax.end
+                
+                # Since we are flipping the orientation of the edge, we must
+                # change the sign of the orientation, as well as the left,
+                # right faces
+                
+                if edge_ax.color != None:
+                    edge_ax.orient = -edge_ax.orient
+                    
+                ax_face_left, ax_face_right = edge_ax.face_left, edge_ax.face_right
+                
+                edge_ax.setLeftFace(ax_face_right)
+                edge_ax.setRightFace(ax_face_left)
+                    
+            edge_ax.end = self.vert_list[-2]
+            current_start.removeEdge(edge_ax)
+            
+            self.edge_list.insertAfter(edge_ax, [edge_xw])
+                
+            # Check index of edge bx here, since it may have just shifted
+                
+            index_bx = self.edge_list.index(edge_bx)
+            
+            self.edge_list.insertAfter(edge_bx, [edge_xz])
+            
+            new_edge_list = [edge_xz, edge_xw]
             
-        if orient and (type(orient) != int or abs(orient) != 1):
-            raise ValueError('orient must be +/- 1')
+            # (3) identify cy, dy, then remove edge xy from cyclic order of y
+                
+            y_index = current_end.edge_order.index(current_edge)
             
-        if color and (type(color) != int or color <= 0):
-            raise ValueError('color must be positive integer')
-        
-        self.start = start
-        self.end = end
-        
-        # Sign of twist gives whether twist is right-handed (+), or left-handed
-        # (-). The orientation is given by +/- 1, whether from start to end (+1),
-        # or end to start (-1). Color is an integer, which is twice the
-        # representation value j.
-        
-        self.orient = orient
-        self.color = color
-        self.twist = twist
-        
-        # Record faces incident to the edge; the sides are given in terms of
-        # the natural orientation of the edge from start to finish
-        
-        self.face_left = None
-        self.face_right = None
-        
-    #-------------------------------------------------------------------------#
-        
-    def __repr__(self):
-        
-        # edge_str = "[" + repr(self.start) + ", " + repr(self.end)
-        # if self.orient != None:
-        #     edge_str += ", orient = " + repr(self.orient)
-        # if self.color != None:
-        #     edge_str += ", color = " + repr(self.color)
-        # # if self.twist != None:
-        # #     edge_str += ", twist = {}".format(self.twist)
-        # edge_str += "]"
-        
-        if self.twist != None:
-            return "[" + repr(self.start) + ", " + repr(self.end) + ", " + \
-                repr(self.orient) + ", " + repr(self.color) + ", " + repr(self.twist) + \
-                + "]"
-        elif self.color != None:
-            return "[" + repr(self.start) + ", " + repr(self.end) + ", " + \
-                repr(self.orient) + ", " + repr(self.color) + "]"
-        elif self.orient != None:
-            return "[" + repr(self.start) + ", " + repr(self.end) + ", " + \
-                repr(self.orient) + "]"
-        else:
-            return "[" + repr(self.start) + ", " + repr(self.end) + "]"
-        
-    #-------------------------------------------------------------------------#
-    
-    def __hash__(self):
-        """
-            Returns memory location of the edge as unique identifer
-        """
-        
-        return id(self)
-        
-    #-------------------------------------------------------------------------#
-    
-    def clearColor(self):
-        self.color = None
-        
-        start_index = self.start.edge_order.index(self)
-        self.start.color_list[start_index] = 0
-        
-        end_index = self.end.edge_order.index(self)
-        self.end.color_list[end_index] = 0
-    
-    #-------------------------------------------------------------------------#
-    
-    def setColor(self, color = None):
-        
-        # NOTE: Currently assumes self.start, self.end exist, and that edge
-        # is already attached to both
-        
-        if color == None:
-            start_place = self.start.edge_order.index(self)
-            end_place = self.end.edge_order.index(self)
+            edge_cy = current_end.edge_order[y_index - 2]
+            index_cy = self.edge_list.index(edge_cy)
             
-            self.color = None
-            self.start.color_list[start_place] = 0
-            self.end.color_list[end_place] = 0
+            edge_dy = current_end.edge_order[y_index - 1]     # current_edge not a self-loop
+            index_dy = self.edge_list.index(edge_dy)
             
-            return True
-        
-        if type(color) != int or color <= 0:
-            raise ValueError('color must be positive integer')
+            current_end.removeEdge(current_edge)
             
-        if color == self.color:
-            raise ValueError(f'color is already defined to be {color}')
-        
-        start_color_list = [color for color in self.start.color_list]
-        start_place = self.start.edge_order.index(self)
-        start_color_list[start_place] = color
-        start_color_list.sort()
-        
-        end_color_list = [color for color in self.end.color_list]
-        end_place = self.end.edge_order.index(self)
-        end_color_list[end_place] = color
-        end_color_list.sort()
-        
-        # Only check vertex color lists if they have no placeholders
-        
-        if (0 not in start_color_list) and (start_color_list not in self.start.ALLOWED_COLOR_LIST):
-            raise AttributeError('color requirements violated at edge start')
-        elif (0 not in end_color_list) and (end_color_list not in self.end.ALLOWED_COLOR_LIST):
-            raise AttributeError('color requirements violated at edge end')
-                   
-        self.color = color
-        self.start.color_list[start_place] = color
-        self.end.color_list[end_place] = color
-        
-        # self.start.color_list = start_color_list
-        # self.end.color_list = end_color_list
-           
-        return True
-        
-    #-------------------------------------------------------------------------#
-    
-    def setOrient(self, orient):
-        
-        # NOTE: Currently assumes self.start, self.end exist, and that edge
-        # is already attached to both
-        
-        if type(orient) != int or abs(orient) != 1:
-            raise ValueError('orient must be +/- 1')
+            edge_yw = Edge(start = current_end, end = self.vert_list[-2])
+            edge_yz = Edge(start = current_end, end = self.vert_list[-1])
             
-        if orient == self.orient:
-            return True
+            # if edge_cy == edge_dy:      # current_start has self-loop
+            
+            #     # (4a) if c = d = y (so cyclic order is yy yy xy), change first
+            #     #   yy -> yz, add yw yz immediately after
                 
-        start_place = self.start.edge_order.index(self)
-        end_place = self.end.edge_order.index(self)
-        
-        if self.orient:
-            if (self.orient > 0 and orient < 0) or (self.orient < 0 and orient > 0):
+            #     edge_cy.end = self.vert_list[-1]
+            #     current_end.removeEdge(edge_cy)
                 
-                # Orientation exists and flips; need to check that there is no
-                # violation of source/sink rule at both incident vertices
+            #     self.edge_list = self.edge_list[:(index_cy + 1)] + [edge_yw, \
+            #         edge_yz] + self.edge_list[(index_cy + 1):]
                 
-                start_in_arrow_list = [arrow for arrow in self.start.in_arrow]
-                start_in_arrow_list[start_place] = -start_in_arrow_list[start_place]
+            # else:
+            
+            # (4b) if c != d, change edge cy to cz, add yz immediately after;
+            #   add edge yw immediately after dy
+            
+            if edge_cy.start == current_end:
+                edge_cy.start = edge_cy.end
                 
-                end_in_arrow_list = [arrow for arrow in self.end.in_arrow]
-                end_in_arrow_list[end_place] = -end_in_arrow_list[end_place]
+                # Since we are flipping the orientation of the edge, we must
+                # change the sign of the orientation, as well as the left,
+                # right faces
+                
+                if edge_cy.orient != None:
+                    edge_cy.orient = -edge_cy.orient
                     
-        else:
+                cy_face_left, cy_face_right = edge_cy.face_left, edge_cy.face_right
+                
+                edge_cy.setLeftFace(cy_face_right)
+                edge_cy.setRightFace(cy_face_left)
+                    
+            edge_cy.end = self.vert_list[-1]
+            current_end.removeEdge(edge_cy)
             
-            # Edge has no previous orient, so do check at vertices with added
-            # arrow at each, and verify no sources or sinks at both incident
-            # vertices
+            self.edge_list.insertAfter(edge_cy, [edge_yz])
+                
+            # Check index of edge dy here, since it may have just shifted
+                
+            index_dy = self.edge_list.index(edge_dy)
             
-            start_in_arrow_list = [arrow for arrow in self.start.in_arrow]
-            start_place = self.start.edge_order.index(self)
+            self.edge_list.insertAfter(edge_dy, [edge_yw])
+
+            new_edge_list += [edge_yw, edge_yz]
+        
+            # Modify vertex, edge face lists as appropriate
             
-            end_in_arrow_list = [arrow for arrow in self.end.in_arrow]
-            end_place = self.end.edge_order.index(self)
+            new_face = Face()
+            self.face_list += [new_face]
             
-            if orient > 0:
-                start_in_arrow = -1
-                end_in_arrow = 1
-            else:
-                start_in_arrow = 1
-                end_in_arrow = -1
+            # The faces not incident to xy are found by their place in the
+            # vertex face lists (the face between ax, bx, and that between cy,
+            # dy), since they need not be distinct from the faces on either
+            # side of xy, e.g. if xy is a bridge.
+            
+            face_left = current_edge.face_left
+            face_right = current_edge.face_right
+            face_start = current_start.face_list[x_index - 1]
+            face_end = current_end.face_list[y_index - 1]
                 
-            start_in_arrow_list[start_place] = start_in_arrow
-            end_in_arrow_list[end_place] = end_in_arrow
+            edge_xz.setLeftFace(new_face)
+            edge_xz.setRightFace(face_right)
             
-        # Verify that no sources or sinks are created at incident vertices
+            edge_yz.setLeftFace(face_end)
+            edge_yz.setRightFace(new_face)
             
-        if abs(sum(start_in_arrow_list)) != 3 and abs(sum(end_in_arrow_list)) != 3:
-            self.orient = orient
+            edge_yw.setLeftFace(new_face)
+            edge_yw.setRightFace(face_left)
             
-            self.start.in_arrow = start_in_arrow_list
-            self.end.in_arrow = end_in_arrow_list
+            edge_xw.setLeftFace(face_start)
+            edge_xw.setRightFace(new_face)
+                
+            # Now that we are associating the edges in vertex cyclic orders
+            # with the corresponding faces incident to the vertex, we have to
+            # make sure that the vertex cyclic order and face list are
+            # consistent with the edge list for the graph. The cyclic order
+            # for the vertex x depends on the original order of ax, bx in the
+            # edge list. All of the statements below assume that there are
+            # no self-loops.
             
-            return True
-        
-        elif abs(sum(start_in_arrow_list)) == 3:
-            raise AttributeError('Orientation change results in source/sink at start')
-        else:
-            raise AttributeError('Orientation change results in source/sink at end')
+            #   x: If ax comes before bx, then the procedure outlined above
+            #   will give a final edge list in the order aw xw bx xz, while
+            #   if bx comes before ax, then it will be bx xz aw xw.
             
-        # WHAT IS THIS PART OF CODE FOR?
+            #   w: If ax comes before dy, then we will have aw xw dy wy, while
+            #   if dy comes before ax, then we get dy wy aw xw.
+            
+            #   y: If cy comes before dy, then we have cz yz dy wy, while if
+            #   dy comes before cy, we get dy wy cz yz.
+            
+            #   z: If bx comes before cy, we have bx xz cz yz, while if cy
+            #   comes before bx, we get cz yz bx xz.
+            
+            current_start.color_list = [0] * 3
+            current_start.in_arrow = [0] * 3
+            if index_ax < index_bx:
+                current_start.edge_order = [edge_xw, edge_bx, edge_xz]
+                current_start.face_list = [new_face, face_start, face_right]
+            else:
+                current_start.edge_order = [edge_bx, edge_xz, edge_xw]
+                current_start.face_list = [face_start, face_right, new_face]
+                
+            self.vert_list[-2].color_list = [0] * 3
+            self.vert_list[-2].in_arrow = [0] * 3
+            if index_ax < index_dy:
+                self.vert_list[-2].edge_order = [edge_ax, edge_xw, edge_yw]
+                self.vert_list[-2].face_list = [face_left, face_start, new_face]
+            else:
+                self.vert_list[-2].edge_order = [edge_yw, edge_ax, edge_xw]
+                self.vert_list[-2].face_list = [new_face, face_left, face_start]
             
-        # # We need to check that orientations for start, end vertices are
-        # # consistent with requirement of no sources, sinks, so we keep the
-        # # original orient, and restore it if one of the vertex conditions is
-        # # violated.
-        
-        # try:
+            current_end.color_list = [0] * 3
+            current_end.in_arrow = [0] * 3
+            if index_cy < index_dy:
+                current_end.edge_order = [edge_yz, edge_dy, edge_yw]
+                current_end.face_list = [new_face, face_end, face_left]
+            else:
+                current_end.edge_order = [edge_dy, edge_yw, edge_yz]
+                current_end.face_list = [face_end, face_left, new_face]
+                
+            self.vert_list[-1].color_list = [0] * 3
+            self.vert_list[-1].in_arrow = [0] * 3
+            if index_bx < index_cy:
+                self.vert_list[-1].edge_order = [edge_xz, edge_cy, edge_yz]
+                self.vert_list[-1].face_list = [new_face, face_right, face_end]
+            else:
+                self.vert_list[-1].edge_order = [edge_cy, edge_yz, edge_xz]
+                self.vert_list[-1].face_list = [face_right, face_end, new_face]
+                
+            # The new face and the four faces around it are traced, rather than
+            # patched, since an edge on both sides of a face (e.g. if xy or bx
+            # is a bridge) appears twice in its edge list. Each is started at
+            # a corner using an edge that appears once in the cyclic order.
             
-        #     self.start.changeEdgeOrient(self)        
-        #     self.end.changeEdgeOrient(self)
+            self.traceFace(face_left, self.vert_list[-2], self.vert_list[-2].edge_order.index(edge_yw))
+            self.traceFace(face_right, current_start, current_start.edge_order.index(edge_bx))
+            self.traceFace(face_start, current_start, current_start.edge_order.index(edge_xw))
+            self.traceFace(face_end, current_end, current_end.edge_order.index(edge_yz))
+            self.traceFace(new_face, self.vert_list[-2], self.vert_list[-2].edge_order.index(edge_xw))
             
-        #     self.orient = orient
+            self.edge_list.remove(current_edge)
             
-        #     return True
-        
-        # except:
-        #     return False
-        
-    #-------------------------------------------------------------------------#
-    
-    def changeStart(self, new_start = None):
-        
-        if type(new_start) != Vertex:
-            raise ValueError('New edge start must be Vertex')
-    
-        if self in self.start.edgeOrder():
-            self.start.removeEdge(self)
-        else:
-            raise AttributeError('Edge not in edge order for new start vertex')
+            # Return edges that have been added to graph edge list, so that edge
+            # orientations, colors can be modified for new edges; note that
+            # original edge was deleted, so this returns *four* edges, even
+            # though only two vertices were created.
             
-        self.start = new_start
-        
-    #-------------------------------------------------------------------------#
-    
-    def changeEnd(self, new_end = None):
-        
-        if type(new_end) != Vertex:
-            raise ValueError('New edge end must be Vertex')
+            if undo:
+                return new_edge_list, token
             
-        if self in self.end.edgeOrder():
-            self.end.removeEdge(self)
-        else:
-            raise AttributeError('Edge not in edge order for new end vertex')
-        
-        self.end = new_end
-        
-    #-------------------------------------------------------------------------#
-    
-    def notSelfLoop(self):
-        if self.start != self.end:
-            return True
-        
-        return False
-        
-    #-------------------------------------------------------------------------#
-    
-    def setEnd(self, end):
-        """
-            Adds end to edge, either by integer label or as a Vertex object.
-            Does not check whether integer is within correct range for end.
-        """
-        
-        if type(end) not in [int, Vertex]:
-            raise ValueError('end must be either an integer label or a Vertex')
-        elif type(end) == Vertex:
-            self.end = end
-        else:
-            self.end = Vertex(label = end)
-        
-    #-------------------------------------------------------------------------#
-    
-    def setStart(self, start):
-        """
-            Adds start to edge, either by integer label or as a Vertex object.
-            Does not check whether integer is within correct range for start.
-        """
-        
-        if type(start) not in [int, Vertex]:
-            raise ValueError('start must be either an integer label or a Vertex')
-        elif type(start) == Vertex:
-            self.start = start
-        else:
-            self.start = Vertex(label = start)
-        
-    #-------------------------------------------------------------------------#
-    
-    def setLeftFace(self, left_face):
-        if type(left_face) != Face:
-            raise ValueError('left face must be a Face object')
-        else:
-            self.face_left = left_face
-        
-    #-------------------------------------------------------------------------#
-    
-    def setRightFace(self, right_face):
-        if type(right_face) != Face:
-            raise ValueError('right face must be a Face object')
-        else:
-            self.face_right = right_face
+            return new_edge_list
         
     #-------------------------------------------------------------------------#
     
-    def setTwist(self, twist):
-        
-        if type(twist) != int:
-            raise ValueError('twist must be an integer')
-        
-        self.twist = twist
+    def fiveMove(self):
+        pass
         
     #-------------------------------------------------------------------------#
     
-    def color(self):
-        """
-            Return color (twice the spin representation value).
-        """
+    def findFaces(self):
         
-        return abs(self.color)
+        # Every move keeps the faces up to date once they have been found
         
-    #-------------------------------------------------------------------------#
-    
-    def orient(self):
-        """
-            Return orientation
-        """
+        if self.face_list != []:
+            return False
         
-        return abs(self.orient)
+        # Each corner is given by the vertex and the position of the outgoing
+        # edge in the cyclic order; the incoming edge is the one after it.
+        # Positions are used rather than edges, since a self-loop appears
+        # twice in the same cyclic order. Corners are marked when visited, so
+        # each is seen once, and faces are started from the unvisited corners
+        # taking the vertices last to first.
         
-    #-------------------------------------------------------------------------#
-    
-    def twist(self):
-        """
-            Return twist.
-        """
+        visited = {vert: [False] * 3 for vert in self.vert_list}
+        self.face_size_list = []
         
-        return self.twist
+        for (current_vert, next_idx) in [(vert, idx) for vert in reversed(self.vert_list) for idx in [2, 1, 0]]:
+            
+            if visited[current_vert][next_idx]:
+                continue
+            
+            current_face = Face()
+            self.face_list += [current_face]
+            
+            self.traceFace(current_face, current_vert, next_idx, visited)
         
     #-------------------------------------------------------------------------#
     
-    def start(self):
+    def traceFace(self, current_face, current_vert, next_idx, visited = None):
         """
-            Returns start vertex for edge
+            Trace the face found by leaving current_vert along the edge at
+            place next_idx in its cyclic order, keeping the face on the left
+            (so going CCW around it). The edges are recorded in current_face,
+            and the face is given to these edges and to the vertices around
+            it; each corner passed is marked in visited, if given. Takes time
+            in proportion to the size of the face. The count of faces of each
+            size is updated for the old and new sizes of this face.
         """
         
-        return self.start
-        
-    #-------------------------------------------------------------------------#
-    
-    def end(self):
-        """
-            Returns end vertex for edge
-        """
+        if current_face.edge_list != []:
+            self.countFaceSize(len(current_face.edge_list), -1)
+            
+        current_face.edge_list = []
         
-        return self.end
-    
-    #-------------------------------------------------------------------------#
-    
-    def leftFace(self):
+        if visited != None:
+            visited[current_vert][next_idx] = True
         
-        return self.face_left
-    
-    #-------------------------------------------------------------------------#
-    
-    def rightFace(self):
+        # Traveling CCW around face means we travel CW around vertex, so the
+        # incoming edge label appears after the outgoing label in cyclic order
         
-        return self.face_right
+        start_idx = (next_idx + 1) % 3
+        start_vert = current_vert
+        start_edge = current_vert.edge_order[start_idx]
         
-#=============================================================================#
-
-class Face:
-    
-    def __init__(self):
+        # Update incident vertex and starting edge; since the start edge is
+        # "before" tbe current vertex as you go around the face, the face
+        # assignment here is opposite to the rest of the face below.
         
-        self.edge_list = []
+        if current_vert.isStartPlace(start_idx):
+            start_edge.setRightFace(current_face)
+        else:
+            start_edge.setLeftFace(current_face)
+            
+        current_face.addEdge(start_edge)
         
-    #-------------------------------------------------------------------------#
+        # We associate the ordering in the face list for the vertex with
+        # the same ordering as the cyclic edge order. To make this work,
+        # edge iii in the cyclic order means we place the face at index iii
+        # which also contains this edge; this requires the edge be
+        # incoming at the vertex.
         
-    def __repr__(self):
-        return repr([edge for edge in self.edge_list])
-    
-    #-------------------------------------------------------------------------#
+        current_vert.face_list[start_idx] = current_face
         
-    def addEdge(self, added_edge = None):
-        self.edge_list += [added_edge]
+        # Go through the rest of the face, until the next edge is the
+        # start edge, traveled into the starting vertex
         
-#=============================================================================#
-
-class Graph:
-    
-    def __init__(self, num_vert = None, r = None):
-    
-        # r value, to determine allowed incident edge colors; allowed color
-        # list constant gives all allowed triples coming from r
-            
-        if r:
-            if (type(r) != int or r <= 3):
-                raise ValueError('r value must be >= 4')
-            else:
-                self.ALLOWED_COLOR_LIST = colorList(r)
-        else:
+        while current_vert.otherPlace(next_idx) != (start_vert, start_idx):
             
-            # Use default option of all 0's to allow testing with orientations
-            # but no chosen value of r. This choice also avoids confusion if
-            # colors are added to some of the edges.
+            # Update current vertex, edge
             
-            self.ALLOWED_COLOR_LIST = [[0, 0, 0]]
-                
-        self.R = r
-        
-        # Number of vertices
+            current_edge = current_vert.edge_order[next_idx]
         
-        self.vert_list = []
-        
-        if num_vert:
-            if (type(num_vert) != int or num_vert <= 0):
-                raise ValueError('Number of vertices must be a positive integer')
-        
-            if (num_vert % 2) == 1:
-                raise ValueError('Trivalent graphs must have an even number of vertices')
+            if current_vert.isStartPlace(next_idx):
+                current_edge.setLeftFace(current_face)
+            else:
+                current_edge.setRightFace(current_face)
                 
-            # Create vertices
+            (current_vert, current_idx) = current_vert.otherPlace(next_idx)
                 
-            self.num_vert = num_vert
+            # Add current face to vertex, and current edge to face
+                
+            current_face.addEdge(current_edge)
             
-            for iii in range(num_vert):
-                self.vert_list += [Vertex(label = iii, COLOR_LIST = self.ALLOWED_COLOR_LIST)]
-        else:
-            self.num_vert = 0
-        
-        # Boolean value to record whether edges are in canonical order
-        
-        self.canonical = False
-        
-        # Create edge list
-        
-        self.edge_list = []
-        
-        # Create list of faces, and list of face sizes
-        
-        self.face_list = []
-        self.face_size_list = []
-        
-    #-------------------------------------------------------------------------#
-    
-    def __repr__(self):
-        return f'Graph of {self.num_vert} vertices and {len(self.edge_list)} edges'
-        
-    #-------------------------------------------------------------------------#
-    
-    def __copy__(self):
-        
-        # Create new graph; this automatically creates new vertices as well
-        
-        new_graph = Graph(num_vert = self.num_vert, r = self.R)
-        
-        # Copy edges with info
-        
-        for edge in self.edge_list:
-            new_graph.addEdges([[edge.start.label, edge.end.label, edge.orient, \
-                                edge.color, edge.twist]])
+            current_vert.face_list[current_idx] = current_face
+            
+            # Find next edge to travel down, and mark the corner
+            
+            next_idx = (current_idx - 1) % 3
+            
+            if visited != None:
+                visited[current_vert][next_idx] = True
                 
-        return new_graph
+        self.countFaceSize(len(current_face.edge_list), 1)
         
     #-------------------------------------------------------------------------#
     
-    def __eq__(self, other):
+    def countFaceSize(self, size, change):
+        """
+            Change the count of faces of the given size, removing sizes no
+            longer found
+        """
         
-        # First, we check that the number of vertices and edges are equal; after
-        # that, we check that the vertex degree lists are also the same.
+        self.face_size_count[size] += change
         
-        if self.num_vert != other.num_vert or len(self.edge_list) != len(other.edge_list):
-            return False
+        if self.face_size_count[size] == 0:
+            del self.face_size_count[size]
+            
+        self.face_size_cache = None
         
-        if sorted([len(vert.edge_order) for vert in self.vert_list]) != \
-            sorted([len(vert.edge_order) for vert in other.vert_list]):
-                return False
+    #-------------------------------------------------------------------------#
+    
+    def pachner22(self, edge_label = None, no_multi = True, undo = False):
+        
+        if edge_label != None:
+            
+            if type(edge_label) != int or edge_label < 0:
+                raise ValueError('edge label must be positive integer')
+                
+            if edge_label >= 3 * self.num_vert // 2:
+                raise ValueError('edge label must be between 0 and {}'.format(3 * self.num_vert // 2))
             
-        # Finally, we check that the sizes of the graph faces are equal.
+            current_edge = self.edge_list[edge_label]
+            current_start = current_edge.start
+            current_end = current_edge.end
             
-        if self.face_list == []:
-            self.findFaces()
+            if current_start == current_end:
+                raise ValueError('start, end vertices must be distinct')
+                
+            # Record state for Graph.undo before anything is changed
             
-        if other.face_list == []:
-            other.findFaces()
+            token = self.undoToken([current_start, current_end]) if undo else None
             
-        if self.face_size_list != other.face_size_list:
-            return False
-        
-        # Use an edge-based solution for the multigraph isomorphism problem,
-        # by matching only edges in the two graphs. We start with the first
-        # edge in self, and try all possible starting matches in the edge list
-        # for the other graph.
-        
-        for (iii, other_vert_flag) in product(range(3 * self.num_vert // 2), [True, False]):
+            # If faces have not been created, do so here
             
-            edge_match_dict = {}
+            if self.face_list == []:
+                self.findFaces()
+                
+            face_left = current_edge.leftFace()
+            face_right = current_edge.rightFace()
+            [face_start] = [face for face in current_start.face_list \
+                            if face not in [face_left, face_right]]
+            [face_end] = [face for face in current_end.face_list \
+                            if face not in [face_left, face_right]]
+                
+            # This is similar to fourMove() defined earlier, except no new
+            # vertices are created; instead, existing edges have their start,
+            # end attributes changed around. We also remove the orientation and
+            # color (if they exists) of current_edge, and return these at end,
+            # so they can be modified later.
             
-            # Given an oriented starting edge in the current graph, we find the
-            # orientation of the edge in the other graph, and use the vertex
-            # which has the correct 'side' of the orientation as the current
-            # graph, i.e. either both arrows are out of their respective
-            # vertices, or both are in.
+            # We have the current edge with vertices x < y. The starting cyclic
+            # order of x is of the form ax bx xy, while that for y is cy dy xy. 
+            # We want to change it so that the final cyclic order of x is
+            # bx cx xy, while that of y is dy ay xy.
             
-            # Since edges without orientation do not give a natural way to start
-            # the process, we try both possibilities for the matching vertex
-            # incident to the edge in the other graph.
+            start_current_edge_index = current_start.edge_order.index(current_edge)
+            end_current_edge_index = current_end.edge_order.index(current_edge)
             
-            if self.edge_list[0].orient and other.edge_list[iii].orient:
-                
-                if (self.edge_list[0].orient > 0 and other.edge_list[iii].orient > 0) or \
-                    (self.edge_list[0].orient < 0 and other.edge_list[iii].orient < 0):
-                        
-                    other_vert = other.edge_list[iii].start
-                else:
-                    other_vert = other.edge_list[iii].end
-            else:
-                if other_vert_flag:
-                    other_vert = other.edge_list[iii].start
-                else:
-                    other_vert = other.edge_list[iii].end
-            
-            queue = [(self.edge_list[0], self.edge_list[0].start, \
-                      other.edge_list[iii], other_vert)]
-                          
-            while len(queue) > 0:
-                
-                (current_self_edge, current_self_vert, \
-                 current_other_edge, current_other_vert) = queue.pop()
-               
-                # Test whether matching the edge, vertex combo are consistenly mapped
-                # from the self graph to the other graph, if one or the other has
-                # already been visited, or whether we need to continue and add all
-                # other edges incident to same vertex
-                
-                if edge_match_dict.get(current_self_edge, None):
-                    if edge_match_dict[current_self_edge] != current_other_edge:
-                        break       # Inconsistent edge matching
-                    elif edge_match_dict[current_self_edge] == current_other_edge:
-                        continue    # Edge already visited, do not repeat
-                    
-                # If the edges are oriented, determine whether the orientations
-                # of the two edges are consistent, i.e. both current_self_edge
-                # and current_other_edge point towards current_self_vert,
-                # current_other_vert, or both away. If they are inconsistent,
-                # then so is mapping.
+            if no_multi:
                 
-                if current_self_edge.orient and current_other_edge.orient:
-                    
-                    # Orientations are not consistent, so move on to next choice
-                    
-                    if abs(current_self_edge.orient) != abs(current_other_edge.orient):
-                        break
-                    
-                    if (current_self_vert == current_self_edge.start and current_self_edge.orient < 0) \
-                        or (current_self_vert == current_self_edge.end and current_self_edge.orient > 0):
-                        
-                        current_dir = True      # Orientation towards current_self_vert
-                        
-                    else:
-                        current_dir = False
-                        
-                    if (current_other_vert == current_other_edge.start and current_other_edge.orient < 0) \
-                        or (current_other_vert == current_other_edge.end and current_other_edge.orient > 0):
-                            
-                        other_dir = True        # Orientation towards current_other_vert
-                        
-                    else:
-                        other_dir = False
-                        
-                    if current_dir != other_dir:
-                        break       # Inconsistent edge orientation
-                        
-                # Check that edge colors are equal, if they exist
+                # If no_multi is True (i.e. no multiple edges allowed between
+                # vertices), we must check that the two faces *not* shared by
+                # x, y do not have an edge in common
                 
-                if current_self_edge.color and current_other_edge.color and \
-                    current_self_edge.color != current_other_edge.color:
-                        break       # Inconsistent edge colors
-                        
-                # Either edge orientations are consistent, or no orient value
-                # and a mapping between edges does not already exist.
-               
-                edge_match_dict[current_self_edge] = current_other_edge
-                    
-                # Go through and find other edges incident to current_self_vert, and
-                # add them to the queue. The vertices are those on the opposite side
-                # of each edge from the current vertices. Note that if we add the
-                # edge, vertex combos into the queue in CCW order, they will be
-                # removed via pop in CW order.
-                
-                self_shift = current_self_vert.edge_order.index(current_self_edge)
-                other_shift = current_other_vert.edge_order.index(current_other_edge)
-                
-                for shift in [-2, -1]:
-                    next_self_edge = current_self_vert.edge_order[self_shift + shift]
-                    if current_self_vert != next_self_edge.start:
-                        next_self_vert = next_self_edge.start
-                    else:
-                        next_self_vert = next_self_edge.end
+                shared_edge_list = list(set(face_start.edge_list).intersection(face_end.edge_list))
+
+                if len(shared_edge_list) > 0:
+                    raise AttributeError('Pachner 2-2 move gives graph not dual to triangulation')
                     
-                    next_other_edge = current_other_vert.edge_order[other_shift + shift]
-                    if current_other_vert != next_other_edge.start:
-                        next_other_vert = next_other_edge.start
-                    else:
-                        next_other_vert = next_other_edge.end
-                        
-                    queue += [(next_self_edge, next_self_vert, next_other_edge, next_other_vert)]
-  
-            # We have matched all edges in the two graphs, or else queue was
-            # terminated early because of an inconsistency. If the former,
-            # return True
+            self.code_cache = None
             
-            if len(edge_match_dict) == 3 * self.num_vert // 2 == len(set(edge_match_dict.values())):
-                # return edge_match_dict
-                return True
+            # (0) remove orientation, color from xy, if necessary; in_arrow and
+            # color_list for start, end vertices are reconstructed later
             
-        # No consistent solutions
-        
-        # return edge_match_dict
-        return False
-
-    #-------------------------------------------------------------------------#
-    
-    def graphSym(self, non_iso_edges = True):
-        
-        vert_sym_list = []
-        edge_sym_list = []
-        
-        num_edges = 3 * self.num_vert // 2
-        
-        # This code is a modified copy of the Graph.__eq__ code.
-        
-        # Use an edge-based solution for the multigraph isomorphism problem,
-        # by matching only edges in the two graphs. We start with the first
-        # edge in self, and try all possible starting matches in the edge list
-        # for the other graph.
+            if current_edge.orient:
+                current_edge.orient = None
+                
+            if current_edge.color:
+                current_edge.color = None
         
-        for (iii, other_vert_flag) in product(range(num_edges), [True, False]):
-            
-            vert_match_dict = {}
-            edge_match_dict = {}
+            # (1) Change ax to ay
             
-            # Given an oriented starting edge in the current graph, we find the
-            # orientation of the edge in the other graph, and use the vertex
-            # which has the correct 'side' of the orientation as the current
-            # graph, i.e. either both arrows are out of their respective
-            # vertices, or both are in.
+            edge_ax = current_start.edge_order[start_current_edge_index - 2]
             
-            # Since edges without orientation do not give a natural way to start
-            # the process, we try both possibilities for the matching vertex
-            # incident to the edge in the other graph.
+            if edge_ax.start == current_start:
+                edge_ax.start = current_end
+            else:
+                edge_ax.end = current_end
+                
+            if edge_ax.start.label > edge_ax.end.label:
+                edge_ax.start, edge_ax.end = edge_ax.end, edge_ax.start
+                
+                # Flip orientation (if it exists), and which face is on which side
+                
+                if edge_ax.orient:
+                    edge_ax.orient = -edge_ax.orient
+                    
+                ax_face_left, ax_face_right = edge_ax.face_left, edge_ax.face_right
+                edge_ax.face_left, edge_ax.face_right = ax_face_right, ax_face_left
+                
+            # (2) Change cy to cx
             
-            if self.edge_list[0].orient and self.edge_list[iii].orient:
+            edge_cy = current_end.edge_order[end_current_edge_index - 2]
                 
-                if (self.edge_list[0].orient > 0 and self.edge_list[iii].orient > 0) or \
-                    (self.edge_list[0].orient < 0 and self.edge_list[iii].orient < 0):
-                        
-                    other_vert = self.edge_list[iii].start
-                else:
-                    other_vert = self.edge_list[iii].end
+            if edge_cy.start == current_end:
+                edge_cy.start = current_start
             else:
-                if other_vert_flag:
-                    other_vert = self.edge_list[iii].start
-                else:
-                    other_vert = self.edge_list[iii].end
-            
-            queue = [(self.edge_list[0], self.edge_list[0].start, \
-                      self.edge_list[iii], other_vert)]
-                          
-            while len(queue) > 0:
-                
-                (current_self_edge, current_self_vert, \
-                 current_other_edge, current_other_vert) = queue.pop()
-               
-                # Test whether matching the edge, vertex combo are consistenly mapped
-                # from the self graph to the other graph, if one or the other has
-                # already been visited, or whether we need to continue and add all
-                # other edges incident to same vertex
-                
-                if edge_match_dict.get(current_self_edge, None):
-                    if edge_match_dict[current_self_edge] != current_other_edge:
-                        break       # Inconsistent edge matching
-                    elif edge_match_dict[current_self_edge] == current_other_edge:
-                        continue    # Edge already visited, do not repeat
-                    
-                # If the edges are oriented, determine whether the orientations
-                # of the two edges are consistent, i.e. both current_self_edge
-                # and current_other_edge point towards current_self_vert,
-                # current_other_vert, or both away. If they are inconsistent,
-                # then so is mapping.
+                edge_cy.end = current_start
                 
-                if current_self_edge.orient and current_other_edge.orient:
-                    
-                    # Orientations are not consistent, so move on to next choice
-                    
-                    if abs(current_self_edge.orient) != abs(current_other_edge.orient):
-                        break
-                    
-                    if (current_self_vert == current_self_edge.start and current_self_edge.orient < 0) \
-                        or (current_self_vert == current_self_edge.end and current_self_edge.orient > 0):
-                        
-                        current_dir = True      # Orientation towards current_self_vert
-                        
-                    else:
-                        current_dir = False
-                        
-                    if (current_other_vert == current_other_edge.start and current_other_edge.orient < 0) \
-                        or (current_other_vert == current_other_edge.end and current_other_edge.orient > 0):
-                            
-                        other_dir = True        # Orientation towards current_other_vert
-                        
-                    else:
-                        other_dir = False
-                        
-                    if current_dir != other_dir:
-                        break       # Inconsistent edge orientation
-                        
-                # Check that edge colors are equal, if they exist
+            if edge_cy.start.label > edge_cy.end.label:
+                edge_cy.start, edge_cy.end = edge_cy.end, edge_cy.start
                 
-                if current_self_edge.color and current_other_edge.color and \
-                    current_self_edge.color != current_other_edge.color:
-                        break       # Inconsistent edge colors
-                        
-                # Either edge orientations are consistent, or no orient value
-                # and a mapping between edges does not already exist.
-               
-                edge_match_dict[current_self_edge] = current_other_edge
-                vert_match_dict[current_self_vert] = current_other_vert
-                    
-                # Go through and find other edges incident to current_self_vert, and
-                # add them to the queue. The vertices are those on the opposite side
-                # of each edge from the current vertices. Note that if we add the
-                # edge, vertex combos into the queue in CCW order, they will be
-                # removed via pop in CW order.
-                
-                self_shift = current_self_vert.edge_order.index(current_self_edge)
-                other_shift = current_other_vert.edge_order.index(current_other_edge)
-                
-                for shift in [-2, -1]:
-                    next_self_edge = current_self_vert.edge_order[self_shift + shift]
-                    if current_self_vert != next_self_edge.start:
-                        next_self_vert = next_self_edge.start
-                    else:
-                        next_self_vert = next_self_edge.end
+                # Flip orientation (if it exists), and which face is on which side
+                
+                if edge_cy.orient:
+                    edge_cy.orient = -edge_cy.orient
                     
-                    next_other_edge = current_other_vert.edge_order[other_shift + shift]
-                    if current_other_vert != next_other_edge.start:
-                        next_other_vert = next_other_edge.start
-                    else:
-                        next_other_vert = next_other_edge.end
-                        
-                    queue += [(next_self_edge, next_self_vert, next_other_edge, next_other_vert)]
-  
-            # We have matched all edges in the two graphs, or else queue was
-            # terminated early because of an inconsistency. If the former,
-            # return True
+                cy_face_left, cy_face_right = edge_cy.face_left, edge_cy.face_right
+                edge_cy.face_left, edge_cy.face_right = cy_face_right, cy_face_left
+                
+            # (3) Change cyclic order for vertex x to be bx cx xy, for vertex
+            # y to be dy ay xy. While this is done, ensure that in_arrow is
+            # correct for x, y.
             
-            if len(edge_match_dict) == num_edges == len(set(edge_match_dict.values())):
-                edge_sym_list += [[self.edge_list.index(edge_match_dict[key]) \
-                                    for key in self.edge_list]]
-                vert_sym_list += [[self.vert_list.index(vert_match_dict[key]) \
-                                    for key in self.vert_list]]
-                    
-        # If desired, return only list of non-isomorphic edges; otherwise, return
-        # all symmetries, given in terms of edge label mappings
-        
-        if non_iso_edges:
-            vert_union_find = UnionFind(self.num_vert)
+            edge_bx = current_start.edge_order[start_current_edge_index - 1]
+            edge_dy = current_end.edge_order[end_current_edge_index - 1]
             
-            for sym in vert_sym_list:
-                for vert_label, map_label in enumerate(sym):
-                    vert_union_find.join(vert_label, map_label)
+            temp_color_list = [edge.color for edge in [edge_ax, edge_bx, edge_cy, edge_dy]]
+            current_start.color_list = [temp_color_list[iii] for iii in [1, 2]] + [0]
+            current_end.color_list = [temp_color_list[iii] for iii in [3, 0]] + [0]
             
-            edge_union_find = UnionFind(num_edges)
+            current_start.edge_order = []
+            current_start.in_arrow = []
             
-            for sym in edge_sym_list:
-                for edge_label, map_label in enumerate(sym):
-                    edge_union_find.join(edge_label, map_label)
+            for edge in [edge_bx, edge_cy, current_edge]:
+                current_start.edge_order += [edge]
+                
+                if edge.orient:
+                    if (edge.orient > 0 and current_start == edge.end) or \
+                        (edge.orient < 0 and current_start == edge.start):
+                        current_start.in_arrow += [1]
+                    else:
+                        current_start.in_arrow += [-1]
+                else:
+                    current_start.in_arrow += [0]
                     
-            return [vert_union_find.printRoots(), edge_union_find.printRoots()]
-            
-        return [vert_sym_list, edge_sym_list]
-
-    #-------------------------------------------------------------------------#
-        
-    def addEdges(self, added_edge_list):
-        """
-            Add edges to graph, given as list of vertex labels [start, end, (orient), (color), (twist)]
-        """
-        
-        # Added edge list must be (1) a list of (2) lists in the form [start,
-        # end, (orient), (color), (twist)], where (3) start, end are integers from 0 to num_vert - 1, and
-        # (4) start < end.
-        
-        if type(added_edge_list) != list:
-            raise ValueError('Added edges must be given in list')
-            
-        if any([(type(edge) != list or not(2 <= len(edge) <= 5) \
-                 or any([type(label) not in [int, type(None)] for label in edge])) for edge in added_edge_list]):
-            raise ValueError('Entries in added edge list must be in form [start, end, (orient), (color), (twist)]')
+            current_end.edge_order = []
+            current_end.in_arrow = []
+                    
+            for edge in [edge_dy, edge_ax, current_edge]:
+                current_end.edge_order += [edge]
+                if edge.orient:
+                    if (edge.orient > 0 and current_end == edge.end) or \
+                        (edge.orient < 0 and current_end == edge.start):
+                        current_end.in_arrow += [1]
+                    else:
+                        current_end.in_arrow += [-1]
+                else:
+                    current_end.in_arrow += [0]
             
-        if any([(min(edge[:2]) < 0 or max(edge[:2]) >= self.num_vert) for edge in added_edge_list]):
-            raise ValueError('Vertex labels must be between 0 and {}'.format(self.num_vert - 1))
+            # (4) Change edge list for graph; to be consistent with vertex
+            # cyclic orders, we need to permute the order of the edges in the
+            # edge list so that
+            #
+            #   ax bx xy -> bx cx xy
+            #   cy dy xy -> dy ay xy
+            #
+            # However, we also have to worry about how the ordering of the
+            # vertices a, b, c, d are changed by this permutation. So to keep
+            # the cyclic orders for these vertices the same, we only move the
+            # edge xy in the graph edge list; this edge is placed in the
+            # earliest possible spot in the graph edge list, because why not.
+            #
+            # We also remove current_edge from the edge_list, to avoid
+            # shifting the indices of the other edges by 1.
             
-        # Edges are added to vertex CCW in order given in added edge list;
-        # Vertex.connectEdge tests whether too many edges added to vertex, which
-        # also ensures total number of edges does not exceed 3/2 number of vertices.
-
-        # Also, vertices are given as integers in added_edge_list, so we use
-        # self.vert_list to change them into the appropriate Vertex objects.
+            self.edge_list.remove(current_edge)
+            edge_list = [edge_ax, edge_bx, edge_cy, edge_dy]
+            index_list = [self.edge_list.index(edge) for edge in edge_list]
         
-        for edge in added_edge_list:
-            start_vert = self.vert_list[edge[0]]
-            end_vert = self.vert_list[edge[1]]
+            # Each of the two conditions allows one or two ranges of slots
+            # (first, last); the slot used is the earliest allowed by both
             
-            if len(edge) == 2:
-                new_edge = Edge(start = start_vert, end = end_vert)
-            elif len(edge) == 3:
-                new_edge = Edge(start = start_vert, end = end_vert, orient = edge[2])
-            elif len(edge) == 4:
-                new_edge = Edge(start = start_vert, end = end_vert, orient = edge[2], \
-                                color = edge[3])
-            else:
-                new_edge = Edge(start = start_vert, end = end_vert, orient = edge[2], \
-                                color = edge[3], twist = edge[4])
+            last_slot = 3 * self.num_vert // 2 - 1
+        
+            if index_list[2] < index_list[1]:           # cy comes before bx
+                range_list = [(index_list[2] + 1, index_list[1])]
+            else:                                       # bx comes before cy
+                range_list = [(0, index_list[1]), (index_list[2] + 1, last_slot)]
+                
+            if index_list[0] < index_list[3]:           # ax comes before dy
+                other_range_list = [(index_list[0] + 1, index_list[3])]
+            else:                                       # dy comes before ax
+                other_range_list = [(0, index_list[3]), (index_list[0] + 1, last_slot)]
+                
+            slot_list = [max(first, other_first) for (first, last) in range_list \
+                         for (other_first, other_last) in other_range_list \
+                         if max(first, other_first) <= min(last, other_last)]
             
-            start_vert.connectEdge(new_edge)
-            end_vert.connectEdge(new_edge)
+            slot = sorted(slot_list)[0]
+            self.edge_list.insert(slot, current_edge)
             
-            self.edge_list += [new_edge]
+            # The four faces at x, y are traced again, rather than patched,
+            # since an edge on both sides of a face appears twice in its edge
+            # list. Now xy has face_start on its left and face_end on its
+            # right, while ax, cy have moved from face_left, face_right
+            #
+            #   x: bx cx xy  (face_start, face_right, face_end)
+            #   y: dy ay xy  (face_end, face_left, face_start)
             
-    #-------------------------------------------------------------------------#
+            self.traceFace(face_start, current_start, 2)
+            self.traceFace(face_right, current_start, 0)
+            self.traceFace(face_end, current_start, 1)
+            self.traceFace(face_left, current_end, 0)
+                
+            # Return new edge, so that the orientation, color can be updated
+            # as desired
+                
+            if undo:
+                return current_edge, token
+            
+            return current_edge
         
-    def addVertices(self, added_num_vert):
+    #-------------------------------------------------------------------------#
+    
+    def undoToken(self, vert_list):
         """
-            Add given number of vertices to graph.
+            Record the state of the graph before a move at the given vertices,
+            so that the move can be reversed by Graph.undo
         """
         
-        if type(added_num_vert) != int or added_num_vert <= 0:
-            raise ValueError('Number of added vertices must be positive integer')
+        # A move only changes the given vertices, the edges at them and the
+        # faces at these, apart from adding vertices, edges and faces at the
+        # end of their lists. This needs the faces to be known, since finding
+        # them changes every vertex and edge, so they are found here first.
         
-        for iii in range(added_num_vert):
-            self.vert_list += [Vertex(label = self.num_vert + iii)]
+        if self.face_list == []:
+            self.findFaces()
         
-        self.num_vert += added_num_vert
+        edge_dict = {edge: None for vert in vert_list for edge in vert.edge_order}
+        face_dict = {face: None for vert in vert_list for face in vert.face_list if face != None}
+        face_dict.update({face: None for edge in edge_dict for face in [edge.face_left, edge.face_right] \
+                          if face != None})
+        
+        # The edges recorded are the only ones whose place in the edge list can
+        # change, apart from new edges
+        
+        if len(edge_dict) == len(self.edge_list):
+            edge_place = list(self.edge_list)
+        else:
+            edge_place = sorted([(self.edge_list.index(edge), edge) for edge in edge_dict], key = lambda item: item[0])
+        
+        vert_state = [(vert, list(vert.edge_order), list(vert.color_list), list(vert.in_arrow), \
+                       list(vert.face_list)) for vert in vert_list]
+        edge_state = [(edge, edge.start, edge.end, edge.orient, edge.color, edge.twist, edge.face_left, \
+                       edge.face_right) for edge in edge_dict]
+        face_state = [(face, list(face.edge_list)) for face in face_dict]
+        
+        return (self.num_vert, edge_place, len(self.face_list), self.code_cache, self.canonical, \
+                vert_state, edge_state, face_state)
         
     #-------------------------------------------------------------------------#
     
-    def oneMove(self, edge_label = None):
-        if edge_label != None:
-            
-            if type(edge_label) != int or edge_label < 0:
-                raise ValueError('edge label must be positive integer')
-                
-            if edge_label >= 3 * self.num_vert // 2:
-                raise ValueError('edge label must be between 0 and {}'.format(3 * self.num_vert // 2))
-            
-            current_edge = self.edge_list[edge_label]
-            current_end = current_edge.end
+    def undo(self, token):
+        """
+            Reverse a move, given the token returned by the move when called
+            with undo = True; moves must be undone in the reverse order to
+            that in which they were done
+        """
+        
+        (num_vert, edge_place, num_faces, code_cache, canonical, vert_state, edge_state, face_state) = token
+        
+        # Remove all new edges, which are those at the new vertices, and put
+        # back the recorded edges in their old places; if all edges were
+        # recorded, their order is given instead
+        
+        if len(edge_place) > 0 and type(edge_place[0]) == Edge:
+            self.edge_list = EdgeList(edge_place)
+        else:
+            for edge in {edge: None for vert in self.vert_list[num_vert:] for edge in vert.edge_order}:
+                if edge in self.edge_list:
+                    self.edge_list.remove(edge)
                 
-            # First, we create two new vertices. The two new vertices will have
-            # labels larger than any other current vertices in the graph, so we
-            # put them as the end of the vertex list.
-            
-            self.vert_list += [Vertex(label = self.num_vert, COLOR_LIST = self.ALLOWED_COLOR_LIST), \
-                               Vertex(label = self.num_vert + 1, COLOR_LIST = self.ALLOWED_COLOR_LIST)]
-            self.num_vert += 2
-            
-            # We have the original edge ab, and we want to add vertices x, y
-            # so that we can put in edges ax, bx, xy, yy (self-loop). To 
-            # preserve the cyclic order for the original vertices, we need to
-            # do the following:
-            #
-            #   (1) change ab to ax, add bx immediately after
-            #   (2) add xy, yy at the end of the edge list
-            #
-            # Note that if we add bx immediately *before* ax, then we get a
-            # self-loop on the other side of the original edge. The current
-            # order puts the self-loop on the left-hand side of the edge as
-            # one travels from start to end; putting it before places it on the
-            # right-hand side, going in the same direction.
-            
-            edge_index = self.edge_list.index(current_edge)
-            current_edge.end = self.vert_list[-2]
-            
-            edge_bx = Edge(start = current_end, end = self.vert_list[-2])
-            edge_xy = Edge(start = self.vert_list[-2], end = self.vert_list[-1])
-            edge_yy = Edge(start = self.vert_list[-1], end = self.vert_list[-1])
-            
-            self.edge_list = self.edge_list[:(edge_index + 1)] + [edge_bx] + \
-                self.edge_list[(edge_index + 1):]
-            self.edge_list += [edge_xy, edge_yy]
-            
-            current_end.replaceEdge(remove_edge = current_edge, added_edge = edge_bx)
-            
-            self.vert_list[-2].connectEdge(current_edge)
-            self.vert_list[-2].connectEdge(edge_bx)
-            self.vert_list[-2].connectEdge(edge_xy)
-            
-            self.vert_list[-1].connectEdge(edge_xy)
-            self.vert_list[-1].connectEdge(edge_yy)
-            self.vert_list[-1].connectEdge(edge_yy)
+            for (place, edge) in edge_place:
+                if edge in self.edge_list:
+                    self.edge_list.remove(edge)
+                    
+            for (place, edge) in edge_place:
+                self.edge_list.insert(place, edge)
+        
+        del self.vert_list[num_vert:]
+        
+        self.num_vert = num_vert
+        self.code_cache = code_cache
+        self.canonical = canonical
+        
+        for (vert, edge_order, color_list, in_arrow, vert_face_list) in vert_state:
+            vert.edge_order = edge_order
+            vert.color_list = color_list
+            vert.in_arrow = in_arrow
+            vert.face_list = vert_face_list
             
-            # Return edges that have changed in graph edge list, so that edge
-            # colors/orientations can be modified for new edges
+        for (edge, start, end, orient, color, twist, face_left, face_right) in edge_state:
+            edge.start = start
+            edge.end = end
+            edge.orient = orient
+            edge.color = color
+            edge.twist = twist
+            edge.face_left = face_left
+            edge.face_right = face_right
             
-            return [edge_xy, edge_yy]
+        # Faces added by the move are removed, and the recorded faces are given
+        # back their edges, with the count of face sizes changed to match
+        
+        for face in self.face_list[num_faces:]:
+            self.countFaceSize(len(face.edge_list), -1)
             
+        del self.face_list[num_faces:]
+        
+        for (face, face_edge_list) in face_state:
+            self.countFaceSize(len(face.edge_list), -1)
+            self.countFaceSize(len(face_edge_list), 1)
+            face.edge_list = face_edge_list
+        
     #-------------------------------------------------------------------------#
     
-    def twoMove(self, edge_label = None):
+    def children(self, moves = [1, 2, 3, 4]):
+        """
+            Generator of the graphs found from a copy of the graph by one of
+            the given moves (1 to 4 for oneMove, ..., fourMove), applied at
+            every edge or vertex; the oneMove is applied at both ends of each
+            edge. Sites taken to each other by an automorphism of the graph
+            give isomorphic children, so the move is only applied at the
+            first site in each orbit. The same graph may still appear more
+            than once, from sites in different orbits.
+        """
         
-        if edge_label != None:
-            
-            if type(edge_label) != int or edge_label < 0:
-                raise ValueError('edge label must be positive integer')
-                
-            if edge_label >= 3 * self.num_vert // 2:
-                raise ValueError('edge label must be between 0 and {}'.format(3 * self.num_vert // 2))
-            
-            current_edge = self.edge_list[edge_label]
-            current_end = current_edge.end
-                
-            # First, we create two new vertices. The two new vertices will have
-            # labels larger than any other current vertices in the graph, so we
-            # put them as the end of the vertex list.
-            
-            self.vert_list += [Vertex(label = self.num_vert, COLOR_LIST = self.ALLOWED_COLOR_LIST), \
-                               Vertex(label = self.num_vert + 1, COLOR_LIST = self.ALLOWED_COLOR_LIST)]
-            self.num_vert += 2
-            
-            # We have the original edge ab, and we want to add vertices x, y
-            # so that we can put in two edges xy. To preserve the cyclic
-            # order, we have to change ab to ax, then add xy_1, by, xy_2
-            # immediately after. This is necessary to preserve the cyclic
-            # orders for a, b (edge by right after ax), as well as those for
-            # x, y:
-            #
-            #   x: a e1 e2
-            #   y: e1 b e2
-            
-            edge_index = self.edge_list.index(current_edge)
-            current_edge.end = self.vert_list[-2]
-            
-            edge_by = Edge(start = current_end, end = self.vert_list[-1])
-            edge_xy1 = Edge(start = self.vert_list[-2], end = self.vert_list[-1])
-            edge_xy2 = Edge(start = self.vert_list[-2], end = self.vert_list[-1])
-            
-            self.edge_list = self.edge_list[:(edge_index + 1)] + \
-                [edge_xy1, edge_by, edge_xy2] + self.edge_list[(edge_index + 1):]
-            
-            current_end.replaceEdge(remove_edge = current_edge, added_edge = edge_by)
-            
-            self.vert_list[-2].connectEdge(current_edge)
-            self.vert_list[-2].connectEdge(edge_xy1)
-            self.vert_list[-2].connectEdge(edge_xy2)
-            
-            # Since y is on the other side of the face determined by the two
-            # new edges, the
-            
-            self.vert_list[-1].connectEdge(edge_xy1)
-            self.vert_list[-1].connectEdge(edge_by)
-            self.vert_list[-1].connectEdge(edge_xy2)
-            
-            # Return edges that have changed in graph edge list, so that edge
-            # colors/orientations can be modified for new edges
+        num_edges = len(self.edge_list)
+        
+        # Orbits of the edges, each end in turn, are given by the orbits of
+        # their darts, since the moves on edges depend on the direction of the
+        # edge (e.g. twoMove keeps the attributes of the edge on the part at
+        # its start); disconnected graphs are not pruned
+        
+        try:
+            [generator_list, order, vert_orbit, edge_orbit, dart_orbit] = self.automorphisms()
+        except ValueError:
+            order = 1
             
-            return [edge_by, edge_xy1, edge_xy2]
+        if order > 1:
+            site_orbit_dict = {}
             
-    #-------------------------------------------------------------------------#
-    
-    def threeMove(self, vert_label = None):
+            for label, (start_dart, end_dart) in enumerate(self.dartEdges()[1]):
+                site_orbit_dict[(label, False)] = dart_orbit[start_dart]
+                site_orbit_dict[(label, True)] = dart_orbit[end_dart]
         
-        if vert_label != None:
-            
-            if type(vert_label) != int or vert_label < 0:
-                raise ValueError('vertex label must be a positive integer')
+        for move in sorted(moves):
+            if move == 1:
+                site_list = [(edge_label, reverse) for reverse in [False, True] for edge_label in range(num_edges)]
+            elif move == 3:
+                site_list = [(vert_label, False) for vert_label in range(self.num_vert)]
+            else:
+                site_list = [(edge_label, False) for edge_label in range(num_edges)]
                 
-            if vert_label >= self.num_vert:
-                raise ValueError('vertex label must be between 0 and {}'.format(self.num_vert - 1))
-            
-            current_vert = self.vert_list[vert_label]
-            adj_edges = current_vert.edgeOrder()
+            seen_orbit_set = set()
                 
-            # First, we create two new vertices. The two new vertices will have
-            # labels larger than any other current vertices in the graph, so we
-            # put them as the end of the vertex list.
-            
-            self.vert_list += [Vertex(label = self.num_vert, COLOR_LIST = self.ALLOWED_COLOR_LIST), \
-                               Vertex(label = self.num_vert + 1, COLOR_LIST = self.ALLOWED_COLOR_LIST)]
-            self.num_vert += 2
-            
-            # We have the current vertex x, and the three vertices a, b, c in
-            # CCW order around it. So, before this move, the edges ax, bx, cx
-            # appear in that order in the edge list for the graph. We create
-            # two new vertices y, z, and do the following:
-            #
-            #   (1) add edges xy, xz immediately after ax
-            #   (2) change edge bx to by, add edge yz immediately after
-            #   (3) change edge cx to cz
-            #
-            # This gives the ordering ax xy xz ... by yz ... cz, so that the
-            # cyclic orders around each vertex are given by
-            #
-            #   x: ayz
-            #   y: xbz
-            #   z: xyc
-            #
-            # The orderings around a, b, c are preserved, since we do not
-            # change their relative ordering, but just alter what they are
-            # connected to. Note that we could not move all of the existing
-            # vertices to the beginning of each cyclic order, since this would
-            # have given inconsistent orderings for x, y, z -- a would give yz,
-            # b would give zx, and c would give xy.
-            #
-            # Remember that A[-2] comes before A[-1] in a Python list, so the
-            # former corresponds to y, the latter to z.
-            
-            # (1) add edges xy, xz immediately after ax
-            
-            first_index = self.edge_list.index(adj_edges[0])
-            
-            for iii in [1, 2]:
-                if adj_edges[iii].start != current_vert:
-                    adj_edges[iii].end = None
-                else:
-                    adj_edges[iii].start = None
-                    
-                    # Since the current vertex is the start of this edge, it
-                    # is removed, to be replaced later by one of the new
-                    # vertices, and the end is moved to the start. This flips
-                    # the edge orientation, so we flip the faces here as well.
-                    
-                    face_left, face_right = adj_edges[iii].face_left, adj_edges[iii].face_right
-                    
-                    adj_edges[iii].setLeftFace(face_right)
-                    adj_edges[iii].setRightFace(face_left)
+            for (label, reverse) in site_list:
+                if order > 1:
+                    orbit = vert_orbit[label] if move == 3 else site_orbit_dict[(label, reverse)]
                     
-                current_vert.removeEdge(adj_edges[iii])
+                    if orbit in seen_orbit_set:
+                        continue
+                        
+                    seen_orbit_set.add(orbit)
                     
-            edge_xy = Edge(start = current_vert, end = self.vert_list[-2])
-            edge_xz = Edge(start = current_vert, end = self.vert_list[-1])
-            
-            self.edge_list = self.edge_list[:(first_index + 1)] + [edge_xy, edge_xz] + \
-                self.edge_list[(first_index + 1):]
+                child = self.__copy__()
                 
-            current_vert.connectEdge(edge_xy)
-            current_vert.connectEdge(edge_xz)
-            self.vert_list[-2].connectEdge(edge_xy)
-            self.vert_list[-1].connectEdge(edge_xz)
+                if reverse:
+                    child.reverseEdge(label)
                 
-            # (2) change edge bx to by, add edge yz immediately after
-            
-            second_index = self.edge_list.index(adj_edges[1])
+                # Moves that are not possible at the site (such as the
+                # fourMove on a self-loop) raise ValueError
+                
+                try:
+                    [child.oneMove, child.twoMove, child.threeMove, child.fourMove][move - 1](label)
+                except ValueError:
+                    continue
+                    
+                yield child
+        
+    #-------------------------------------------------------------------------#
+    
+    def setColors(self, colors):
+        """
+            Sets the colors of all edges at once, from a list or array of
+            colors in edge_list order, with 0 removing a color. All vertices
+            are checked before any color is changed; if some have colors that
+            are not allowed, no colors are set, and the error lists all of
+            these vertices.
+        """
+        
+        colors = [int(color) for color in colors]
+        
+        if len(colors) != len(self.edge_list):
+            raise ValueError('Number of colors must equal number of edges')
+        
+        if min(colors, default = 0) < 0:
+            raise ValueError('color must be positive integer')
+        
+        bad_list = self.colorViolations(colors)
+        
+        if bad_list:
+            raise AttributeError('color requirements violated at vertices {}'.format(bad_list))
+        
+        for edge, color in zip(self.edge_list, colors):
+            edge.color = color if color else None
+        
+        edge_label_dict = {edge: label for label, edge in enumerate(self.edge_list)}
+        
+        for vert in self.vert_list:
+            vert.color_list = [colors[edge_label_dict[edge]] for edge in vert.edge_order]
+    
+    #-------------------------------------------------------------------------#
+    
+    def colorViolations(self, colors):
+        """
+            Returns labels of the vertices whose colors are not allowed, for
+            colors given in edge_list order (0 for no color); as for
+            Edge.setColor, vertices missing a color are not checked
+        """
+        
+        if numpy is None:
+            return [label for label, rotation in enumerate(self.rotationRows()) \
+                    if len(rotation) == 3 and 0 not in [colors[edge] for edge in rotation] and \
+                    [colors[edge] for edge in rotation] not in self.COLOR_TABLE]
+        
+        allowed = self.checkColorings(numpy.asarray(colors)[None, :], by_vertex = True)[0]
+        
+        return [int(label) for label in numpy.nonzero(~allowed)[0]]
+    
+    #-------------------------------------------------------------------------#
+    
+    def checkColorings(self, coloring_array, by_vertex = False):
+        """
+            Checks many colorings at once, given as the rows of a numpy array
+            of shape (N, E), with columns in edge_list order. The colors at
+            each vertex are gathered into an (N, V, 3) array and looked up in
+            the color table together. Returns a boolean array of shape (N,)
+            telling which colorings are allowed at every vertex, or of shape
+            (N, V) giving each vertex, if by_vertex is True. Needs numpy.
+        """
+        
+        if numpy is None:
+            raise ImportError('checkColorings needs numpy')
+        
+        coloring_array = numpy.asarray(coloring_array)
+        
+        if coloring_array.ndim != 2 or coloring_array.shape[1] != len(self.edge_list):
+            raise ValueError('Colorings must be an array of shape (N, {})'.format(len(self.edge_list)))
+        
+        # Vertices with fewer than three edges point at an extra column of
+        # zeros, so are not checked
+        
+        num_edges = len(self.edge_list)
+        rotation_array = numpy.array([rotation + [num_edges] * (3 - len(rotation)) \
+                                      for rotation in self.rotationRows()], dtype = numpy.intp).reshape(-1, 3)
+        
+        padded = numpy.zeros((coloring_array.shape[0], num_edges + 1), dtype = numpy.int64)
+        padded[:, :num_edges] = coloring_array
+        vert_colors = padded[:, rotation_array]
+        
+        # Look up triples in the flattened color table, for those in range
+        
+        size = self.COLOR_TABLE.size
+        table = numpy.frombuffer(self.COLOR_TABLE.table, dtype = numpy.uint8)
+        
+        has_zero = (vert_colors == 0).any(axis = -1)
+        in_range = ((vert_colors > 0) & (vert_colors < size)).all(axis = -1)
+        
+        index = numpy.where(in_range[..., None], vert_colors, 0)
+        index = (index[..., 0] * size + index[..., 1]) * size + index[..., 2]
+        
+        allowed = has_zero | (in_range & (table[index] == 1))
+        
+        if by_vertex:
+            return allowed
+        
+        return allowed.all(axis = -1)
+    
+    #-------------------------------------------------------------------------#
+    
+    def setOrientations(self, orients):
+        """
+            Sets the orientations of all edges at once, from a list or array
+            of +/- 1 in edge_list order (+1 pointing from start to end), with
+            0 removing an orientation. Since the result does not depend on
+            the order the edges are taken in, all vertices are checked first;
+            if any would become a source or sink, no orientations are set, and
+            the error lists all of these vertices.
+        """
+        
+        orients = [int(orient) for orient in orients]
+        
+        if len(orients) != len(self.edge_list):
+            raise ValueError('Number of orientations must equal number of edges')
+        
+        if not set(orients) <= {-1, 0, 1}:
+            raise ValueError('orient must be +/- 1')
+        
+        bad_list = self.orientViolations(orients)
+        
+        if bad_list:
+            raise AttributeError('Orientations result in source/sink at vertices {}'.format(bad_list))
+        
+        for edge, orient in zip(self.edge_list, orients):
+            edge.orient = orient if orient else None
+        
+        # Arrows are -orient at the start of an edge and +orient at its end;
+        # for a self-loop, the first place in the cyclic order is the start
+        
+        edge_label_dict = {edge: label for label, edge in enumerate(self.edge_list)}
+        
+        for vert in self.vert_list:
+            in_arrow = []
             
-            if adj_edges[1].start == None:              # To ensure ordered vertex labels
-                adj_edges[1].start = adj_edges[1].end
-                if adj_edges[1].orient != None:
-                    adj_edges[1].orient = -adj_edges[1].orient
-            adj_edges[1].end = self.vert_list[-2]
+            for place, edge in enumerate(vert.edge_order):
+                orient = orients[edge_label_dict[edge]]
                 
-            edge_yz = Edge(start = self.vert_list[-2], end = self.vert_list[-1])
-            
-            self.edge_list = self.edge_list[:(second_index + 1)] + [edge_yz] + \
-                self.edge_list[(second_index + 1):]
-            self.vert_list[-2].connectEdge(adj_edges[1])
-            
-            self.vert_list[-2].connectEdge(edge_yz)
-            self.vert_list[-1].connectEdge(edge_yz)
+                if edge.start == vert and (edge.end != vert or edge not in vert.edge_order[:place]):
+                    in_arrow += [-orient]
+                else:
+                    in_arrow += [orient]
             
-            # (3) change edge cx to cz
+            vert.in_arrow = in_arrow
+    
+    #-------------------------------------------------------------------------#
+    
+    def orientViolations(self, orients):
+        """
+            Returns labels of the vertices that would be a source or sink
+            (in-arrow sum of +/- 3) for orientations given in edge_list order;
+            the sums are found with a scatter-add over the edge ends
+        """
+        
+        start_list = [edge.start.label for edge in self.edge_list]
+        end_list = [edge.end.label for edge in self.edge_list]
+        
+        if numpy is None:
+            arrow_sum = [0] * self.num_vert
             
-            if adj_edges[2].start == None:              # To ensure ordered vertex labels
-                adj_edges[2].start = adj_edges[2].end
-                if adj_edges[2].orient != None:
-                    adj_edges[2].orient = -adj_edges[2].orient
-            adj_edges[2].end = self.vert_list[-1]
-                
-            self.vert_list[-1].connectEdge(adj_edges[2])
+            for start, end, orient in zip(start_list, end_list, orients):
+                arrow_sum[start] -= orient
+                arrow_sum[end] += orient
             
-            # Modify vertex, edge face lists as appropriate
+            return [label for label, total in enumerate(arrow_sum) if abs(total) == 3]
+        
+        orient_array = numpy.asarray(orients, dtype = numpy.int64)
+        arrow_sum = numpy.zeros(self.num_vert, dtype = numpy.int64)
+        
+        numpy.add.at(arrow_sum, numpy.asarray(start_list, dtype = numpy.intp), -orient_array)
+        numpy.add.at(arrow_sum, numpy.asarray(end_list, dtype = numpy.intp), orient_array)
+        
+        return [int(label) for label in numpy.nonzero(numpy.abs(arrow_sum) == 3)[0]]
+    
+    #-------------------------------------------------------------------------#
+    
+    def iterColorings(self, r = None):
+        """
+            Generator of all admissible colorings of the edges for the given r
+            (by default, the r of the graph), each as an array of colors in
+            edge_list order. Edges that already have a color keep it. The graph
+            itself is not changed.
+        """
+        
+        if r == None:
+            r = self.R
             
-            new_face = Face()
-            self.face_list += [new_face]
-            new_face.edge_list = [edge_xy, edge_yz, edge_xz]
+        if type(r) != int or r <= 3:
+            raise ValueError('r value must be >= 4')
             
-            [face_a, face_b, face_c] = current_vert.face_list
+        if any([len(vert.edge_order) != 3 for vert in self.vert_list]):
+            raise ValueError('graph must be trivalent to find colorings')
             
-            face_a_idx = face_a.edge_list.index(adj_edges[0])
-            face_a.edge_list = face_a.edge_list[:(face_a_idx + 1)] + [edge_xz] + \
-                face_a.edge_list[(face_a_idx + 1):]
-                
-            face_b_idx = face_b.edge_list.index(adj_edges[1])
-            face_b.edge_list = face_b.edge_list[:(face_b_idx + 1)] + [edge_xy] + \
-                face_b.edge_list[(face_b_idx + 1):]
+        # For each pair of colors at a vertex, the possible third colors
+        
+        third_dict = {}
+        
+        for (iii, jjj, kkk) in colorList(r):
+            for (aaa, bbb, ccc) in [(iii, jjj, kkk), (iii, kkk, jjj), (jjj, iii, kkk), \
+                                    (jjj, kkk, iii), (kkk, iii, jjj), (kkk, jjj, iii)]:
+                third_dict.setdefault((aaa, bbb), set()).add(ccc)
                 
-            face_c_idx = face_c.edge_list.index(adj_edges[2])
-            face_c.edge_list = face_c.edge_list[:(face_c_idx + 1)] + [edge_yz] + \
-                face_c.edge_list[(face_c_idx + 1):]
+        third_dict = {pair: sorted(color_set) for pair, color_set in third_dict.items()}
+        color_table = colorTable(r)
+        all_colors = list(range(1, r - 1))
+        
+        # Edge labels at each vertex, and vertex labels at each end of an edge
+        
+        edge_label_dict = {edge: label for label, edge in enumerate(self.edge_list)}
+        vert_label_dict = {vert: label for label, vert in enumerate(self.vert_list)}
+        
+        vert_edges = [[edge_label_dict[edge] for edge in vert.edge_order] for vert in self.vert_list]
+        edge_ends = [(vert_label_dict[edge.start], vert_label_dict[edge.end]) for edge in self.edge_list]
+        
+        color = array('i', [edge.color if edge.color else 0 for edge in self.edge_list])
+        
+        def fits(vert):
             
-            edge_xy.setLeftFace(new_face)
-            edge_xy.setRightFace(face_b)
+            # A vertex fits if its colors are allowed, or if two colors
+            # are chosen and some third color completes them
             
-            edge_xz.setLeftFace(face_a)
-            edge_xz.setRightFace(new_face)
+            vert_colors = [color[label] for label in vert_edges[vert]]
+            num_zero = vert_colors.count(0)
             
-            edge_yz.setLeftFace(new_face)
-            edge_yz.setRightFace(face_c)
+            if num_zero == 0:
+                return vert_colors in color_table
+            elif num_zero == 1:
+                vert_colors.remove(0)
+                return tuple(vert_colors) in third_dict
             
-            current_vert.face_list[2] = new_face
+            return True
+        
+        def candidates(label):
             
-            self.vert_list[-2].face_list = [new_face, face_b, face_c]
-            self.vert_list[-1].face_list = [face_a, new_face, face_c]
+            # When the other two colors at a (non-loop) end are known, only
+            # their third colors need to be tried
             
-            self.face_size_list = sorted([len(face.edge_list) for face in self.face_list])
+            color_pool = all_colors
             
-            # Return edges that have changed in graph edge list, so that edge
-            # colors/orientations can be modified for new edges
+            for vert in edge_ends[label]:
+                others = list(vert_edges[vert])
+                others.remove(label)
+                
+                if label not in others and 0 not in [color[other] for other in others]:
+                    color_pool = third_dict.get((color[others[0]], color[others[1]]), [])
+                    break
+                    
+            result = []
             
-            return [edge_xy, edge_xz, edge_yz]
+            for new_color in color_pool:
+                color[label] = new_color
+                if all([fits(vert) for vert in edge_ends[label]]):
+                    result += [new_color]
+                    
+            color[label] = 0
             
-    #-------------------------------------------------------------------------#
-    
-    def fourMove(self, edge_label = None):
+            return result
         
-        if edge_label != None:
-            
-            if type(edge_label) != int or edge_label < 0:
-                raise ValueError('edge label must be positive integer')
-                
-            if edge_label >= 3 * self.num_vert // 2:
-                raise ValueError('edge label must be between 0 and {}'.format(3 * self.num_vert // 2))
+        if not all([fits(vert) for vert in range(self.num_vert)]):
+            return
+        
+        # Order edges greedily, so that vertices are filled in as soon as
+        # possible and bad choices are found early
+        
+        order = []
+        num_chosen = [sum([1 for label in labels if color[label]]) for labels in vert_edges]
+        left_set = {label for label in range(len(edge_ends)) if color[label] == 0}
+        
+        while left_set:
+            label = max(left_set, key = lambda label: (sum([num_chosen[vert] for vert in set(edge_ends[label])]), -label))
             
-            current_edge = self.edge_list[edge_label]
-            current_start = current_edge.start
-            current_end = current_edge.end
+            order += [label]
+            left_set.remove(label)
             
-            if current_start == current_end:
-                raise ValueError('start, end vertices must be distinct')
+            for vert in edge_ends[label]:
+                num_chosen[vert] += 1
                 
-            # First, we create two new vertices. The two new vertices will have
-            # labels larger than any other current vertices in the graph, so we
-            # put them as the end of the vertex list.
-            
-            self.vert_list += [Vertex(label = self.num_vert, COLOR_LIST = self.ALLOWED_COLOR_LIST), \
-                               Vertex(label = self.num_vert + 1, COLOR_LIST = self.ALLOWED_COLOR_LIST)]
-            self.num_vert += 2
-            
-            # We have the current edge with vertices x < y. The cyclic order of
-            # x is of the form ax, bx, xy, while that for y is cy, dy, xy;
-            # however, the order in of these edges in the graph edge list is
-            # not definite, since there are three possible orderings of the
-            # edges in the cyclic order for each vertex x, y.
-            
-            # We create two new vertices w, z, where w is self.vert_list[-2],
-            # z is self.vert_list[-1]; when a, b, c, d are all distinct, we
-            # go through the this process:
-            #
-            #   (1) identify ax, bx, then remove edge xy from cyclic order of x
-            #   (2a) if a = b = x (so cyclic order is xx xx xy), change first
-            #       xx -> xw, add xz xw immediately after
-            #   (2b) if a != b, change edge ax to aw, add xw immediately after;
-            #       add edge xz immediately after bx
-            #   (3) identify cy, dy, then remove edge xy from cyclic order of y
-            #   (4a) if c = d = y (so cyclic order is yy yy xy), change first
-            #       yy -> yz, add yw yz immediately after
-            #   (4b) if c != d, change edge cy to cz, add yz immediately after;
-            #       add edge wy immediately after dy
-            #
-            # Since we do not move ax -> aw, cy -> cz, the cyclic orders for
-            # a, c remain the same; similarly, the edges bx, dy have not been
-            # changed at all, unless there is a double edge between vertices.
-            # This gives the following orderings:
-            #
-            #   x: wbz
-            #   y: zdw
-            #   w: axy
-            #   z: xcy
-            #
-            # If a = b = x (i.e. a self-loop on vertex x), then the cyclic
-            # order changes as xw(1) xz zw(2), and cy dy xy -> cz yz dy wy.
-            #
-            #   x: w1 z w2
-            #   y: zdw
-            #   w: x1 x2 y
-            #   z: xcy
-            #
-            # If b = y, c = x (i.e. double edge between x, y), then the cyclic
-            # order changes ax xy(1) xy(2) and xy(1) dy xy(2), where we assume
-            # the move is performed on xy(2). Then ax xy(1) xy(2) ->
-            # aw xw xz(1) xz(2) and xy(1) dy xy(2) -> xz(1) yz dy wy, since (2b)
-            # keep xy(1) ('bx') the same and puts xz(2) immediately after, but
-            # then (4b) changes xy(1) ('cy') to xz(1) ('cz'), and puts yz
-            # immediately after. Thus, three copies of xz are listed, but only
-            # two edges exist, and their final order is xz(1) yz zx(2). The
-            # cyclic order becomes:
-            #
-            #   x: w z1 z2
-            #   y: zdw
-            #   w: axy
-            #   z: x1 y x2
+        if not order:
+            yield array('i', color)
+            return
+        
+        # Depth-first search, keeping the remaining choices for each chosen
+        # edge on a stack; after each choice, an edge that is now the last
+        # open one at a vertex must still have some possible color
+        
+        stack = [iter(candidates(order[0]))]
+        
+        while stack:
+            label = order[len(stack) - 1]
+            new_color = next(stack[-1], None)
             
-            # (1) identify ax, bx, then remove edge xy from cyclic order of x
+            if new_color == None:
+                color[label] = 0
+                stack.pop()
+                continue
+                
+            color[label] = new_color
             
-            x_index = current_start.edge_order.index(current_edge)
+            if len(stack) == len(order):
+                yield array('i', color)
+                continue
             
-            edge_ax = current_start.edge_order[x_index - 2]
-            index_ax = self.edge_list.index(edge_ax)
+            dead_end = False
             
-            edge_bx = current_start.edge_order[x_index - 1]     # current_edge not a self-loop
+            for vert in edge_ends[label]:
+                open_labels = {other for other in vert_edges[vert] if color[other] == 0}
+                
+                if len(open_labels) == 1 and not candidates(open_labels.pop()):
+                    dead_end = True
+                    break
+                    
+            if dead_end:
+                continue
+                
+            stack += [iter(candidates(order[len(stack)]))]
+        
+    #-------------------------------------------------------------------------#
+    
+    def stateSum(self, vertex_weight = None, edge_weight = None, r = None):
+        """
+            Sum over all admissible colorings (for the given r, by default the
+            r of the graph) of the product of the vertex and edge weights. The
+            vertex weight is a function of the three colors at a vertex, in
+            CCW order, or an array indexed by them; the edge weight is a
+            function of the color, or an array indexed by it. Missing weights
+            are taken to be 1, so by default the colorings are counted. As for
+            iterColorings, edges that already have a color keep it.
+            
+            With numpy, the graph is treated as a tensor network, with one
+            tensor for each vertex, and contracted one pair of tensors at a
+            time, in the order given by contractionPlan; for planar graphs
+            this stays far smaller than the number of colorings. Integer and
+            real weights are summed in float64, exactly for integers (see
+            stateSumSweep). Without numpy, the colorings are summed one at a
+            time.
+        """
+        
+        if r == None:
+            r = self.R
+        
+        if type(r) != int or r <= 3:
+            raise ValueError('r value must be >= 4')
+        
+        return self.stateSumSweep([r], None if vertex_weight is None else lambda r: vertex_weight, \
+                                  None if edge_weight is None else lambda r: edge_weight)[r]
+    
+    #-------------------------------------------------------------------------#
+    
+    def stateSumSweep(self, r_list, vertex_weight = None, edge_weight = None):
+        """
+            State sums, as for stateSum, for every r in r_list, returned as a
+            dictionary keyed by r. Here the weights are functions of r giving
+            the weights stateSum takes, e.g. lambda r: quantumTable(r).theta;
+            if missing, the colorings are counted.
+            
+            Without numpy, the colorings are found once, for the largest r, and
+            each is added to the sums for all r from the smallest allowing it,
+            since colorings allowed for r are allowed for every larger r. With
+            numpy, only the contraction order and the admissibility tensor for
+            the largest r (cut down for the others) are shared; the network is
+            contracted again for each r, so a sweep costs about as much as a
+            stateSum for each r.
+        """
+        
+        r_list = sorted(set(r_list))
+        
+        if not r_list or any([type(r) != int or r <= 3 for r in r_list]):
+            raise ValueError('r value must be >= 4')
+        
+        if any([len(vert.edge_order) != 3 for vert in self.vert_list]):
+            raise ValueError('graph must be trivalent to find colorings')
+        
+        def weightFunctions(r):
             
-            current_start.removeEdge(current_edge)
+            if vertex_weight is None:
+                vertex_fn = None
+            elif callable(vertex_weight(r)):
+                vertex_fn = vertex_weight(r)
+            else:
+                vertex_array = vertex_weight(r)
+                vertex_fn = lambda iii, jjj, kkk: vertex_array[iii][jjj][kkk]
             
-            edge_xz = Edge(start = current_start, end = self.vert_list[-1])
-            edge_xw = Edge(start = current_start, end = self.vert_list[-2])
+            if edge_weight is None:
+                edge_fn = lambda iii: 1
+            elif callable(edge_weight(r)):
+                edge_fn = edge_weight(r)
+            else:
+                edge_array = edge_weight(r)
+                edge_fn = lambda iii: edge_array[iii]
             
-            # if edge_ax == edge_bx:      # current_start has self-loop
+            return (vertex_fn, edge_fn)
+        
+        r_max = r_list[-1]
+        
+        if numpy is None:
+            rotation_rows = self.rotationRows()
+            weight_dict = {r: weightFunctions(r) for r in r_list}
+            total_dict = {r: 0 for r in r_list}
             
-            #     # (2a) if a = b = x (so cyclic order is xx xx xy), change first
-            #     #   xx -> xw, add xz xw immediately after
-                
-            #     edge_ax.end = self.vert_list[-2]
-            #     current_start.removeEdge(edge_ax)
-                
-            #     self.edge_list = self.edge_list[:(index_ax + 1)] + [edge_xz, \
-            #         edge_xw] + self.edge_list[(index_ax + 1):]
-                    
-            #     index_bx = index_ax
+            for coloring in self.iterColorings(r_max):
                 
-            # else:
-                
-            # (2b) if a != b, change edge ax to aw, add xw immediately after;
-            #   add edge xz immediately after bx
-            
-            if edge_ax.start == current_start:
-                edge_ax.start = edge_ax.end
+                # Smallest r with all color sums at most 2r - 4
                 
-                # Since we are flipping the orientation of the edge, we must
-                # change the sign of the orientation, as well as the left,
-                # right faces
+                vert_colors = [[coloring[label] for label in rotation] for rotation in rotation_rows]
+                low_r = max([sum(colors) for colors in vert_colors]) // 2 + 2
                 
-                if edge_ax.color != None:
-                    edge_ax.orient = -edge_ax.orient
+                for r in r_list:
+                    if r < low_r:
+                        continue
                     
-                ax_face_left, ax_face_right = edge_ax.face_left, edge_ax.face_right
-                
-                edge_ax.setLeftFace(ax_face_right)
-                edge_ax.setRightFace(ax_face_left)
+                    (vertex_fn, edge_fn) = weight_dict[r]
+                    term = 1
                     
-            edge_ax.end = self.vert_list[-2]
-            current_start.removeEdge(edge_ax)
-            
-            self.edge_list = self.edge_list[:(index_ax + 1)] + [edge_xw] + \
-                self.edge_list[(index_ax + 1):]
-                
-            # Check index of edge bx here, since it may have just shifted
-                
-            index_bx = self.edge_list.index(edge_bx)
-            
-            self.edge_list = self.edge_list[:(index_bx + 1)] + [edge_xz] + \
-                self.edge_list[(index_bx + 1):]
-            
-            new_edge_list = [edge_xz, edge_xw]
-            
-            # (3) identify cy, dy, then remove edge xy from cyclic order of y
-                
-            y_index = current_end.edge_order.index(current_edge)
-            
-            edge_cy = current_end.edge_order[y_index - 2]
-            index_cy = self.edge_list.index(edge_cy)
+                    if vertex_fn != None:
+                        for colors in vert_colors:
+                            term *= vertex_fn(*colors)
+                    for color in coloring:
+                        term *= edge_fn(color)
+                    
+                    total_dict[r] += term
             
-            edge_dy = current_end.edge_order[y_index - 1]     # current_edge not a self-loop
-            index_dy = self.edge_list.index(edge_dy)
+            return total_dict
+        
+        # Each tensor is kept with the edge labels of its indices. The steps
+        # depend only on the graph, so are found once: self-loops are summed
+        # over the diagonal of their vertex tensor, the weight of any other
+        # edge is put on the tensor at its start, and pairs of tensors sharing
+        # an edge are contracted in the order given by contractionPlan.
+        
+        edge_label_dict = {edge: label for label, edge in enumerate(self.edge_list)}
+        vert_plan_list = []
+        
+        for vert in self.vert_list:
+            index_list = [edge_label_dict[edge] for edge in vert.edge_order]
+            loop_list = []
             
-            current_end.removeEdge(current_edge)
+            for label in sorted(set(index_list)):
+                if index_list.count(label) == 2:
+                    first = index_list.index(label)
+                    loop_list += [(first, index_list.index(label, first + 1), label)]
+                    index_list = [other for other in index_list if other != label]
             
-            edge_yw = Edge(start = current_end, end = self.vert_list[-2])
-            edge_yz = Edge(start = current_end, end = self.vert_list[-1])
+            start_list = [(place, label) for place, label in enumerate(index_list) \
+                          if self.edge_list[label].start == vert]
             
-            # if edge_cy == edge_dy:      # current_start has self-loop
+            vert_plan_list += [(loop_list, start_list, index_list)]
+        
+        pair_list = contractionPlan([plan[2] for plan in vert_plan_list], r_max - 1)
+        
+        # Tensors are indexed by color, so index 0 (no color) has zero weight.
+        # Admissible triples for r are those for the largest r with color sum
+        # at most 2r - 4.
+        
+        size_max = r_max - 1
+        admissible = numpy.zeros((size_max, size_max, size_max), dtype = bool)
+        
+        for (iii, jjj, kkk) in colorList(r_max):
+            for triad in [(iii, jjj, kkk), (iii, kkk, jjj), (jjj, iii, kkk), \
+                          (jjj, kkk, iii), (kkk, iii, jjj), (kkk, jjj, iii)]:
+                admissible[triad] = True
+        
+        color_range = numpy.arange(size_max)
+        color_sum = color_range[:, None, None] + color_range[None, :, None] + color_range[None, None, :]
+        
+        def contract(vertex_tensor, edge_vector, integer = False, modulus = None, track = False):
             
-            #     # (4a) if c = d = y (so cyclic order is yy yy xy), change first
-            #     #   yy -> yz, add yw yz immediately after
+            # A fixed color keeps only that entry of the edge weight
+            
+            def weightVector(label):
+                color = self.edge_list[label].color
                 
-            #     edge_cy.end = self.vert_list[-1]
-            #     current_end.removeEdge(edge_cy)
+                if not color:
+                    return edge_vector
                 
-            #     self.edge_list = self.edge_list[:(index_cy + 1)] + [edge_yw, \
-            #         edge_yz] + self.edge_list[(index_cy + 1):]
+                weight = numpy.zeros(len(edge_vector), dtype = edge_vector.dtype)
+                if color < len(edge_vector):
+                    weight[color] = edge_vector[color]
                 
-            # else:
+                return weight
             
-            # (4b) if c != d, change edge cy to cz, add yz immediately after;
-            #   add edge yw immediately after dy
+            # If integer is True, the sums of the components are given as
+            # Python integers; if a modulus is given, entries are reduced by it
+            # after each step; if track is True, the largest entry of any
+            # tensor found is also returned
             
-            if edge_cy.start == current_end:
-                edge_cy.start = edge_cy.end
+            tensor_dict = {}
+            largest = 0
+            
+            for key, (loop_list, start_list, index_list) in enumerate(vert_plan_list):
+                tensor = vertex_tensor
                 
-                # Since we are flipping the orientation of the edge, we must
-                # change the sign of the orientation, as well as the left,
-                # right faces
+                for (first, second, label) in loop_list:
+                    tensor = numpy.diagonal(tensor, axis1 = first, axis2 = second)
+                    tensor = numpy.tensordot(tensor, weightVector(label), axes = ([-1], [0]))
+                    tensor = tensor if modulus == None else tensor % modulus
                 
-                if edge_cy.orient != None:
-                    edge_cy.orient = -edge_cy.orient
-                    
-                cy_face_left, cy_face_right = edge_cy.face_left, edge_cy.face_right
+                for (place, label) in start_list:
+                    shape = [1] * len(index_list)
+                    shape[place] = len(edge_vector)
+                    tensor = tensor * weightVector(label).reshape(shape)
+                    tensor = tensor if modulus == None else tensor % modulus
                 
-                edge_cy.setLeftFace(cy_face_right)
-                edge_cy.setRightFace(cy_face_left)
-                    
-            edge_cy.end = self.vert_list[-1]
-            current_end.removeEdge(edge_cy)
+                tensor_dict[key] = tensor
+                
+                if track:
+                    largest = max(largest, tensor.max(initial = 0))
             
-            self.edge_list = self.edge_list[:(index_cy + 1)] + [edge_yz] + \
-                self.edge_list[(index_cy + 1):]
+            for (first, second, first_axes, second_axes) in pair_list:
+                tensor_dict[first] = numpy.tensordot(tensor_dict[first], tensor_dict.pop(second), \
+                                                     axes = (first_axes, second_axes))
                 
-            # Check index of edge dy here, since it may have just shifted
+                if modulus != None:
+                    tensor_dict[first] %= modulus
                 
-            index_dy = self.edge_list.index(edge_dy)
+                if track:
+                    largest = max(largest, tensor_dict[first].max(initial = 0))
             
-            self.edge_list = self.edge_list[:(index_dy + 1)] + [edge_yw] + \
-                self.edge_list[(index_dy + 1):]
-
-            new_edge_list += [edge_yw, edge_yz]
+            # Separate components are multiplied together
+            
+            total = 1
+            
+            for tensor in tensor_dict.values():
+                value = int(tensor.item()) if integer else tensor.item()
+                total = total * value if modulus == None else total * value % modulus
+            
+            return (total, largest)
         
-            # Modify vertex, edge face lists as appropriate
+        total_dict = {}
+        
+        for r in r_list:
+            size = r - 1
+            (vertex_fn, edge_fn) = weightFunctions(r)
             
-            new_face = Face()
-            self.face_list += [new_face]
-            new_face.edge_list = [edge_xz, edge_yz, edge_yw, edge_xw]
+            allowed = admissible[:size, :size, :size] & (color_sum[:size, :size, :size] <= 2 * r - 4)
+            triad_list = [tuple([int(color) for color in triad]) for triad in zip(*numpy.nonzero(allowed))]
             
-            face_left = current_edge.face_left
-            face_right = current_edge.face_right
-            [face_start] = [face for face in current_start.face_list \
-                            if face not in [face_left, face_right]]
-            [face_end] = [face for face in current_end.face_list \
-                            if face not in [face_left, face_right]]
-                
-            face_left_idx = face_left.edge_list.index(current_edge)
-            face_left.edge_list[face_left_idx] = edge_yw
-                
-            face_right_idx = face_right.edge_list.index(current_edge)
-            face_right.edge_list[face_right_idx] = edge_xz
+            vertex_list = [vertex_fn(*triad) for triad in triad_list] if vertex_fn != None else []
+            edge_list = [edge_fn(color) for color in range(1, size)]
             
-            face_start_idx = face_start.edge_list.index(edge_bx)
-            face_start.edge_list = face_start.edge_list[:(face_start_idx + 1)] + \
-                [edge_xw] + face_start.edge_list[(face_start_idx + 1):]
+            def weightArrays(dtype, weight_map = lambda weight: weight):
+                vertex_tensor = allowed.astype(int).astype(dtype)
                 
-            face_end_idx = face_end.edge_list.index(edge_dy)
-            face_end.edge_list = face_end.edge_list[:(face_end_idx + 1)] + \
-                [edge_yz] + face_end.edge_list[(face_end_idx + 1):]
+                for triad, weight in zip(triad_list, vertex_list):
+                    vertex_tensor[triad] = weight_map(weight)
                 
-            self.face_size_list = sorted([len(face.edge_list) for face in self.face_list])
+                return (vertex_tensor, numpy.array([0] + [weight_map(weight) for weight in edge_list], dtype = dtype))
+            
+            # Sums are taken in float64 (using BLAS), which for integer weights
+            # is exact if every value found is an integer below 2^53: either
+            # from a bound on the number of colorings, at most (r - 2)^E,
+            # times the largest weights, or else from the largest entry found
+            # when contracting the absolute values of the weights. Otherwise,
+            # integer sums are found modulo primes small enough that no sum of
+            # products in a step reaches 2^53, and put together by
+            # chineseRemainder. Other weights, e.g. Cyclotomic, or integers
+            # too big for float64, are summed exactly as Python objects.
+            
+            dtype = object
+            integer = False
+            modulus_list = []
+            
+            if all([isinstance(weight, (int, numpy.integer)) for weight in vertex_list + edge_list]):
+                vertex_max = max([abs(int(weight)) for weight in vertex_list] + [1])
+                edge_max = max([abs(int(weight)) for weight in edge_list] + [1])
                 
-            edge_xz.setLeftFace(new_face)
-            edge_xz.setRightFace(face_right)
+                if vertex_max ** self.num_vert * (edge_max * (size - 1)) ** len(self.edge_list) < 2 ** 53:
+                    (dtype, integer) = (numpy.float64, True)
+                elif max(vertex_max, edge_max) < 2 ** 52:
+                    (abs_total, largest) = contract(*weightArrays(numpy.float64, lambda weight: abs(int(weight))), \
+                                                    track = True)
+                    limit = isqrt((2 ** 53 - 1) // size ** max([len(step[2]) for step in pair_list] + [1]))
+                    
+                    if largest < 2 ** 52:
+                        (dtype, integer) = (numpy.float64, True)
+                    elif abs_total < float('inf') and limit > 2 ** 12:
+                        (dtype, integer) = (numpy.float64, True)
+                        modulus_list = modulusList(int(abs_total * (1 + 2 ** -20)) + 1, limit)
+            elif all([isinstance(weight, (int, float, numpy.integer, numpy.floating)) \
+                      for weight in vertex_list + edge_list]):
+                dtype = numpy.float64
+            
+            if modulus_list == []:
+                total_dict[r] = contract(*weightArrays(dtype), integer = integer)[0]
+            else:
+                residue_list = [contract(*weightArrays(dtype, lambda weight: int(weight) % modulus), integer = True, \
+                                         modulus = modulus)[0] for modulus in modulus_list]
+                total_dict[r] = chineseRemainder(residue_list, modulus_list)
+        
+        return total_dict
+
+    #-------------------------------------------------------------------------#
+    
+    def vertex(self, label = 0):
+        """
+            Returns Vertex object from vert_list at given index
+        """
+        
+        if type(label) != int:
+            raise ValueError('Vertex label must be integer')
             
-            edge_yz.setLeftFace(face_end)
-            edge_yz.setRightFace(new_face)
+        if label < 0 or label >= self.num_vert:
+            raise ValueError('Vertex label must be between 0 and {}'.format(self.num_vert - 1))
             
-            edge_yw.setLeftFace(new_face)
-            edge_yw.setRightFace(face_left)
+        return self.vert_list[label]
+        
+    #-------------------------------------------------------------------------#
+    
+    def edge(self, label = 0):
+        """
+            Returns Edge object from edge_list at given index
+        """
+        
+        if type(label) != int:
+            raise ValueError('Edge label must be integer')
             
-            edge_xw.setLeftFace(face_start)
-            edge_xw.setRightFace(new_face)
-                
-            # Now that we are associating the edges in vertex cyclic orders
-            # with the corresponding faces incident to the vertex, we have to
-            # make sure that the vertex cyclic order and face list are
-            # consistent with the edge list for the graph. The cyclic order
-            # for the vertex x depends on the original order of ax, bx in the
-            # edge list. All of the statements below assume that there are
-            # no self-loops.
+        if label < 0 or label >= 3 * self.num_vert // 2:
+            raise ValueError('Vertex label must be between 0 and {}'.format(3 * self.num_vert // 2 - 1))
             
-            #   x: If ax comes before bx, then the procedure outlined above
-            #   will give a final edge list in the order aw xw bx xz, while
-            #   if bx comes before ax, then it will be bx xz aw xw.
+        return self.edge_list[label]
+        
+    #-------------------------------------------------------------------------#
+    
+    def numVert(self):
+        return self.num_vert
+        
+    #-------------------------------------------------------------------------#
+    
+    def allowedColorList(self):
+        return self.ALLOWED_COLOR_LIST
+        
+    #-------------------------------------------------------------------------#
+    
+    def colorList(self):
+        return [edge.color for edge in self.edge_list]
+    
+    #-------------------------------------------------------------------------#
+    
+    def edgeList(self):
+        return [edge for edge in self.edge_list]
+    
+    #-------------------------------------------------------------------------#
+    
+    def orientList(self):
+        return [edge.orient for edge in self.edge_list]
+    
+    #-------------------------------------------------------------------------#
+        
+#=============================================================================#
+
+class FrozenGraph:
+    """
+        Immutable snapshot of a Graph, which can be used in sets and as a
+        dictionary key. Equal (isomorphic) graphs have equal hashes.
+    """
+    
+    __slots__ = ['num_vert', 'R', 'edge_array', 'rotation_array', 'code', 'hash_value']
+    
+    def __init__(self, graph):
+        
+        if type(graph) != Graph:
+            raise ValueError('graph must be a Graph object')
+        
+        # The body is a flat array of the edge rows [start, end, orient, color,
+        # twist] in the order of the graph edge list, together with a flat
+        # array of the edge labels around each vertex in cyclic order; the
+        # number of labels for each vertex is its degree.
+        
+        edge_array = array('l')
+        for row in graph.edgeRows():
+            edge_array.extend(row)
             
-            #   w: If ax comes before dy, then we will have aw xw dy wy, while
-            #   if dy comes before ax, then we get dy wy aw xw.
+        rotation_array = array('l')
+        for row in graph.rotationRows():
+            rotation_array.extend(row)
+        
+        object.__setattr__(self, 'num_vert', graph.num_vert)
+        object.__setattr__(self, 'R', graph.R)
+        object.__setattr__(self, 'edge_array', edge_array)
+        object.__setattr__(self, 'rotation_array', rotation_array)
+        
+        # Canonical code and hash are found when first needed
+        
+        object.__setattr__(self, 'code', None)
+        object.__setattr__(self, 'hash_value', None)
+        
+    #-------------------------------------------------------------------------#
+    
+    def __setattr__(self, name, value):
+        raise AttributeError('FrozenGraph is immutable')
+        
+    #-------------------------------------------------------------------------#
+    
+    def __delattr__(self, name):
+        raise AttributeError('FrozenGraph is immutable')
+        
+    #-------------------------------------------------------------------------#
+    
+    def __repr__(self):
+        return f'FrozenGraph of {self.num_vert} vertices and {len(self.edge_array) // 5} edges'
+        
+    #-------------------------------------------------------------------------#
+    
+    def __hash__(self):
+        if self.hash_value == None:
+            object.__setattr__(self, 'hash_value', hash(self.canonicalCode()))
             
-            #   y: If cy comes before dy, then we have cz yz dy wy, while if
-            #   dy comes before cy, we get dy wy cz yz.
+        return self.hash_value
+        
+    #-------------------------------------------------------------------------#
+    
+    def __eq__(self, other):
+        
+        if isinstance(other, FrozenGraph):
             
-            #   z: If bx comes before cy, we have bx xz cz yz, while if cy
-            #   comes before bx, we get cz yz bx xz.
+            # Once hashes are known, unequal graphs are almost always told
+            # apart by comparing the hashes
             
-            current_start.color_list = [0] * 3
-            current_start.in_arrow = [0] * 3
-            if index_ax < index_bx:
-                current_start.edge_order = [edge_xw, edge_bx, edge_xz]
-                current_start.face_list = [new_face, face_start, face_right]
-            else:
-                current_start.edge_order = [edge_bx, edge_xz, edge_xw]
-                current_start.face_list = [face_start, face_right, new_face]
-                
-            self.vert_list[-2].color_list = [0] * 3
-            self.vert_list[-2].in_arrow = [0] * 3
-            if index_ax < index_dy:
-                self.vert_list[-2].edge_order = [edge_ax, edge_xw, edge_yw]
-                self.vert_list[-2].face_list = [face_left, face_start, new_face]
-            else:
-                self.vert_list[-2].edge_order = [edge_yw, edge_ax, edge_xw]
-                self.vert_list[-2].face_list = [new_face, face_left, face_start]
+            if self.num_vert != other.num_vert or len(self.edge_array) != len(other.edge_array) \
+                or hash(self) != hash(other):
+                return False
             
-            current_end.color_list = [0] * 3
-            current_end.in_arrow = [0] * 3
-            if index_cy < index_dy:
-                current_end.edge_order = [edge_yz, edge_dy, edge_yw]
-                current_end.face_list = [new_face, face_end, face_left]
-            else:
-                current_end.edge_order = [edge_dy, edge_yw, edge_yz]
-                current_end.face_list = [face_end, face_left, new_face]
-                
-            self.vert_list[-1].color_list = [0] * 3
-            self.vert_list[-1].in_arrow = [0] * 3
-            if index_bx < index_cy:
-                self.vert_list[-1].edge_order = [edge_xz, edge_cy, edge_yz]
-                self.vert_list[-1].face_list = [new_face, face_right, face_end]
+        elif isinstance(other, Graph):
+            if self.num_vert != other.num_vert or len(self.edge_array) != 5 * len(other.edge_list):
+                return False
+            
+        else:
+            return NotImplemented
+            
+        return self.canonicalCode() == other.canonicalCode()
+        
+    #-------------------------------------------------------------------------#
+    
+    def canonicalCode(self):
+        """
+            Returns canonical code of the graph, as for Graph.canonicalCode
+        """
+        
+        if self.code == None:
+            code = canonicalDartCode(*rowDartTable(self.num_vert, self.edgeRows(), self.rotationRows()))
+            object.__setattr__(self, 'code', code)
+            
+        return self.code
+        
+    #-------------------------------------------------------------------------#
+    
+    def edgeRows(self):
+        """
+            Returns edge rows [start, end, orient, color, twist], as for Graph.edgeRows
+        """
+        
+        return [self.edge_array[iii:(iii + 5)].tolist() for iii in range(0, len(self.edge_array), 5)]
+        
+    #-------------------------------------------------------------------------#
+    
+    def rotationRows(self):
+        """
+            Returns edge labels around each vertex, as for Graph.rotationRows
+        """
+        
+        vert_deg = [0] * self.num_vert
+        for iii in range(0, len(self.edge_array), 5):
+            vert_deg[self.edge_array[iii]] += 1
+            vert_deg[self.edge_array[iii + 1]] += 1
+            
+        rotation_rows = []
+        place = 0
+        
+        for deg in vert_deg:
+            rotation_rows += [self.rotation_array[place:(place + deg)].tolist()]
+            place += deg
+            
+        return rotation_rows
+        
+    #-------------------------------------------------------------------------#
+    
+    def thaw(self):
+        """
+            Returns new mutable Graph with the same edges
+        """
+        
+        graph = Graph(num_vert = self.num_vert, r = self.R)
+        graph.wireEdges(self.edgeRows())
+        graph.setRotations(self.rotationRows())
+        
+        return graph
+        
+    #-------------------------------------------------------------------------#
+    
+    def numVert(self):
+        return self.num_vert
+        
+#=============================================================================#
+
+class DartGraph:
+    """
+        Trivalent graph stored as a table of darts (half-edges) in flat typed
+        arrays, as an alternative to the Vertex, Edge and Face objects of
+        Graph. The darts of vertex v are 3v, 3v + 1, 3v + 2 in CCW order; for
+        each dart, the arrays give the next dart CCW around the vertex, the
+        opposite dart, the vertex, the face, the edge label, and the edge
+        orientation (+1 pointing into the vertex of the dart, -1 away, 0 for
+        none), color and twist. Each edge also records its start dart.
+        
+        Moves (oneMove to fourMove and pachner22) and queries follow Graph,
+        except that edges are labeled by integers, and new edges are put at
+        the end of the edge list rather than next to the edges they come from.
+        Faces are found only when asked for, and are not Face objects; their
+        sizes are given by face_size_list, as for Graph, or faceSizeList(). The arrays support the buffer
+        protocol, so can be viewed without copying by numpy.frombuffer.
+    """
+    
+    def __init__(self, num_vert = None, r = None):
+        
+        if r:
+            if (type(r) != int or r <= 3):
+                raise ValueError('r value must be >= 4')
             else:
-                self.vert_list[-1].edge_order = [edge_cy, edge_yz, edge_xz]
-                self.vert_list[-1].face_list = [face_right, face_end, new_face]
-                
-            self.edge_list.remove(current_edge)
+                self.ALLOWED_COLOR_LIST = colorList(r)
+        else:
+            self.ALLOWED_COLOR_LIST = [[0, 0, 0]]
             
-            # Return edges that have been added to graph edge list, so that edge
-            # orientations, colors can be modified for new edges; note that
-            # original edge was deleted, so this returns *four* edges, even
-            # though only two vertices were created.
+        self.COLOR_TABLE = colorTable(r)
+        self.R = r
+        
+        if num_vert:
+            if (type(num_vert) != int or num_vert <= 0):
+                raise ValueError('Number of vertices must be a positive integer')
+        
+            if (num_vert % 2) == 1:
+                raise ValueError('Trivalent graphs must have an even number of vertices')
+        else:
+            num_vert = 0
             
-            return new_edge_list
+        self.num_vert = 0
+        
+        # Dart arrays; unconnected darts have opposite dart and edge -1
+        
+        self.next_dart = array('i')
+        self.opp = array('i')
+        self.dart_vert = array('i')
+        self.dart_face = array('i')
+        self.dart_edge = array('i')
+        self.dart_arrow = array('b')
+        self.dart_color = array('i')
+        self.dart_twist = array('i')
+        
+        # Start dart of each edge
+        
+        self.edge_dart = array('i')
+        
+        # Faces are found when first needed, and cleared by any move
+        
+        self.num_faces = 0
+        
+        self.addVertices(num_vert)
         
     #-------------------------------------------------------------------------#
     
-    def fiveMove(self):
-        pass
+    def __repr__(self):
+        return f'DartGraph of {self.num_vert} vertices and {len(self.edge_dart)} edges'
         
     #-------------------------------------------------------------------------#
     
-    def findFaces(self):
+    def __eq__(self, other):
         
-        if len(self.face_list) == 2 + self.num_vert // 2:
+        if not isinstance(other, (DartGraph, Graph, FrozenGraph)):
+            return NotImplemented
+        
+        if self.num_vert != other.numVert():
             return False
         
-        # Find all possible ways of traveling through each graph vertex such
-        # that the incoming, outgoing edges are CCW as seen in cyclic order
-            
-        corner_queue = []
-        for vert in self.vert_list:
-            corner_queue += [(vert, vert.edge_order[0], vert.edge_order[1]), \
-                             (vert, vert.edge_order[1], vert.edge_order[2]), \
-                             (vert, vert.edge_order[2], vert.edge_order[0])]
-                
-        # Travel along all possible corners, adding to appropriate face
-                
-        while len(corner_queue) > 0:
-            
-            # Traveling CCW around face means we travel CW around vertex, so the
-            # incoming edge label appears after the outgoing label in cyclic order
-            
-            (current_vert, next_edge, start_edge) = corner_queue.pop()
-            
-            # Create new face, update incident vertex and starting edge; since
-            # the start edge is "before" tbe current vertex as you go around
-            # the face, the face assignment here is opposite to the rest of the
-            # face below.
-            
-            current_face = Face()
-            self.face_list += [current_face]
-            
-            if current_vert == start_edge.start:
-                start_edge.setRightFace(current_face)
-            else:
-                start_edge.setLeftFace(current_face)
-                
-            # current_vert.addFace(current_face)
-            current_face.addEdge(start_edge)
-            
-            # We associate the ordering in the face list for the vertex with
-            # the same ordering as the cyclic edge order. To make this work,
-            # edge iii in the cyclic order means we place the face at index iii
-            # which also contains this edge; this requires the edge be
-            # incoming at the vertex.
-            
-            start_edge_idx = current_vert.edge_order.index(start_edge)
-            current_vert.face_list[start_edge_idx] = current_face
-            
-            # Go through the rest of the face
-            
-            while next_edge != start_edge:
-                
-                # Update current vertex, edge
-                
-                current_edge = next_edge
+        return self.canonicalCode() == other.canonicalCode()
+        
+    #-------------------------------------------------------------------------#
+    
+    def addVertices(self, added_num_vert):
+        """
+            Add given number of vertices, with unconnected darts
+        """
+        
+        if type(added_num_vert) != int or added_num_vert < 0:
+            raise ValueError('Number of added vertices must be non-negative integer')
+        
+        num_dart = 3 * self.num_vert
+        added_num_dart = 3 * added_num_vert
+        
+        self.next_dart.extend([dart - dart % 3 + (dart + 1) % 3 for dart in range(num_dart, num_dart + added_num_dart)])
+        self.dart_vert.extend([dart // 3 for dart in range(num_dart, num_dart + added_num_dart)])
+        
+        for dart_array in [self.opp, self.dart_face, self.dart_edge]:
+            dart_array.extend([-1] * added_num_dart)
             
-                if current_vert == current_edge.start:
-                    current_vert = current_edge.end
-                    current_edge.setLeftFace(current_face)
-                else:
-                    current_vert = current_edge.start
-                    current_edge.setRightFace(current_face)
-                    
-                # Add current face to vertex, and current edge to face
-                    
-                # current_vert.addFace(current_face)
-                current_face.addEdge(current_edge)
-                
-                current_edge_idx = current_vert.edge_order.index(current_edge)
-                current_vert.face_list[current_edge_idx] = current_face
-                
-                # Find next edge to travel down, remove the vertex and edge
-                # pair from queue
-                
-                current_vert_idx = current_vert.edge_order.index(current_edge)
-                next_edge = current_vert.edge_order[current_vert_idx - 1]
-                
-                corner_queue.remove((current_vert, next_edge, current_edge))
-                
-        # Record face sizes for posterity
+        for dart_array in [self.dart_arrow, self.dart_color, self.dart_twist]:
+            dart_array.extend([0] * added_num_dart)
         
-        self.face_size_list = sorted([len(face.edge_list) for face in self.face_list])
+        self.num_vert += added_num_vert
+        self.num_faces = 0
         
     #-------------------------------------------------------------------------#
     
-    def pachner22(self, edge_label = None, no_multi = True):
+    def addEdges(self, added_edge_list):
+        """
+            Add edges given as lists [start, end, orient, color, twist], where
+            the last three are optional; as for Graph.addEdges, edges are
+            placed next in CCW order at each vertex
+        """
         
-        if edge_label != None:
-            
-            if type(edge_label) != int or edge_label < 0:
-                raise ValueError('edge label must be positive integer')
-                
-            if edge_label >= 3 * self.num_vert // 2:
-                raise ValueError('edge label must be between 0 and {}'.format(3 * self.num_vert // 2))
-            
-            current_edge = self.edge_list[edge_label]
-            current_start = current_edge.start
-            current_end = current_edge.end
-            
-            if current_start == current_end:
-                raise ValueError('start, end vertices must be distinct')
-                
-            # If faces have not been created, do so here
-            
-            if self.face_list == []:
-                self.findFaces()
-                
-            face_left = current_edge.leftFace()
-            face_right = current_edge.rightFace()
-            [face_start] = [face for face in current_start.face_list \
-                            if face not in [face_left, face_right]]
-            [face_end] = [face for face in current_end.face_list \
-                            if face not in [face_left, face_right]]
-                
-            # This is similar to fourMove() defined earlier, except no new
-            # vertices are created; instead, existing edges have their start,
-            # end attributes changed around. We also remove the orientation and
-            # color (if they exists) of current_edge, and return these at end,
-            # so they can be modified later.
-            
-            # We have the current edge with vertices x < y. The starting cyclic
-            # order of x is of the form ax bx xy, while that for y is cy dy xy. 
-            # We want to change it so that the final cyclic order of x is
-            # bx cx xy, while that of y is dy ay xy.
-            
-            start_current_edge_index = current_start.edge_order.index(current_edge)
-            end_current_edge_index = current_end.edge_order.index(current_edge)
-            
-            if no_multi:
-                
-                # If no_multi is True (i.e. no multiple edges allowed between
-                # vertices), we must check that the two faces *not* shared by
-                # x, y do not have an edge in common
-                
-                shared_edge_list = list(set(face_start.edge_list).intersection(face_end.edge_list))
-
-                if len(shared_edge_list) > 0:
-                    raise AttributeError('Pachner 2-2 move gives graph not dual to triangulation')
-                    
-            # (0) remove orientation, color from xy, if necessary; in_arrow and
-            # color_list for start, end vertices are reconstructed later
-            
-            if current_edge.orient:
-                current_edge.orient = None
-                
-            if current_edge.color:
-                current_edge.color = None
+        edge_rows = self.edgeRows()
+        rotation_rows = self.rotationRows()
         
-            # (1) Change ax to ay
+        for added_edge in added_edge_list:
+            row = [entry if entry else 0 for entry in added_edge] + [0] * (5 - len(added_edge))
             
-            edge_ax = current_start.edge_order[start_current_edge_index - 2]
+            for vert in row[:2]:
+                if type(vert) != int or vert < 0 or vert >= self.num_vert:
+                    raise ValueError('Vertex labels must be between 0 and {}'.format(self.num_vert - 1))
             
-            if edge_ax.start == current_start:
-                edge_ax.start = current_end
-            else:
-                edge_ax.end = current_end
-                
-            if edge_ax.start.label > edge_ax.end.label:
-                edge_ax.start, edge_ax.end = edge_ax.end, edge_ax.start
-                
-                # Flip orientation (if it exists), and which face is on which side
-                
-                if edge_ax.orient:
-                    edge_ax.orient = -edge_ax.orient
-                    
-                ax_face_left, ax_face_right = edge_ax.face_left, edge_ax.face_right
-                edge_ax.face_left, edge_ax.face_right = ax_face_right, ax_face_left
-                
-            # (2) Change cy to cx
+            rotation_rows[row[0]] += [len(edge_rows)]
+            rotation_rows[row[1]] += [len(edge_rows)]
+            edge_rows += [row]
             
-            edge_cy = current_end.edge_order[end_current_edge_index - 2]
-                
-            if edge_cy.start == current_end:
-                edge_cy.start = current_start
-            else:
-                edge_cy.end = current_start
-                
-            if edge_cy.start.label > edge_cy.end.label:
-                edge_cy.start, edge_cy.end = edge_cy.end, edge_cy.start
+            for vert in row[:2]:
+                if len(rotation_rows[vert]) > 3:
+                    raise ValueError('Vertex {} already trivalent'.format(vert))
                 
-                # Flip orientation (if it exists), and which face is on which side
+        self.wireDarts(edge_rows, rotation_rows)
+        
+    #-------------------------------------------------------------------------#
+    
+    def setRotations(self, rotation_rows):
+        """
+            Set cyclic order of each vertex from lists of edge labels, as for
+            Graph.setRotations
+        """
+        
+        self.wireDarts(self.edgeRows(), rotation_rows)
+        
+    #-------------------------------------------------------------------------#
+    
+    def wireDarts(self, edge_rows, rotation_rows):
+        """
+            Set all darts from edge rows [start, end, orient, color, twist]
+            and the edge labels around each vertex; for a self-loop, the
+            first appearance in the cyclic order is the start
+        """
+        
+        occur_list = [[] for row in edge_rows]
+        
+        for vert, rotation in enumerate(rotation_rows):
+            for place, label in enumerate(rotation):
+                occur_list[label] += [3 * vert + place]
+        
+        num_dart = 3 * self.num_vert
+        
+        self.opp = array('i', [-1] * num_dart)
+        self.dart_edge = array('i', [-1] * num_dart)
+        self.dart_arrow = array('b', [0] * num_dart)
+        self.dart_color = array('i', [0] * num_dart)
+        self.dart_twist = array('i', [0] * num_dart)
+        self.edge_dart = array('i')
+        
+        for label, ((start, end, orient, color, twist), [first_dart, second_dart]) in \
+            enumerate(zip(edge_rows, occur_list)):
                 
-                if edge_cy.orient:
-                    edge_cy.orient = -edge_cy.orient
-                    
-                cy_face_left, cy_face_right = edge_cy.face_left, edge_cy.face_right
-                edge_cy.face_left, edge_cy.face_right = cy_face_right, cy_face_left
+            if first_dart // 3 != start:
+                first_dart, second_dart = second_dart, first_dart
                 
-            # (3) Change cyclic order for vertex x to be bx cx xy, for vertex
-            # y to be dy ay xy. While this is done, ensure that in_arrow is
-            # correct for x, y.
+            self.opp[first_dart] = second_dart
+            self.opp[second_dart] = first_dart
+            self.dart_edge[first_dart] = self.dart_edge[second_dart] = label
+            self.edge_dart.append(first_dart)
             
-            edge_bx = current_start.edge_order[start_current_edge_index - 1]
-            edge_dy = current_end.edge_order[end_current_edge_index - 1]
+            self.dart_arrow[first_dart] = -orient
+            self.dart_arrow[second_dart] = orient
+            self.dart_color[first_dart] = self.dart_color[second_dart] = color
+            self.dart_twist[first_dart] = self.dart_twist[second_dart] = twist
             
-            temp_color_list = [edge.color for edge in [edge_ax, edge_bx, edge_cy, edge_dy]]
-            current_start.color_list = [temp_color_list[iii] for iii in [1, 2]] + [0]
-            current_end.color_list = [temp_color_list[iii] for iii in [3, 0]] + [0]
+        self.num_faces = 0
+        
+        # Check colors and orientations at each trivalent vertex
+        
+        for vert, rotation in enumerate(rotation_rows):
+            if len(rotation) < 3:
+                continue
             
-            current_start.edge_order = []
-            current_start.in_arrow = []
+            color_list = self.dart_color[(3 * vert):(3 * vert + 3)]
             
-            for edge in [edge_bx, edge_cy, current_edge]:
-                current_start.edge_order += [edge]
+            if (0 not in color_list) and color_list not in self.COLOR_TABLE:
+                raise AttributeError('Edge color does not satisfy vertex rules')
                 
-                if edge.orient:
-                    if (edge.orient > 0 and current_start == edge.end) or \
-                        (edge.orient < 0 and current_start == edge.start):
-                        current_start.in_arrow += [1]
-                    else:
-                        current_start.in_arrow += [-1]
-                else:
-                    current_start.in_arrow += [0]
-                    
-            current_end.edge_order = []
-            current_end.in_arrow = []
-                    
-            for edge in [edge_dy, edge_ax, current_edge]:
-                current_end.edge_order += [edge]
-                if edge.orient:
-                    if (edge.orient > 0 and current_end == edge.end) or \
-                        (edge.orient < 0 and current_end == edge.start):
-                        current_end.in_arrow += [1]
-                    else:
-                        current_end.in_arrow += [-1]
-                else:
-                    current_end.in_arrow += [0]
-            
-            # (4) Change edge list for graph; to be consistent with vertex
-            # cyclic orders, we need to permute the order of the edges in the
-            # edge list so that
-            #
-            #   ax bx xy -> bx cx xy
-            #   cy dy xy -> dy ay xy
-            #
-            # However, we also have to worry about how the ordering of the
-            # vertices a, b, c, d are changed by this permutation. So to keep
-            # the cyclic orders for these vertices the same, we only move the
-            # edge xy in the graph edge list; this edge is placed in the
-            # earliest possible spot in the graph edge list, because why not.
-            #
-            # We also remove current_edge from the edge_list, to avoid
-            # shifting the indices of the other edges by 1.
-            
-            self.edge_list.remove(current_edge)
-            edge_list = [edge_ax, edge_bx, edge_cy, edge_dy]
-            index_list = [self.edge_list.index(edge) for edge in edge_list]
+            if abs(sum(self.dart_arrow[(3 * vert):(3 * vert + 3)])) == 3:
+                raise AttributeError('Edge orientation results in source or sink')
         
-            if index_list[2] < index_list[1]:           # cy comes before bx
-                slot_list = [iii for iii in range(3 * self.num_vert // 2) \
-                              if index_list[2] < iii <= index_list[1]]
-            else:                                       # bx comes before cy
-                slot_list = [iii for iii in range(3 * self.num_vert // 2) \
-                              if (iii <= index_list[1] or index_list[2] < iii)]
-                
-            if index_list[0] < index_list[3]:           # ax comes before dy
-                slot_list = [label for label in slot_list \
-                              if index_list[0] < label <= index_list[3]]
-            else:                                       # dy comes before ax
-                slot_list = [label for label in slot_list \
-                              if (label <= index_list[3] or index_list[0] < label)]
+    #-------------------------------------------------------------------------#
+    
+    def newVertexPair(self):
+        """
+            Add two vertices for a move, returning their first darts
+        """
+        
+        self.addVertices(2)
+        
+        return 3 * self.num_vert - 6, 3 * self.num_vert - 3
+        
+    #-------------------------------------------------------------------------#
+    
+    def newEdge(self, start_dart, end_dart):
+        """
+            Add edge without orientation, color or twist between two darts,
+            and return its label
+        """
+        
+        label = len(self.edge_dart)
+        self.edge_dart.append(start_dart)
+        self.linkDarts(label, start_dart, end_dart)
+        
+        return label
+        
+    #-------------------------------------------------------------------------#
+    
+    def linkDarts(self, label, start_dart, end_dart):
+        """
+            Join two darts by the given edge, clearing orientation, color and
+            twist
+        """
+        
+        self.opp[start_dart] = end_dart
+        self.opp[end_dart] = start_dart
+        self.dart_edge[start_dart] = self.dart_edge[end_dart] = label
+        self.edge_dart[label] = start_dart
+        
+        for dart in [start_dart, end_dart]:
+            self.dart_arrow[dart] = 0
+            self.dart_color[dart] = 0
+            self.dart_twist[dart] = 0
+        
+    #-------------------------------------------------------------------------#
+    
+    def moveDart(self, old_dart, new_dart):
+        """
+            Move the end of an edge from one dart to another, keeping its
+            orientation, color and twist
+        """
+        
+        other_dart = self.opp[old_dart]
+        label = self.dart_edge[old_dart]
+        
+        self.opp[new_dart] = other_dart
+        self.opp[other_dart] = new_dart
+        self.dart_edge[new_dart] = label
+        
+        if self.edge_dart[label] == old_dart:
+            self.edge_dart[label] = new_dart
             
-            slot = slot_list[0]
-            self.edge_list = self.edge_list[:slot] + [current_edge] + self.edge_list[slot:]
+        self.dart_arrow[new_dart] = self.dart_arrow[old_dart]
+        self.dart_color[new_dart] = self.dart_color[old_dart]
+        self.dart_twist[new_dart] = self.dart_twist[old_dart]
+        
+        self.opp[old_dart] = -1
+        self.dart_edge[old_dart] = -1
+        
+    #-------------------------------------------------------------------------#
+    
+    def checkEdgeLabel(self, edge_label):
+        
+        if type(edge_label) != int or edge_label < 0:
+            raise ValueError('edge label must be positive integer')
             
-            # Modify vertex face lists, edge face list as appropriate
+        if edge_label >= len(self.edge_dart):
+            raise ValueError('edge label must be between 0 and {}'.format(len(self.edge_dart) - 1))
+        
+    #-------------------------------------------------------------------------#
+    
+    def endDarts(self, edge_label):
+        """
+            Returns start, end darts of edge; for a self-loop, these are
+            swapped, so that moves act on the same side as for Graph
+        """
+        
+        start_dart = self.edge_dart[edge_label]
+        end_dart = self.opp[start_dart]
+        
+        if start_dart // 3 == end_dart // 3:
+            start_dart, end_dart = end_dart, start_dart
+            self.edge_dart[edge_label] = start_dart
             
-            current_edge.start.face_list.remove(face_left)
-            current_edge.end.face_list.remove(face_right)
+        return start_dart, end_dart
+        
+    #-------------------------------------------------------------------------#
+    
+    def oneMove(self, edge_label = None):
+        """
+            Add a tadpole on edge ab, as for Graph.oneMove: ab becomes ax,
+            with new edges bx, xy and the self-loop yy; returns the labels of
+            xy, yy
+        """
+        
+        self.checkEdgeLabel(edge_label)
+        
+        start_dart, end_dart = self.endDarts(edge_label)
+        x_dart, y_dart = self.newVertexPair()
+        
+        self.moveDart(end_dart, x_dart)
+        self.newEdge(end_dart, x_dart + 1)
+        
+        return [self.newEdge(x_dart + 2, y_dart), self.newEdge(y_dart + 1, y_dart + 2)]
+        
+    #-------------------------------------------------------------------------#
+    
+    def twoMove(self, edge_label = None):
+        """
+            Add a digon on edge ab, as for Graph.twoMove: ab becomes ax, with
+            new edges xy, by, xy; returns their labels
+        """
+        
+        self.checkEdgeLabel(edge_label)
+        
+        start_dart, end_dart = self.endDarts(edge_label)
+        x_dart, y_dart = self.newVertexPair()
+        
+        self.moveDart(end_dart, x_dart)
+        
+        label_xy1 = self.newEdge(x_dart + 1, y_dart)
+        label_by = self.newEdge(end_dart, y_dart + 1)
+        label_xy2 = self.newEdge(x_dart + 2, y_dart + 2)
+        
+        return [label_by, label_xy1, label_xy2]
+        
+    #-------------------------------------------------------------------------#
+    
+    def threeMove(self, vert_label = None):
+        """
+            Replace vertex x, with a, b, c in CCW order, by a triangle x y z,
+            as for Graph.threeMove; returns labels of new edges xy, xz, yz
+        """
+        
+        if type(vert_label) != int or vert_label < 0:
+            raise ValueError('vertex label must be a positive integer')
             
-            current_edge.start.face_list.append(face_end)
-            current_edge.end.face_list.append(face_start)
+        if vert_label >= self.num_vert:
+            raise ValueError('vertex label must be between 0 and {}'.format(self.num_vert - 1))
+        
+        x_dart = 3 * vert_label
+        y_dart, z_dart = self.newVertexPair()
+        
+        # x: a y z, y: x b z, z: x y c
+        
+        self.moveDart(x_dart + 1, y_dart + 1)
+        self.moveDart(x_dart + 2, z_dart + 2)
+        
+        return [self.newEdge(x_dart + 1, y_dart), self.newEdge(x_dart + 2, z_dart), \
+                self.newEdge(y_dart + 2, z_dart + 1)]
+        
+    #-------------------------------------------------------------------------#
+    
+    def fourMove(self, edge_label = None):
+        """
+            Replace edge xy, where x has a, b and y has c, d in CCW order
+            before xy, by a square x z y w, as for Graph.fourMove; the label
+            of xy is given to the new edge xz, and the labels of the new edges
+            xz, xw, yw, yz are returned
+        """
+        
+        self.checkEdgeLabel(edge_label)
+        
+        x_dart = self.edge_dart[edge_label]
+        y_dart = self.opp[x_dart]
+        
+        if x_dart // 3 == y_dart // 3:
+            raise ValueError('start, end vertices must be distinct')
+        
+        w_dart, z_dart = self.newVertexPair()
+        
+        # Move ax to w and cy to z, so that x: w b z, y: z d w, w: a x y and
+        # z: x c y
+        
+        ax_dart = self.next_dart[x_dart]
+        cy_dart = self.next_dart[y_dart]
+        
+        self.moveDart(ax_dart, w_dart)
+        self.moveDart(cy_dart, z_dart + 1)
+        
+        self.opp[y_dart] = -1
+        self.linkDarts(edge_label, x_dart, z_dart)
+        
+        return [edge_label, self.newEdge(ax_dart, w_dart + 1), self.newEdge(y_dart, w_dart + 2), \
+                self.newEdge(cy_dart, z_dart + 2)]
+        
+    #-------------------------------------------------------------------------#
+    
+    def pachner22(self, edge_label = None, no_multi = True):
+        """
+            Pachner 2-2 move on edge xy, as for Graph.pachner22: if x has
+            a, b and y has c, d in CCW order before xy, then ax becomes ay and
+            cy becomes cx, so that x has b, c and y has d, a. The orientation
+            and color of xy are removed, and its label is returned. If
+            no_multi is True, the move is not allowed when the faces at x and
+            y away from xy share an edge.
+        """
+        
+        self.checkEdgeLabel(edge_label)
+        
+        x_dart = self.edge_dart[edge_label]
+        y_dart = self.opp[x_dart]
+        
+        if x_dart // 3 == y_dart // 3:
+            raise ValueError('start, end vertices must be distinct')
+        
+        [ax_dart, bx_dart] = [self.next_dart[x_dart], self.next_dart[self.next_dart[x_dart]]]
+        [cy_dart, dy_dart] = [self.next_dart[y_dart], self.next_dart[self.next_dart[y_dart]]]
+        
+        # The face at x between ax and bx contains bx, and that at y between
+        # cy and dy contains dy
+        
+        if no_multi:
+            self.findFaces()
             
-            current_edge.setLeftFace(face_start)
-            current_edge.setRightFace(face_end)
+            face_start = self.dart_face[bx_dart]
+            face_end = self.dart_face[dy_dart]
             
-            face_left.edge_list.remove(current_edge)
-            face_right.edge_list.remove(current_edge)
+            dart = bx_dart
             
-            edge_bx_idx = face_start.edge_list.index(edge_bx)
-            face_start.edge_list = face_start.edge_list[:edge_bx_idx] + [current_edge] + \
-                face_start.edge_list[edge_bx_idx:]
+            while True:
+                if face_start == face_end or self.dart_face[self.opp[dart]] == face_end:
+                    raise AttributeError('Pachner 2-2 move gives graph not dual to triangulation')
                 
-            edge_dy_idx = face_end.edge_list.index(edge_dy)
-            face_end.edge_list = face_end.edge_list[:edge_dy_idx] + [current_edge] + \
-                face_end.edge_list[edge_dy_idx:]
+                dart = self.next_dart[self.opp[dart]]
                 
-            self.face_size_list = sorted([len(face.edge_list) for face in self.face_list])
+                if dart == bx_dart:
+                    break
+        
+        # Move the ends of the four edges at once, since they may be joined
+        # to each other: x: xy bx cx, y: xy dy ay
+        
+        dart_map = {ax_dart: dy_dart, bx_dart: ax_dart, cy_dart: bx_dart, dy_dart: cy_dart}
+        old_list = [(dart, self.opp[dart], self.dart_edge[dart], self.dart_arrow[dart], self.dart_color[dart], \
+                     self.dart_twist[dart]) for dart in dart_map]
+        
+        for (dart, other_dart, label, arrow, color, twist) in old_list:
+            new_dart = dart_map[dart]
+            other_dart = dart_map.get(other_dart, other_dart)
             
-            # Return new edge, so that the orientation, color can be updated
-            # as desired
-                
-            return current_edge
+            self.opp[new_dart] = other_dart
+            self.opp[other_dart] = new_dart
+            self.dart_edge[new_dart] = label
+            self.dart_arrow[new_dart] = arrow
+            self.dart_color[new_dart] = color
+            self.dart_twist[new_dart] = twist
+            
+            if self.edge_dart[label] == dart:
+                self.edge_dart[label] = new_dart
+        
+        for dart in [x_dart, y_dart]:
+            self.dart_arrow[dart] = 0
+            self.dart_color[dart] = 0
+        
+        self.num_faces = 0
         
+        return edge_label
+    
     #-------------------------------------------------------------------------#
     
-    def vertex(self, label = 0):
+    def findFaces(self):
         """
-            Returns Vertex object from vert_list at given index
+            Label the face of each dart, i.e. the face to the right of the
+            dart going away from its vertex, and return the number of faces
         """
         
-        if type(label) != int:
-            raise ValueError('Vertex label must be integer')
+        if self.num_faces > 0:
+            return self.num_faces
+        
+        num_dart = len(self.opp)
+        self.dart_face = array('i', [-1] * num_dart)
+        num_faces = 0
+        
+        for start_dart in range(num_dart):
+            if self.dart_face[start_dart] != -1 or self.opp[start_dart] == -1:
+                continue
             
-        if label < 0 or label >= self.num_vert:
-            raise ValueError('Vertex label must be between 0 and {}'.format(self.num_vert - 1))
+            dart = start_dart
+            while self.dart_face[dart] == -1:
+                self.dart_face[dart] = num_faces
+                dart = self.next_dart[self.opp[dart]]
+                
+            num_faces += 1
             
-        return self.vert_list[label]
+        self.num_faces = num_faces
+            
+        return num_faces
         
     #-------------------------------------------------------------------------#
     
-    def edge(self, label = 0):
+    def faceSizeList(self):
         """
-            Returns Edge object from edge_list at given index
+            Returns sorted list of face sizes, as Graph.face_size_list
         """
         
-        if type(label) != int:
-            raise ValueError('Edge label must be integer')
-            
-        if label < 0 or label >= 3 * self.num_vert // 2:
-            raise ValueError('Vertex label must be between 0 and {}'.format(3 * self.num_vert // 2 - 1))
-            
-        return self.edge_list[label]
+        num_faces = self.findFaces()
+        
+        face_size_list = [0] * num_faces
+        for face in self.dart_face:
+            if face != -1:
+                face_size_list[face] += 1
+                
+        return sorted(face_size_list)
+        
+    #-------------------------------------------------------------------------#
+    
+    @property
+    def face_size_list(self):
+        """
+            Sorted list of face sizes, under the same name as for Graph
+        """
+        
+        return self.faceSizeList()
+        
+    #-------------------------------------------------------------------------#
+    
+    def edgeRows(self):
+        """
+            Returns edge list as rows [start, end, orient, color, twist], as
+            for Graph.edgeRows
+        """
+        
+        return [[start_dart // 3, self.opp[start_dart] // 3, -self.dart_arrow[start_dart], \
+                 self.dart_color[start_dart], self.dart_twist[start_dart]] for start_dart in self.edge_dart]
+        
+    #-------------------------------------------------------------------------#
+    
+    def rotationRows(self):
+        """
+            Returns list of edge labels around each vertex, in cyclic order
+        """
+        
+        return [[label for label in self.dart_edge[(3 * vert):(3 * vert + 3)] if label != -1] \
+                for vert in range(self.num_vert)]
+        
+    #-------------------------------------------------------------------------#
+    
+    def dartTable(self):
+        """
+            Returns the graph as a rotation system [vert_deg, opp, dart_attr],
+            as for Graph.dartTable
+        """
+        
+        return [[3] * self.num_vert, self.opp.tolist(), \
+                list(zip(self.dart_arrow, self.dart_color, self.dart_twist))]
+        
+    #-------------------------------------------------------------------------#
+    
+    def canonicalCode(self):
+        """
+            Returns canonical code of the graph, as for Graph.canonicalCode
+        """
+        
+        return canonicalDartCode(*self.dartTable())
+        
+    #-------------------------------------------------------------------------#
+    
+    def toGraph(self):
+        """
+            Returns new Graph with the same edges and cyclic orders
+        """
+        
+        graph = Graph(num_vert = self.num_vert, r = self.R)
+        graph.wireEdges(self.edgeRows())
+        graph.setRotations(self.rotationRows())
+        
+        return graph
         
     #-------------------------------------------------------------------------#
     
@@ -2187,22 +5699,302 @@ class Graph:
         
     #-------------------------------------------------------------------------#
     
+    def numEdges(self):
+        return len(self.edge_dart)
+        
+    #-------------------------------------------------------------------------#
+    
     def allowedColorList(self):
         return self.ALLOWED_COLOR_LIST
         
     #-------------------------------------------------------------------------#
     
     def colorList(self):
-        return [edge.color for edge in self.edge_list]
-    
-    #-------------------------------------------------------------------------#
-    
-    def edgeList(self):
-        return [edge for edge in self.edge_list]
+        return [self.dart_color[start_dart] if self.dart_color[start_dart] else None \
+                for start_dart in self.edge_dart]
     
     #-------------------------------------------------------------------------#
     
     def orientList(self):
-        return [edge.orient for edge in self.edge_list]
+        return [-self.dart_arrow[start_dart] if self.dart_arrow[start_dart] else None \
+                for start_dart in self.edge_dart]
     
-    #-------------------------------------------------------------------------#
\ No newline at end of file
+    #-------------------------------------------------------------------------#
+        
+#=============================================================================#
+
+def generate(max_vert, moves = [1, 2, 3, 4], seeds = None, workers = None):
+    """
+    Generator of all connected trivalent graphs with cyclic orders, up to
+    isomorphism, that can be built from the seed graphs by the given moves,
+    with at most max_vert vertices. Each graph is found exactly once.
+
+    For the default seeds and all four moves (which give all connected planar
+    trivalent graphs, checked up to 12 vertices), graphs are not compared
+    against the graphs found so far: a graph is kept only if it comes from
+    its canonical parent (see canonicalParentCode), so that only the children
+    of a single graph need to be compared with each other. This needs the
+    canonical parent of every graph to be found as well, which need not hold
+    for other seeds or moves, so in that case the canonical codes of all
+    graphs found are kept instead, and memory grows with the number of
+    graphs.
+
+    Parameters
+    ----------
+    max_vert : int
+        Maximum number of vertices.
+    moves : list
+        Moves, given by the numbers 1, 2, 3, 4 for Graph.oneMove, ...,
+        Graph.fourMove, used to build graphs.
+    seeds : list
+        Starting graphs; the default is the dumbbell and the theta graph
+        embedded in the plane. Colors and orientations are removed.
+    workers : int
+        If given, the children of each level are found in parallel by this
+        many processes, with each process given whole parent graphs; the
+        graphs are then given level by level, in the same order as for a
+        single process.
+
+    Yields
+    ------
+    Graph
+        The seed graphs, then every graph found, in depth-first order, or by
+        number of vertices if workers is given.
+
+    """
+
+    if type(max_vert) != int or max_vert < 0:
+        raise ValueError('max_vert must be non-negative integer')
+
+    check_parent = seeds == None and sorted(set(moves)) == [1, 2, 3, 4]
+
+    if seeds == None:
+        dumbbell = Graph(num_vert = 2)
+        dumbbell.addEdges([[0, 0], [0, 1], [1, 1]])
+
+        theta = Graph(num_vert = 2)
+        theta.addEdges([[0, 1], [0, 1], [0, 1]])
+        theta.setRotations([[0, 1, 2], [0, 2, 1]])
+
+        seeds = [dumbbell, theta]
+
+    # Copy seeds without colors, orientations or twists
+
+    seed_dict = {}
+
+    for seed in seeds:
+        bare_seed = Graph(num_vert = seed.num_vert)
+        bare_seed.wireEdges([row[:2] + [0, 0, 0] for row in seed.edgeRows()])
+        bare_seed.setRotations(seed.rotationRows())
+
+        if bare_seed.num_vert <= max_vert:
+            seed_dict.setdefault(bare_seed.canonicalCode(), bare_seed)
+
+    for seed in seed_dict.values():
+        yield seed
+
+    if workers != None:
+        yield from generateLevels(seed_dict, max_vert, moves, workers, check_parent)
+        return
+
+    # Depth-first search, keeping a generator of canonical children at each
+    # level; the first seed is at the top of the stack. Without canonical
+    # parents, the children of each graph are checked against all graphs
+    # found so far.
+
+    seen_code_set = None if check_parent else set(seed_dict)
+
+    stack = [canonicalChildren(seed, moves, seed_dict, check_parent) for seed in reversed(list(seed_dict.values())) \
+             if seed.num_vert + 2 <= max_vert]
+
+    while len(stack) > 0:
+        try:
+            child = next(stack[-1])
+        except StopIteration:
+            stack.pop()
+            continue
+
+        if seen_code_set != None:
+            if child.canonicalCode() in seen_code_set:
+                continue
+
+            seen_code_set.add(child.canonicalCode())
+
+        yield child
+
+        if child.num_vert + 2 <= max_vert:
+            stack += [canonicalChildren(child, moves, seed_dict, check_parent)]
+
+#-----------------------------------------------------------------------------#
+
+def enumerateGraphs(num_vert, moves = [1, 2, 3, 4], seeds = None, sink = None):
+    """
+    Generator of the graphs with exactly num_vert vertices found by generate.
+    Graphs are found one at a time, so that for the default seeds and moves
+    memory use does not depend on the number of graphs; to keep it so, the
+    graphs should not all be kept.
+
+    Parameters
+    ----------
+    num_vert : int
+        Number of vertices.
+    moves : list
+        Moves used to build graphs, as for generate.
+    seeds : list
+        Starting graphs, as for generate.
+    sink : file
+        If given, each graph is written to this open text file as it is
+        found, on one line as given by Graph.edgeLine.
+
+    Yields
+    ------
+    Graph
+        Every graph found with num_vert vertices.
+
+    """
+
+    for graph in generate(num_vert, moves, seeds):
+        if graph.num_vert != num_vert:
+            continue
+
+        if sink != None:
+            sink.write(graph.edgeLine() + '\n')
+
+        yield graph
+
+#-----------------------------------------------------------------------------#
+
+def readEdgeLine(line):
+    """
+    Returns new Graph from one line of text, as given by Graph.edgeLine
+    """
+
+    [edge_text, rotation_text] = line.split('|')
+
+    edge_rows = []
+    for entry in edge_text.split():
+        row = [int(value) for value in entry.split(',')]
+        edge_rows += [row + [0] * (5 - len(row))]
+
+    rotation_rows = [[int(label) for label in entry.split(',')] for entry in rotation_text.split()]
+
+    graph = Graph(num_vert = len(rotation_rows))
+    graph.wireEdges(edge_rows)
+    graph.setRotations(rotation_rows)
+
+    return graph
+
+#-----------------------------------------------------------------------------#
+
+def generateLevels(seed_dict, max_vert, moves, workers, check_parent = True):
+    """
+    Generator of the graphs found from the seeds by generate, one level (number
+    of vertices) at a time, with the parents of each level shared out among a
+    pool of worker processes. Graphs are sent to and from the workers in the
+    compact form given by packGraph. If check_parent is False, the children
+    are checked against all graphs found so far, as for generate.
+    """
+
+    level = [packGraph(seed) for seed in seed_dict.values() if seed.num_vert + 2 <= max_vert]
+    skip_codes = set(seed_dict)
+    seen_code_set = None if check_parent else set(seed_dict)
+
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        while len(level) > 0:
+
+            # Results are given in the order of the parents, so the order of
+            # the next level does not depend on how the work is scheduled
+
+            next_level = []
+            chunksize = max(1, len(level) // (4 * workers))
+
+            for child_list in executor.map(partial(packedChildren, moves = moves, skip_codes = skip_codes, \
+                                                   check_parent = check_parent), level, chunksize = chunksize):
+                for child in child_list:
+                    graph = unpackGraph(child)
+
+                    if seen_code_set != None:
+                        if graph.canonicalCode() in seen_code_set:
+                            continue
+
+                        seen_code_set.add(graph.canonicalCode())
+
+                    yield graph
+                    next_level += [child]
+
+            level = [child for child in next_level if len(child) // 12 + 2 <= max_vert]
+
+#-----------------------------------------------------------------------------#
+
+def canonicalChildren(parent, moves = [1, 2, 3, 4], skip_codes = (), check_parent = True):
+    """
+    Generator of the children of a graph, as found by Graph.children, whose
+    canonical parent (see canonicalParentCode) is the graph itself, or of all
+    children if check_parent is False. Each child is given once up to
+    isomorphism, and children with canonical codes in skip_codes are left out.
+    """
+
+    parent_code = parent.canonicalCode()
+    seen_code_set = set(skip_codes)
+
+    for child in parent.children(moves):
+        code = child.canonicalCode()
+
+        if code in seen_code_set:
+            continue
+
+        seen_code_set.add(code)
+
+        if not check_parent or canonicalParentCode(child.dartTable()[1], moves) == parent_code:
+            yield child
+
+#-----------------------------------------------------------------------------#
+
+def packedChildren(packed_parent, moves = [1, 2, 3, 4], skip_codes = (), check_parent = True):
+    """
+    Find the canonical children of a graph given by packGraph, as for
+    canonicalChildren, returned as a list of packed graphs; this is the task
+    carried out by each worker process in generate.
+    """
+
+    return [packGraph(child) for child in canonicalChildren(unpackGraph(packed_parent), moves, skip_codes, \
+                                                            check_parent)]
+
+#-----------------------------------------------------------------------------#
+
+def packGraph(graph):
+    """
+    Pack a trivalent graph without colors, orientations or twists into bytes,
+    giving the opposite dart of each dart (see Graph.dartTable) as unsigned
+    32-bit integers. This is much smaller and faster to send between processes
+    than the Vertex, Edge and Face objects of the graph.
+    """
+
+    return array('I', graph.dartTable()[1]).tobytes()
+
+#-----------------------------------------------------------------------------#
+
+def unpackGraph(data):
+    """
+    Returns new Graph from bytes given by packGraph
+    """
+
+    opp = array('I')
+    opp.frombytes(data)
+
+    # Each edge is found from its lower dart, which for a self-loop is also
+    # the first appearance in the cyclic order, and so the start of the edge
+
+    edge_label = [None] * len(opp)
+    edge_rows = []
+
+    for dart in range(len(opp)):
+        if dart < opp[dart]:
+            edge_label[dart] = edge_label[opp[dart]] = len(edge_rows)
+            edge_rows += [[dart // 3, opp[dart] // 3, 0, 0, 0]]
+
+    graph = Graph(num_vert = len(opp) // 3)
+    graph.wireEdges(edge_rows)
+    graph.setRotations([edge_label[dart:(dart + 3)] for dart in range(0, len(opp), 3)])
+
+    return graph